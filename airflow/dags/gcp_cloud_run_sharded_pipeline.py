@@ -0,0 +1,121 @@
+from datetime import datetime, timedelta
+import json
+import os
+import re
+from typing import Any
+
+from airflow.decorators import task
+from airflow.providers.google.cloud.hooks.bigquery import BigQueryHook
+from airflow.providers.google.cloud.operators.cloud_run import (
+    CloudRunExecuteJobOperator,
+)
+
+from airflow import DAG
+
+
+# Fetch infrastructure variables dynamically from the environment (.env)
+GCP_PROJECT = os.environ.get('GCP_PROJECT_ID')
+GCP_REGION = os.environ.get('GCP_REGION', 'europe-west1')
+JOB_EXTRACT = os.environ.get('CLOUD_RUN_EL_JOB_NAME', 'extract-load-job')
+JOB_DBT = os.environ.get('CLOUD_RUN_DBT_JOB_NAME', 'dbt-transform-job')
+# Pipeline state table written by the extract-load job (ingestion/state)
+STATE_TABLE = f'{GCP_PROJECT}.dataset_raw.pipeline_state'
+PLAN_KEY = 'strava_shard_plan'
+
+default_args = {
+    'owner': 'data-engineering',
+    'retries': 1,
+    'retry_delay': timedelta(minutes=2),
+}
+
+
+def _pipeline_env(run_id: str, mode: str, **env: str) -> dict[str, Any]:
+    """Overrides that run the extract-load job in one step of the sharded run."""
+    variables = {'PIPELINE_MODE': mode, 'PIPELINE_RUN_ID': run_id, **env}
+    return {
+        'container_overrides': [
+            {'env': [{'name': k, 'value': v} for k, v in variables.items()]}
+        ]
+    }
+
+
+with DAG(
+    dag_id='2_gcp_cloud_run_sharded_pipeline',
+    default_args=default_args,
+    description='Extract-Load with stream extraction fanned out over Cloud Run shards',
+    schedule=None,
+    start_date=datetime(2026, 1, 1),
+    catchup=False,
+    tags=['gcp', 'production'],
+) as dag:
+    # Task 1: Extract activities, athletes and gear, and plan the stream shards
+    plan_extract_load = CloudRunExecuteJobOperator(
+        task_id='plan_extract_load',
+        project_id=GCP_PROJECT,
+        region=GCP_REGION,
+        job_name=JOB_EXTRACT,
+        overrides=_pipeline_env('{{ run_id }}', 'plan'),
+        deferrable=True,
+    )
+
+    # Task 2: Read the plan and list one job override per shard
+    @task
+    def list_shards(run_id: str) -> list[dict[str, Any]]:
+        # Same key as ingestion.pipelines.strava_sharded.run_key
+        state_key = f'{PLAN_KEY}.{re.sub(r"[^A-Za-z0-9_.-]", "_", run_id)}'
+        client = BigQueryHook(use_legacy_sql=False).get_client(project_id=GCP_PROJECT)
+        query = f"""
+            SELECT state_value
+            FROM `{STATE_TABLE}`
+            WHERE state_key = '{state_key}'
+        """  # nosec B608: the key is sanitized above
+        rows = list(client.query(query).result())
+        if not rows:
+            raise RuntimeError(f'No shard plan stored for run {run_id}.')
+        num_shards = len(json.loads(rows[0].state_value)['shards'])
+        return [
+            _pipeline_env(run_id, 'shard', SHARD_INDEX=str(index))
+            for index in range(num_shards)
+        ]
+
+    shard_overrides = list_shards(run_id='{{ run_id }}')
+
+    # Task 3: One mapped job execution per shard, each retried on its own
+    extract_stream_shards = CloudRunExecuteJobOperator.partial(
+        task_id='extract_stream_shard',
+        project_id=GCP_PROJECT,
+        region=GCP_REGION,
+        job_name=JOB_EXTRACT,
+        deferrable=True,
+        retries=3,
+        max_active_tis_per_dag=8,
+    ).expand(overrides=shard_overrides)
+
+    # Task 4: Join the shards and advance the watermarks (no shards: mapping skipped)
+    finalize_extract_load = CloudRunExecuteJobOperator(
+        task_id='finalize_extract_load',
+        project_id=GCP_PROJECT,
+        region=GCP_REGION,
+        job_name=JOB_EXTRACT,
+        overrides=_pipeline_env('{{ run_id }}', 'finalize'),
+        deferrable=True,
+        trigger_rule='none_failed',
+    )
+
+    # Task 5: Trigger dbt transform container
+    trigger_dbt_transform = CloudRunExecuteJobOperator(
+        task_id='run_dbt_transform',
+        project_id=GCP_PROJECT,
+        region=GCP_REGION,
+        job_name=JOB_DBT,
+        deferrable=True,
+    )
+
+    # Set execution sequence
+    (
+        plan_extract_load
+        >> shard_overrides
+        >> extract_stream_shards
+        >> finalize_extract_load
+        >> trigger_dbt_transform
+    )
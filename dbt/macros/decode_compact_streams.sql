@@ -0,0 +1,72 @@
+{#
+  Decoding of the compact raw stream format (raw_activity_streams_compact):
+  one row per (activity_id, stream_type) with delta-encoded integer values scaled by
+  `scale`, or a polyline string for latlng streams.
+#}
+
+{% macro decode_polyline_function() -%}
+-- Google polyline decoding; arithmetic instead of bit operators keeps it exact
+-- beyond 32 bits. JS UDFs take no INT64, hence the FLOAT64 scale.
+CREATE TEMP FUNCTION decode_polyline(encoded STRING, scale FLOAT64)
+RETURNS ARRAY<STRUCT<lat FLOAT64, lng FLOAT64>>
+LANGUAGE js AS r"""
+  const points = [];
+  if (encoded === null) return points;
+  let index = 0, lat = 0, lng = 0;
+  while (index < encoded.length) {
+    const deltas = [];
+    for (let axis = 0; axis < 2; axis++) {
+      let result = 0, factor = 1, chunk;
+      do {
+        chunk = encoded.charCodeAt(index++) - 63;
+        result += (chunk % 32) * factor;
+        factor *= 32;
+      } while (chunk >= 32);
+      deltas.push(result % 2 ? -(result + 1) / 2 : result / 2);
+    }
+    lat += deltas[0];
+    lng += deltas[1];
+    points.push({lat: lat / scale, lng: lng / scale});
+  }
+  return points;
+""";
+{%- endmacro %}
+
+
+{% macro decode_compact_streams(relation) -%}
+-- Requires decode_polyline_function() in the sql_header of the model
+SELECT
+    c.activity_id,
+    c.stream_type,
+    IF(
+        ARRAY_LENGTH(c.sequence_index) = 0,
+        p.pos,
+        c.sequence_index[OFFSET(p.pos)]
+    ) AS sequence_index,
+    IF(c.value_type = 'float', p.value / c.scale, NULL) AS value_float,
+    IF(c.value_type = 'int', p.value, NULL) AS value_int,
+    IF(c.value_type = 'bool', p.value != 0, NULL) AS value_bool,
+    p.lat AS value_lat,
+    p.lng AS value_lng,
+    c.ingested_at
+FROM {{ relation }} AS c
+CROSS JOIN UNNEST(
+    IF(
+        c.value_type = 'latlng',
+        ARRAY(
+            SELECT AS STRUCT
+                CAST(NULL AS INT64) AS value, pt.lat, pt.lng, pos
+            FROM UNNEST(decode_polyline(c.values_polyline, CAST(c.scale AS FLOAT64))) AS pt
+            WITH OFFSET AS pos
+        ),
+        ARRAY(
+            SELECT AS STRUCT
+                SUM(d) OVER (ORDER BY pos) AS value,
+                CAST(NULL AS FLOAT64) AS lat,
+                CAST(NULL AS FLOAT64) AS lng,
+                pos
+            FROM UNNEST(c.values_delta) AS d WITH OFFSET AS pos
+        )
+    )
+) AS p
+{%- endmacro %}
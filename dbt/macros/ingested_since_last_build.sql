@@ -0,0 +1,9 @@
+{% macro ingested_since_last_build(column='ingested_at') -%}
+{#- Limits an incremental model to raw rows ingested since its last build. -#}
+{% if is_incremental() %}
+WHERE SAFE_CAST({{ column }} AS TIMESTAMP) > (
+    SELECT TIMESTAMP_SUB(MAX(ingested_at), INTERVAL {{ var('incremental_lookback_hours') }} HOUR)
+    FROM {{ this }}
+)
+{% endif %}
+{%- endmacro %}
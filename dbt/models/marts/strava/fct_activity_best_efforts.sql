@@ -0,0 +1,22 @@
+{{ config(
+    materialized='table',
+    cluster_by=["activity_id", "effort"]
+) }}
+
+-- Best efforts of the latest ingestion of each activity
+SELECT
+    activity_id,
+    effort,
+    distance_m,
+    elapsed_s,
+    start_offset_s,
+    ingested_at,
+
+    CURRENT_TIMESTAMP() AS mart_loaded_at
+
+FROM {{ source('strava_data', 'raw_activity_best_efforts') }}
+QUALIFY ingested_at = MAX(ingested_at) OVER (PARTITION BY activity_id)
+    AND ROW_NUMBER() OVER (
+        PARTITION BY activity_id, effort
+        ORDER BY ingested_at DESC
+    ) = 1
@@ -0,0 +1,21 @@
+{{ config(
+    materialized='table',
+    cluster_by=["activity_id", "curve"]
+) }}
+
+-- Curves of the latest ingestion of each activity
+SELECT
+    activity_id,
+    curve,
+    duration_s,
+    value,
+    ingested_at,
+
+    CURRENT_TIMESTAMP() AS mart_loaded_at
+
+FROM {{ source('strava_data', 'raw_activity_stream_curves') }}
+QUALIFY ingested_at = MAX(ingested_at) OVER (PARTITION BY activity_id)
+    AND ROW_NUMBER() OVER (
+        PARTITION BY activity_id, curve, duration_s
+        ORDER BY ingested_at DESC
+    ) = 1
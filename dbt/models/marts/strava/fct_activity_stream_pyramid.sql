@@ -0,0 +1,26 @@
+{{ config(
+    materialized='table',
+    enabled=var('stream_pyramid', true),
+    cluster_by=["activity_id", "tier", "stream_type"]
+) }}
+
+-- Tiers of the latest ingestion of each activity; a re-ingested activity
+-- replaces all of its points, and a repeated load of a run is deduplicated
+SELECT
+    activity_id,
+    tier,
+    stream_type,
+    sequence_index,
+    time_s,
+    distance_m,
+    value,
+    ingested_at,
+
+    CURRENT_TIMESTAMP() AS mart_loaded_at
+
+FROM {{ source('strava_data', 'raw_activity_stream_pyramid') }}
+QUALIFY ingested_at = MAX(ingested_at) OVER (PARTITION BY activity_id)
+    AND ROW_NUMBER() OVER (
+        PARTITION BY activity_id, tier, stream_type, sequence_index
+        ORDER BY ingested_at DESC
+    ) = 1
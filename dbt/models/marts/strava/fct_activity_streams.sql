@@ -1,4 +1,7 @@
-{{config(materialized='table')}}
+{{ config(
+    materialized='table',
+    cluster_by=["activity_id", "sequence_index"]
+) }}
 
 SELECT
     activity_id,
@@ -0,0 +1,25 @@
+{{ config(
+    materialized='table',
+    enabled=var('compact_streams', false),
+    cluster_by=["activity_id", "stream_type"]
+) }}
+
+-- Latest compact row per stream; decoded by the dashboard instead of BigQuery
+SELECT
+    activity_id,
+    stream_type,
+    value_type,
+    scale,
+    num_points,
+    sequence_index,
+    values_delta,
+    values_polyline,
+    ingested_at,
+
+    CURRENT_TIMESTAMP() AS mart_loaded_at
+
+FROM {{ source('strava_data', 'raw_activity_streams_compact') }}
+QUALIFY ROW_NUMBER() OVER (
+    PARTITION BY activity_id, stream_type
+    ORDER BY ingested_at DESC
+) = 1
@@ -0,0 +1,34 @@
+{{ config(
+    materialized='table',
+    cluster_by=["activity_id"]
+) }}
+
+-- Summary of the latest ingestion of each activity
+SELECT
+    activity_id,
+    num_points,
+    elapsed_s,
+    moving_s,
+    moving_ratio,
+    zone_max_hr_bpm,
+    hr_zone_s,
+    zone_ftp_w,
+    power_zone_s,
+    heartrate_percentiles,
+    cadence_percentiles,
+    watts_percentiles,
+    velocity_percentiles,
+    normalized_power_w,
+    hr_drift_pct,
+    decoupling_pct,
+    training_load,
+    training_load_method,
+    ingested_at,
+
+    CURRENT_TIMESTAMP() AS mart_loaded_at
+
+FROM {{ source('strava_data', 'raw_activity_stream_summary') }}
+QUALIFY ROW_NUMBER() OVER (
+    PARTITION BY activity_id
+    ORDER BY ingested_at DESC
+) = 1
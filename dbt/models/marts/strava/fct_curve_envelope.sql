@@ -0,0 +1,96 @@
+{{ config(
+    materialized='incremental',
+    unique_key='envelope_pk',
+    on_schema_change='fail',
+    cluster_by=["athlete_id", "curve", "duration_s"]
+) }}
+
+-- Best curve values per athlete, discipline and season ('all_time' or the year).
+-- A build only reads the curve rows ingested since the last one and merges them
+-- into the stored envelopes it touches; the streams are never rescanned.
+WITH new_curves AS (
+    SELECT
+        a.athlete_id,
+        a.discipline,
+        c.curve,
+        c.duration_s,
+        c.value,
+        c.activity_id,
+        a.activity_date_local,
+        c.ingested_at
+    FROM {{ source('strava_data', 'raw_activity_stream_curves') }} AS c
+    JOIN {{ ref('fct_activities') }} AS a
+        ON a.activity_id = c.activity_id
+    {{ ingested_since_last_build('c.ingested_at') }}
+),
+
+seasons AS (
+    SELECT *, 'all_time' AS season FROM new_curves
+    UNION ALL
+    SELECT *, CAST(EXTRACT(YEAR FROM activity_date_local) AS STRING) AS season FROM new_curves
+),
+
+candidates AS (
+    SELECT
+        athlete_id,
+        discipline,
+        season,
+        curve,
+        duration_s,
+        value,
+        activity_id,
+        activity_date_local,
+        ingested_at
+    FROM seasons
+
+    {% if is_incremental() %}
+    UNION ALL
+
+    -- Stored bests of the envelopes that the new rows compete for
+    SELECT
+        t.athlete_id,
+        t.discipline,
+        t.season,
+        t.curve,
+        t.duration_s,
+        t.value,
+        t.activity_id,
+        t.activity_date_local,
+        t.ingested_at
+    FROM {{ this }} AS t
+    JOIN (
+        SELECT DISTINCT athlete_id, discipline, season, curve, duration_s
+        FROM seasons
+    ) AS touched
+        USING (athlete_id, discipline, season, curve, duration_s)
+    {% endif %}
+)
+
+SELECT
+    CONCAT(
+        CAST(athlete_id AS STRING), '_',
+        discipline, '_',
+        season, '_',
+        curve, '_',
+        CAST(duration_s AS STRING)
+    ) AS envelope_pk,
+    athlete_id,
+    discipline,
+    season,
+    curve,
+    duration_s,
+    value,
+    activity_id,
+    activity_date_local,
+    -- Latest curve row merged into the envelope, the watermark of the next build
+    MAX(ingested_at) OVER (
+        PARTITION BY athlete_id, discipline, season, curve, duration_s
+    ) AS ingested_at,
+
+    CURRENT_TIMESTAMP() AS mart_loaded_at
+
+FROM candidates
+QUALIFY ROW_NUMBER() OVER (
+    PARTITION BY athlete_id, discipline, season, curve, duration_s
+    ORDER BY value DESC, activity_date_local
+) = 1
@@ -0,0 +1,100 @@
+{{ config(
+    materialized='incremental',
+    unique_key='record_pk',
+    on_schema_change='fail',
+    cluster_by=["athlete_id", "effort"]
+) }}
+
+-- Fastest best effort per athlete, discipline, season ('all_time' or the year) and
+-- distance. A build only reads the best efforts ingested since the last one and
+-- merges them into the stored records they compete for.
+WITH new_efforts AS (
+    SELECT
+        a.athlete_id,
+        a.discipline,
+        e.effort,
+        e.distance_m,
+        e.elapsed_s,
+        e.start_offset_s,
+        e.activity_id,
+        a.activity_date_local,
+        e.ingested_at
+    FROM {{ source('strava_data', 'raw_activity_best_efforts') }} AS e
+    JOIN {{ ref('fct_activities') }} AS a
+        ON a.activity_id = e.activity_id
+    {{ ingested_since_last_build('e.ingested_at') }}
+),
+
+seasons AS (
+    SELECT *, 'all_time' AS season FROM new_efforts
+    UNION ALL
+    SELECT *, CAST(EXTRACT(YEAR FROM activity_date_local) AS STRING) AS season FROM new_efforts
+),
+
+candidates AS (
+    SELECT
+        athlete_id,
+        discipline,
+        season,
+        effort,
+        distance_m,
+        elapsed_s,
+        start_offset_s,
+        activity_id,
+        activity_date_local,
+        ingested_at
+    FROM seasons
+
+    {% if is_incremental() %}
+    UNION ALL
+
+    -- Stored records that the new efforts compete for
+    SELECT
+        t.athlete_id,
+        t.discipline,
+        t.season,
+        t.effort,
+        t.distance_m,
+        t.elapsed_s,
+        t.start_offset_s,
+        t.activity_id,
+        t.activity_date_local,
+        t.ingested_at
+    FROM {{ this }} AS t
+    JOIN (
+        SELECT DISTINCT athlete_id, discipline, season, effort
+        FROM seasons
+    ) AS touched
+        USING (athlete_id, discipline, season, effort)
+    {% endif %}
+)
+
+SELECT
+    CONCAT(
+        CAST(athlete_id AS STRING), '_',
+        discipline, '_',
+        season, '_',
+        effort
+    ) AS record_pk,
+    athlete_id,
+    discipline,
+    season,
+    effort,
+    distance_m,
+    elapsed_s,
+    SAFE_DIVIDE(elapsed_s / 60, distance_m / 1000) AS pace_min_per_km,
+    start_offset_s,
+    activity_id,
+    activity_date_local,
+    -- Latest best effort merged into the record, the watermark of the next build
+    MAX(ingested_at) OVER (
+        PARTITION BY athlete_id, discipline, season, effort
+    ) AS ingested_at,
+
+    CURRENT_TIMESTAMP() AS mart_loaded_at
+
+FROM candidates
+QUALIFY ROW_NUMBER() OVER (
+    PARTITION BY athlete_id, discipline, season, effort
+    ORDER BY elapsed_s, activity_date_local
+) = 1
@@ -0,0 +1,23 @@
+{{ config(
+    materialized='table',
+    cluster_by=["athlete_id", "day"]
+) }}
+
+-- The raw table is upserted per athlete and day by the pipeline; the latest row
+-- wins should a day have been appended twice
+SELECT
+    athlete_id,
+    day,
+    load,
+    atl,
+    ctl,
+    tsb,
+    ingested_at,
+
+    CURRENT_TIMESTAMP() AS mart_loaded_at
+
+FROM {{ source('strava_data', 'raw_training_load_daily') }}
+QUALIFY ROW_NUMBER() OVER (
+    PARTITION BY athlete_id, day
+    ORDER BY ingested_at DESC
+) = 1
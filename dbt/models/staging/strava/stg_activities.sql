@@ -67,6 +67,8 @@ WITH ranked AS (
             ORDER BY ingested_at DESC
         ) AS rn
     FROM {{ source('strava_data', 'raw_activities') }}
+
+    {{ ingested_since_last_build() }}
 ),
 
 final AS (
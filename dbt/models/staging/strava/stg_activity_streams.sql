@@ -6,7 +6,32 @@
     cluster_by=["activity_id", "stream_type"]
 ) }}
 
-WITH ranked AS (
+{% if var('compact_streams', false) %}
+{% call set_sql_header(config) %}
+{{ decode_polyline_function() }}
+{% endcall %}
+{% endif %}
+
+WITH raw_streams AS (
+    SELECT
+        activity_id,
+        stream_type,
+        sequence_index,
+        value_float,
+        value_int,
+        value_bool,
+        value_lat,
+        value_lng,
+        ingested_at
+    FROM {{ source('strava_data', 'raw_activity_streams') }}
+
+    {% if var('compact_streams', false) %}
+    UNION ALL
+    {{ decode_compact_streams(source('strava_data', 'raw_activity_streams_compact')) }}
+    {% endif %}
+),
+
+ranked AS (
     SELECT
         SAFE_CAST(activity_id AS INT64) AS activity_id,
         SAFE_CAST(stream_type AS STRING) AS stream_type,
@@ -34,7 +59,8 @@ WITH ranked AS (
                 sequence_index
             ORDER BY ingested_at DESC
         ) AS rn
-    FROM {{ source('strava_data', 'raw_activity_streams') }}
+    FROM raw_streams
+    {{ ingested_since_last_build() }}
 )
 
 select
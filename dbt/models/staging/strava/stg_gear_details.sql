@@ -27,6 +27,8 @@ WITH ranked AS (
             ORDER BY ingested_at DESC
         ) AS rn
     FROM {{ source('strava_data', 'raw_gear_details') }}
+
+    {{ ingested_since_last_build() }}
 )
 
 SELECT
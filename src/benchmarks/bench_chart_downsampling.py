@@ -0,0 +1,126 @@
+"""Benchmark of the stride against the shape-preserving chart downsampling.
+
+Usage (from `src/`):
+    python -m benchmarks.bench_chart_downsampling --points 50000 --repeat 5
+"""
+
+import argparse
+import time
+from typing import Any, Callable
+
+import numpy as np
+import pandas as pd
+
+from benchmarks.synthetic_data import make_streams
+from dashboard.utilities.downsampling import Method, as_float, downsample
+
+
+# Plotted columns of the activity details charts and their rows
+CHARTS = {
+    'heartrate_bpm': 1000,
+    'speed_kph': 1000,
+    'altitude_m': 500,
+    'cadence_rpm': 1000,
+}
+NUM_SPIKES = 10  # single-point heart-rate spikes
+SPIKE_BPM = 195
+NUMERIC_COLS = [
+    'time_s',
+    'distance_m',
+    'heartrate_bpm',
+    'altitude_m',
+    'velocity_smooth_mps',
+    'cadence_rpm',
+]
+
+
+def _streams_frame(num_points: int) -> pd.DataFrame:
+    """The streams as `load_activity_streams` returns them, with short HR spikes."""
+    streams = make_streams(num_points)
+    df = pd.DataFrame({
+        'sequence_index': pd.array(range(num_points), dtype='Int64'),
+        'time_s': pd.array(streams['time']['data'], dtype='Int64'),
+        'distance_m': streams['distance']['data'],
+        'heartrate_bpm': pd.array(streams['heartrate']['data'], dtype='Int64'),
+        'velocity_smooth_mps': streams['velocity_smooth']['data'],
+        'altitude_m': streams['altitude']['data'],
+        'cadence_rpm': pd.array(streams['cadence']['data'], dtype='Int64'),
+    })
+    spikes = np.random.default_rng(0).choice(num_points, NUM_SPIKES, replace=False)
+    df.loc[spikes, 'heartrate_bpm'] = SPIKE_BPM
+    return df
+
+
+def _stride_path(df_streams: pd.DataFrame, x_col: str) -> dict[str, pd.DataFrame]:
+    """The charts' data as prepared before the downsampling module."""
+    df = df_streams.copy()
+    for col in NUMERIC_COLS:
+        df[col] = pd.to_numeric(df[col], errors='coerce')
+    df['distance_km'] = df['distance_m'] / 1000.0
+    df['speed_kph'] = df['velocity_smooth_mps'] * 3.6
+    df['time_min'] = df['time_s'] / 60.0
+    df = df.dropna(subset=['time_s']).reset_index(drop=True)
+
+    charts = {}
+    for y_col in CHARTS:
+        df_chart = df.dropna(subset=[x_col, y_col]).reset_index(drop=True)
+        if len(df_chart) > 2500:
+            df_chart = df_chart.iloc[:: len(df_chart) // 2500].reset_index(drop=True)
+        charts[y_col] = df_chart
+    return charts
+
+
+def _downsampling_path(
+    df_streams: pd.DataFrame, x_col: str, method: Method
+) -> dict[str, pd.DataFrame]:
+    """The charts' data as prepared by `ui.activity_details`."""
+    columns = {col: as_float(df_streams[col]) for col in NUMERIC_COLS}
+    columns['distance_km'] = columns['distance_m'] / 1000.0
+    columns['speed_kph'] = columns['velocity_smooth_mps'] * 3.6
+    columns['time_min'] = columns['time_s'] / 60.0
+    df = pd.DataFrame(columns, copy=False)
+    if df['time_s'].hasnans:
+        df = df.dropna(subset=['time_s']).reset_index(drop=True)
+
+    df_charts = downsample(df, x_col, list(CHARTS), CHARTS, method)
+    return {y_col: df_charts.dropna(subset=[y_col]) for y_col in CHARTS}
+
+
+def _best_of(repeat: int, func: Callable[..., Any], *args: Any) -> tuple[float, Any]:
+    timings = []
+    result = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = func(*args)
+        timings.append(time.perf_counter() - start)
+    return min(timings), result
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--points', type=int, default=50_000, help='1 Hz samples')
+    parser.add_argument('--repeat', type=int, default=5)
+    parser.add_argument('--x', default='time_min', choices=['time_min', 'distance_km'])
+    args = parser.parse_args()
+
+    df_streams = _streams_frame(args.points)
+    print(f'{args.points:,} points, {NUM_SPIKES} heart-rate spikes')
+
+    stride_s, stride = _best_of(args.repeat, _stride_path, df_streams, args.x)
+    results = {'stride': (stride_s, stride)}
+    for method in ('minmax', 'lttb'):
+        results[method] = _best_of(
+            args.repeat, _downsampling_path, df_streams, args.x, method
+        )
+
+    for name, (seconds, charts) in results.items():
+        rows = sum(len(chart) for chart in charts.values())
+        spikes = int((charts['heartrate_bpm']['heartrate_bpm'] == SPIKE_BPM).sum())
+        print(
+            f'{name:7s} {seconds * 1000:8.2f} ms  {rows:6,} rows  '
+            f'{spikes:2d}/{NUM_SPIKES} spikes kept  speedup {stride_s / seconds:4.1f}x'
+        )
+
+
+if __name__ == '__main__':
+    main()
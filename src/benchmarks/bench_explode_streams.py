@@ -0,0 +1,73 @@
+"""Benchmark of the row-based against the columnar stream transformer.
+
+Usage (from `src/`):
+    python -m benchmarks.bench_explode_streams --points 18000 --repeat 3
+"""
+
+import argparse
+from datetime import datetime, timezone
+import time
+from typing import Any
+
+from benchmarks.synthetic_data import make_streams
+from ingestion.transformers.strava_streams import (
+    explode_streams,
+    explode_streams_columnar,
+)
+
+
+def _row_based(raw_streams: dict[str, Any], ingested_at: str) -> int:
+    """The transformation as done by the pipeline before the columnar path."""
+    rows = [
+        {**r.model_dump(), 'ingested_at': ingested_at}
+        for r in explode_streams(1, raw_streams)
+    ]
+    return len(rows)
+
+
+def _columnar(raw_streams: dict[str, Any], ingested_at: datetime) -> int:
+    return int(explode_streams_columnar(1, raw_streams, ingested_at).num_rows)
+
+
+def _best_of(repeat: int, func: Any, *args: Any) -> tuple[float, int]:
+    timings = []
+    rows = 0
+    for _ in range(repeat):
+        start = time.perf_counter()
+        rows = func(*args)
+        timings.append(time.perf_counter() - start)
+    return min(timings), rows
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--points', type=int, default=18_000, help='1 Hz samples')
+    parser.add_argument('--repeat', type=int, default=3)
+    args = parser.parse_args()
+
+    raw_streams = make_streams(args.points)
+    ingested_at = datetime.now(timezone.utc)
+
+    # Both implementations must emit identical rows
+    expected = [r.model_dump() for r in explode_streams(1, raw_streams)]
+    actual = (
+        explode_streams_columnar(1, raw_streams, ingested_at)
+        .drop_columns(['ingested_at'])
+        .to_pylist()
+    )
+    if expected != actual:
+        raise SystemExit('Columnar output differs from explode_streams.')
+
+    row_s, rows = _best_of(
+        args.repeat, _row_based, raw_streams, ingested_at.isoformat()
+    )
+    col_s, _ = _best_of(args.repeat, _columnar, raw_streams, ingested_at)
+
+    print(f'{rows} rows ({args.points} points x {len(raw_streams)} streams)')
+    print(f'explode_streams:          {row_s:8.3f}s  {rows / row_s:12,.0f} rows/s')
+    print(f'explode_streams_columnar: {col_s:8.3f}s  {rows / col_s:12,.0f} rows/s')
+    print(f'speedup: {row_s / col_s:.1f}x')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,167 @@
+"""End-to-end benchmark of the incremental pipeline against the local Strava stub.
+
+Starts `benchmarks.strava_stub_server` in a separate process, points the pipeline
+at it and runs `strava_pipeline.run` with a temporary JSON state store and either
+a counting loader or the local DuckDB/Parquet loader, so neither Strava nor
+BigQuery is needed.
+
+Usage (from `src/`):
+    python -m benchmarks.bench_pipeline --activities 200 --points 3600 --workers 4
+    python -m benchmarks.bench_pipeline --loader duckdb --stream-format compact
+"""
+
+import argparse
+import os
+import resource
+import socket
+import subprocess  # nosec B404: starts the local stub server
+import sys
+import tempfile
+import time
+import urllib.error
+import urllib.request
+
+from ingestion.loaders.base import BaseLoader
+from ingestion.loaders.counting_loader import CountingLoader
+from ingestion.loaders.duckdb_loader import DuckDBLoader
+
+
+def _loaded_rows(loader: BaseLoader) -> dict[str, int]:
+    """Rows per table, counted in memory or queried from the local warehouse."""
+    if isinstance(loader, DuckDBLoader):
+        return {
+            stats.table_id.split('.')[-1]: int(
+                loader
+                .query(
+                    f'SELECT COUNT(*) AS n FROM {stats.table_id}'  # nosec B608
+                )
+                .column('n')[0]
+                .as_py()
+            )
+            for stats in loader.load_stats
+        }
+    return loader.rows if isinstance(loader, CountingLoader) else {}
+
+
+def _free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(('127.0.0.1', 0))
+        return int(sock.getsockname()[1])
+
+
+def _wait_until_up(url: str, timeout_s: float = 60) -> None:
+    """Polls the stub until it answers; rendering the payloads takes a moment."""
+    deadline = time.monotonic() + timeout_s
+    while time.monotonic() < deadline:
+        try:
+            with urllib.request.urlopen(url, timeout=1):  # nosec B310: local stub
+                return
+        except urllib.error.HTTPError:
+            return  # answering at all is enough
+        except OSError:
+            time.sleep(0.2)
+    raise SystemExit(f'Strava stub did not start within {timeout_s:.0f}s.')
+
+
+def _peak_rss_mb() -> float:
+    # ru_maxrss is reported in kilobytes on Linux and in bytes on macOS
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak / (1024**2 if sys.platform == 'darwin' else 1024)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--activities', type=int, default=100)
+    parser.add_argument('--points', type=int, default=3_600, help='1 Hz samples')
+    parser.add_argument('--latency-ms', type=float, default=50)
+    parser.add_argument('--workers', type=int, default=4)
+    parser.add_argument('--error-rate', type=float, default=0.0)
+    parser.add_argument('--throttle-rate', type=float, default=0.0)
+    parser.add_argument('--loader', choices=('count', 'duckdb'), default='count')
+    parser.add_argument('--stream-format', choices=('rows', 'compact'), default='rows')
+    parser.add_argument(
+        '--pyramid-tiers', default='500,2500,10000', help="'' disables the tiers"
+    )
+    args = parser.parse_args()
+
+    port = _free_port()
+    base_url = f'http://127.0.0.1:{port}'
+    # Generous limits: the benchmark measures the pipeline, not the API budget
+    requests_needed = args.activities + 10
+    stub = subprocess.Popen(  # nosec B603: fixed command line
+        [
+            sys.executable,
+            '-m',
+            'benchmarks.strava_stub_server',
+            f'--port={port}',
+            f'--activities={args.activities}',
+            f'--points={args.points}',
+            f'--latency-ms={args.latency_ms}',
+            f'--short-limit={max(200, 2 * requests_needed)}',
+            f'--daily-limit={max(2_000, 2 * requests_needed)}',
+            f'--error-rate={args.error_rate}',
+            f'--throttle-rate={args.throttle_rate}',
+        ],
+        stdout=subprocess.DEVNULL,
+    )
+    try:
+        with tempfile.TemporaryDirectory() as state_dir:
+            # The pipeline reads its configuration at import time
+            os.environ.update({
+                'STRAVA_API_BASE_URL': f'{base_url}/api/v3',
+                'STRAVA_AUTH_URL': f'{base_url}/oauth/token',
+                'STRAVA_CLIENT_ID': 'bench',
+                'STRAVA_CLIENT_SECRET': 'bench',
+                'STRAVA_REFRESH_TOKEN': 'bench',
+                'STATE_STORE': 'json',
+                'STATE_DIR': state_dir,
+                'STREAM_FETCH_WORKERS': str(args.workers),
+                'STREAM_STORAGE_FORMAT': args.stream_format,
+                'STREAM_PYRAMID_TIERS': args.pyramid_tiers,
+            })
+            os.environ.pop('RUN_LOG_TABLE', None)
+            from ingestion.pipelines import strava_pipeline
+
+            # No dbt job to trigger locally
+            strava_pipeline.trigger_dbt_job = lambda select=None: None
+
+            _wait_until_up(f'{base_url}/oauth/token')
+            loader: BaseLoader = CountingLoader()
+            if args.loader == 'duckdb':
+                loader = DuckDBLoader(os.path.join(state_dir, 'warehouse'))
+            start = time.perf_counter()
+            metrics = strava_pipeline.run(loader=loader)
+            elapsed = time.perf_counter() - start
+            rows = _loaded_rows(loader)
+    finally:
+        stub.terminate()
+        stub.wait()
+
+    activities = rows.get(strava_pipeline.TABLE_NAME_RAW_ACTIVITIES, 0)
+    stream_rows = rows.get(
+        strava_pipeline.TABLE_NAME_RAW_ACTIVITY_STREAMS, 0
+    ) + rows.get(strava_pipeline.TABLE_NAME_RAW_ACTIVITY_STREAMS_COMPACT, 0)
+    pyramid_rows = rows.get(strava_pipeline.TABLE_NAME_RAW_ACTIVITY_STREAM_PYRAMID, 0)
+    summary_rows = rows.get(strava_pipeline.TABLE_NAME_RAW_ACTIVITY_STREAM_SUMMARY, 0)
+    curve_rows = rows.get(strava_pipeline.TABLE_NAME_RAW_ACTIVITY_STREAM_CURVES, 0)
+    effort_rows = rows.get(strava_pipeline.TABLE_NAME_RAW_ACTIVITY_BEST_EFFORTS, 0)
+    api_calls = sum(
+        stage.calls for name, stage in metrics.stages.items() if name.startswith('api.')
+    )
+    print()
+    print(
+        f'run status: {metrics.status}; {activities} activities, '
+        f'{stream_rows:,} stream rows, {pyramid_rows:,} pyramid rows, '
+        f'{summary_rows:,} summary rows, {curve_rows:,} curve rows, '
+        f'{effort_rows:,} best-effort rows, '
+        f'{api_calls} API calls in {elapsed:.2f}s'
+    )
+    print(f'activities/s:    {activities / elapsed:12,.1f}')
+    print(f'stream rows/s:   {stream_rows / elapsed:12,.0f}')
+    print(f'peak RSS:        {_peak_rss_mb():12,.1f} MB')
+    if metrics.status != 'succeeded':
+        raise SystemExit(1)
+
+
+if __name__ == '__main__':
+    main()
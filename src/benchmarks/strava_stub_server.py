@@ -0,0 +1,259 @@
+"""Local stand-in for the Strava API serving synthetic data.
+
+Serves the endpoints of `StravaEndpoints` plus the OAuth token refresh, with
+configurable latency, rate-limit headers and injected 429/5xx responses. Point the
+pipeline at it via `STRAVA_API_BASE_URL` and `STRAVA_AUTH_URL`.
+
+Usage (from `src/`):
+    python -m benchmarks.strava_stub_server --port 8765 --activities 200
+
+A 429 makes the extractor wait for the next quarter-hour window, as with the real
+API, so keep `--throttle-rate` at 0 for throughput measurements.
+"""
+
+import argparse
+from dataclasses import dataclass
+from datetime import datetime, timedelta, timezone
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+import json
+import random
+import re
+import threading
+import time
+from typing import Any, Optional
+from urllib.parse import parse_qs, urlparse
+
+from benchmarks.synthetic_data import (
+    make_activity,
+    make_athlete,
+    make_gear,
+    make_streams,
+)
+
+
+API_PREFIX = '/api/v3'
+TOKEN_PATH = '/oauth/token'  # nosec B105: URL path, not a password
+ACTIVITY_PATH = re.compile(rf'^{API_PREFIX}/activities/(\d+)$')
+STREAMS_PATH = re.compile(rf'^{API_PREFIX}/activities/(\d+)/streams$')
+GEAR_PATH = re.compile(rf'^{API_PREFIX}/gear/([\w-]+)$')
+
+
+@dataclass
+class StubConfig:
+    """Synthetic data set and simulated API behaviour."""
+
+    num_activities: int = 100
+    points_per_activity: int = 3_600
+    num_gear: int = 3
+    latency_s: float = 0.05
+    short_limit: int = 200
+    daily_limit: int = 2_000
+    throttle_rate: float = 0.0  # share of requests answered with 429
+    error_rate: float = 0.0  # share of requests answered with 503
+    stream_variants: int = 4  # distinct stream payloads, reused across activities
+    seed: int = 0
+
+
+class StubState:
+    """Pre-rendered payloads and the rate-limit usage of the stub."""
+
+    def __init__(self, config: StubConfig) -> None:
+        self.config = config
+        self.rng = random.Random(config.seed)  # nosec B311: synthetic test data
+        self.lock = threading.Lock()
+        self.short_usage = 0
+        self.daily_usage = 0
+        self.requests = 0
+        self._short_window = int(time.time() // 900)
+
+        # Activities spread over the last two days, newest first like Strava
+        now = datetime.now(timezone.utc).replace(microsecond=0)
+        step = timedelta(days=2) / max(1, config.num_activities)
+        self.gear_ids = [f'b{i}' for i in range(config.num_gear)]
+        self.activities = [
+            make_activity(
+                activity_id=1_000 + i,
+                start_date=now - step * (i + 1),
+                num_points=config.points_per_activity,
+                gear_id=self.gear_ids[i % config.num_gear],
+            )
+            for i in range(config.num_activities)
+        ]
+        self.activities_by_id = {a['id']: a for a in self.activities}
+        self.start_epochs = [
+            int((now - step * (i + 1)).timestamp())
+            for i in range(config.num_activities)
+        ]
+        # Rendering streams is expensive, so a few JSON bodies are reused
+        self.streams = [
+            json.dumps(make_streams(config.points_per_activity, seed=i)).encode()
+            for i in range(config.stream_variants)
+        ]
+
+    def take_slot(self) -> tuple[Optional[int], dict[str, str]]:
+        """Counts a request and returns the simulated status and rate headers."""
+        config = self.config
+        with self.lock:
+            window = int(time.time() // 900)
+            if window != self._short_window:
+                self._short_window, self.short_usage = window, 0
+            self.requests += 1
+            self.short_usage += 1
+            self.daily_usage += 1
+            headers = {
+                'X-RateLimit-Limit': f'{config.short_limit},{config.daily_limit}',
+                'X-RateLimit-Usage': f'{self.short_usage},{self.daily_usage}',
+            }
+            exceeded = (
+                self.short_usage > config.short_limit
+                or self.daily_usage > config.daily_limit
+            )
+            roll = self.rng.random()
+        if exceeded or roll < config.throttle_rate:
+            return 429, headers
+        if roll < config.throttle_rate + config.error_rate:
+            return 503, headers
+        return None, headers
+
+    def activities_page(self, query: dict[str, list[str]]) -> list[dict[str, Any]]:
+        """Filters by `after`/`before` (epoch seconds) and paginates."""
+        after = int(query.get('after', ['0'])[0])
+        before = int(query.get('before', [str(2**40)])[0])
+        page = int(query.get('page', ['1'])[0])
+        per_page = int(query.get('per_page', ['30'])[0])
+        selected = [
+            activity
+            for activity, started in zip(self.activities, self.start_epochs)
+            if after < started < before
+        ]
+        return selected[(page - 1) * per_page : page * per_page]
+
+
+class StubHandler(BaseHTTPRequestHandler):
+    """Answers Strava API requests from the shared `StubState`."""
+
+    state: StubState
+    protocol_version = 'HTTP/1.1'  # keep-alive, like the real API
+
+    def log_message(self, format: str, *args: Any) -> None:
+        """Silences the per-request access log."""
+
+    def _send(
+        self, status: int, body: bytes, headers: Optional[dict[str, str]] = None
+    ) -> None:
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(body)))
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(body)
+
+    def _send_json(
+        self, status: int, payload: Any, headers: Optional[dict[str, str]] = None
+    ) -> None:
+        self._send(status, json.dumps(payload).encode(), headers)
+
+    def do_POST(self) -> None:
+        """Token refresh."""
+        length = int(self.headers.get('Content-Length', 0))
+        self.rfile.read(length)
+        if urlparse(self.path).path != TOKEN_PATH:
+            self._send_json(404, {'message': 'Record Not Found'})
+            return
+        self._send_json(
+            200,
+            {
+                'token_type': 'Bearer',
+                'access_token': f'stub-access-{time.time_ns()}',
+                'refresh_token': 'stub-refresh',
+                'expires_at': int(time.time()) + 6 * 3600,
+                'expires_in': 6 * 3600,
+            },
+        )
+
+    def do_GET(self) -> None:
+        """API endpoints used by the extractor."""
+        state = self.state
+        url = urlparse(self.path)
+        status, headers = state.take_slot()
+        time.sleep(state.config.latency_s)
+        if status == 429:
+            self._send_json(429, {'message': 'Rate Limit Exceeded'}, headers)
+            return
+        if status is not None:
+            self._send_json(status, {'message': 'Service Unavailable'}, headers)
+            return
+
+        if url.path == f'{API_PREFIX}/athlete':
+            self._send_json(200, make_athlete(), headers)
+        elif url.path == f'{API_PREFIX}/athlete/activities':
+            self._send_json(200, state.activities_page(parse_qs(url.query)), headers)
+        elif match := ACTIVITY_PATH.match(url.path):
+            activity = state.activities_by_id.get(int(match.group(1)))
+            if activity is None:
+                self._send_json(404, {'message': 'Record Not Found'}, headers)
+            else:
+                self._send_json(200, activity, headers)
+        elif match := STREAMS_PATH.match(url.path):
+            activity_id = int(match.group(1))
+            if activity_id not in state.activities_by_id:
+                self._send_json(404, {'message': 'Record Not Found'}, headers)
+            else:
+                body = state.streams[activity_id % len(state.streams)]
+                self._send(200, body, headers)
+        elif match := GEAR_PATH.match(url.path):
+            self._send_json(200, make_gear(match.group(1)), headers)
+        else:
+            self._send_json(404, {'message': 'Record Not Found'}, headers)
+
+
+def make_server(
+    config: StubConfig, host: str = '127.0.0.1', port: int = 0
+) -> ThreadingHTTPServer:
+    """Creates the stub server; port 0 picks a free port."""
+    handler = type('BoundStubHandler', (StubHandler,), {'state': StubState(config)})
+    server = ThreadingHTTPServer((host, port), handler)
+    server.daemon_threads = True
+    return server
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8765)
+    parser.add_argument('--activities', type=int, default=100)
+    parser.add_argument('--points', type=int, default=3_600, help='1 Hz samples')
+    parser.add_argument('--gear', type=int, default=3)
+    parser.add_argument('--latency-ms', type=float, default=50)
+    parser.add_argument('--short-limit', type=int, default=200)
+    parser.add_argument('--daily-limit', type=int, default=2_000)
+    parser.add_argument('--throttle-rate', type=float, default=0.0)
+    parser.add_argument('--error-rate', type=float, default=0.0)
+    args = parser.parse_args()
+
+    config = StubConfig(
+        num_activities=args.activities,
+        points_per_activity=args.points,
+        num_gear=args.gear,
+        latency_s=args.latency_ms / 1000,
+        short_limit=args.short_limit,
+        daily_limit=args.daily_limit,
+        throttle_rate=args.throttle_rate,
+        error_rate=args.error_rate,
+    )
+    server = make_server(config, args.host, args.port)
+    host, port = server.server_address[:2]
+    if isinstance(host, bytes):
+        host = host.decode()
+    print(f'Strava stub listening on http://{host}:{port}{API_PREFIX}', flush=True)
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,129 @@
+"""Synthetic Strava payloads for benchmarks and local runs."""
+
+from datetime import datetime
+import math
+import random
+from typing import Any
+
+
+def make_streams(num_points: int, seed: int = 0) -> dict[str, Any]:
+    """Builds a `key_by_type` streams response for a 1 Hz activity.
+
+    Contains the 11 stream types requested by `fetch_activity_streams`, with the
+    JSON value types Strava returns for each of them.
+    """
+    rng = random.Random(seed)  # nosec B311: synthetic test data
+    time_s = list(range(num_points))
+    distance, lat, lng, altitude = 0.0, 48.137, 11.575, 520.0
+    data: dict[str, list[Any]] = {
+        key: []
+        for key in (
+            'distance',
+            'latlng',
+            'altitude',
+            'velocity_smooth',
+            'heartrate',
+            'cadence',
+            'watts',
+            'temp',
+            'moving',
+            'grade_smooth',
+        )
+    }
+    for i in time_s:
+        velocity = round(8.0 + 2.0 * math.sin(i / 300) + rng.uniform(-0.5, 0.5), 3)
+        grade = round(3.0 * math.sin(i / 500), 1)
+        distance = round(distance + velocity, 1)
+        altitude = round(altitude + velocity * grade / 100, 1)
+        lat = round(lat + velocity * 6e-6, 6)
+        lng = round(lng + velocity * 4e-6, 6)
+
+        data['distance'].append(distance)
+        data['latlng'].append([lat, lng])
+        data['altitude'].append(altitude)
+        data['velocity_smooth'].append(velocity)
+        data['heartrate'].append(int(140 + 15 * math.sin(i / 900) + rng.randint(-3, 3)))
+        data['cadence'].append(int(88 + rng.randint(-4, 4)))
+        data['watts'].append(int(max(0, 210 + 40 * grade + rng.randint(-25, 25))))
+        data['temp'].append(21)
+        data['moving'].append(velocity > 0.5)
+        data['grade_smooth'].append(grade)
+
+    streams = {'time': time_s, **data}
+    return {
+        key: {'data': values, 'original_size': num_points, 'resolution': 'high'}
+        for key, values in streams.items()
+    }
+
+
+def make_athlete(athlete_id: int = 1) -> dict[str, Any]:
+    """Builds an `/athlete` response."""
+    return {
+        'id': athlete_id,
+        'username': f'athlete{athlete_id}',
+        'resource_state': 3,
+        'firstname': 'Bench',
+        'lastname': 'Mark',
+        'city': 'Munich',
+        'country': 'Germany',
+        'sex': 'M',
+        'premium': True,
+        'created_at': '2015-01-01T00:00:00Z',
+        'updated_at': '2024-01-01T00:00:00Z',
+        'weight': 70.0,
+    }
+
+
+def make_activity(
+    activity_id: int, start_date: datetime, num_points: int, gear_id: str
+) -> dict[str, Any]:
+    """Builds one summary activity as returned by `/athlete/activities`."""
+    distance = round(num_points * 8.0, 1)
+    return {
+        'resource_state': 2,
+        'athlete': {'id': 1, 'resource_state': 1},
+        'name': f'Ride {activity_id}',
+        'distance': distance,
+        'moving_time': num_points,
+        'elapsed_time': num_points + 60,
+        'total_elevation_gain': 120.0,
+        'type': 'Ride',
+        'sport_type': 'Ride',
+        'id': activity_id,
+        'start_date': start_date.strftime('%Y-%m-%dT%H:%M:%SZ'),
+        'start_date_local': start_date.strftime('%Y-%m-%dT%H:%M:%SZ'),
+        'timezone': '(GMT+01:00) Europe/Berlin',
+        'utc_offset': 3600.0,
+        'kudos_count': 3,
+        'trainer': False,
+        'commute': False,
+        'manual': False,
+        'private': False,
+        'visibility': 'everyone',
+        'gear_id': gear_id,
+        'start_latlng': [48.137, 11.575],
+        'end_latlng': [48.2, 11.6],
+        'map': {'id': f'a{activity_id}', 'summary_polyline': '', 'resource_state': 2},
+        'average_speed': 8.0,
+        'max_speed': 12.5,
+        'has_heartrate': True,
+        'average_heartrate': 140.0,
+        'max_heartrate': 172.0,
+        'average_watts': 210.0,
+        'kilojoules': round(num_points * 0.21, 1),
+    }
+
+
+def make_gear(gear_id: str) -> dict[str, Any]:
+    """Builds a `/gear/{id}` response."""
+    return {
+        'id': gear_id,
+        'primary': gear_id.endswith('0'),
+        'name': f'Bike {gear_id}',
+        'nickname': f'Bike {gear_id}',
+        'resource_state': 3,
+        'retired': False,
+        'distance': 1_234_567,
+        'converted_distance': 1234.6,
+        'brand_name': 'Generic',
+    }
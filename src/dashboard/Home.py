@@ -1,12 +1,18 @@
 """Home page for the Athlete Dashboard."""
 
-from queries import load_activities_current_week
+from queries import (
+    load_activities_current_week,
+    load_athlete_data,
+    load_training_load_daily,
+    viewer_email,
+)
 import streamlit as st
 from ui.activity_list import render_activity_list
 from ui.consistency import compute_weekly_multisport_stats, show_consistency_heatmap
 from ui.formatters import fmt_hours_hhmm
 from ui.visualization_charts import (
     render_distribution_donut,
+    render_training_load_chart,
     render_weekly_hours_chart,
     render_weekly_hours_per_sport_chart,
 )
@@ -63,6 +69,17 @@ weekly_sport_chart = render_weekly_hours_per_sport_chart(
 all4_cov, all4_current, delta_weeks = compute_weekly_multisport_stats()
 
 
+# --------------------------------------------------
+# Training load (fitness, fatigue and form)
+# --------------------------------------------------
+df_athlete = load_athlete_data(viewer_email())
+df_training_load = (
+    load_training_load_daily(int(df_athlete.iloc[0]['athlete_id']))
+    if not df_athlete.empty
+    else df_athlete
+)
+
+
 # ----------------------
 # Dashboard Layout
 # ----------------------
@@ -115,6 +132,16 @@ with st.container(border=True):
     # -------------------------------
     show_consistency_heatmap()
 
+    # -----------------------------------
+    # Row 4: Training load (ATL/CTL/TSB)
+    # -----------------------------------
+    if not df_training_load.empty:
+        st.altair_chart(
+            render_training_load_chart(
+                df_training_load, title='Fitness, fatigue and form - last 180 days'
+            )
+        )
+
 # --------------------------------------------------
 # Weekly activities at the bottom (Master–Detail)
 # --------------------------------------------------
@@ -1,6 +1,7 @@
 from queries import load_athlete_data, viewer_email
 import streamlit as st
 from ui.formatters import fmt_date, fmt_dt, fmt_str, fmt_weight
+from ui.performance_curves import show_performance_curves
 from utilities.auth import logout_button, require_login
 
 
@@ -137,7 +138,7 @@ st.divider()
 # -------------------------
 # Details section (tabs + columns)
 # -------------------------
-tab_profile, tab_account = st.tabs(['Profile', 'Account'])
+tab_profile, tab_account, tab_curves = st.tabs(['Profile', 'Account', 'Curves'])
 
 with tab_profile:
     colA, colB = st.columns(2)
@@ -166,5 +167,9 @@ with tab_account:
         st.write(f'**Athlete ID:** {fmt_str(athlete.get("athlete_id"))}')
         st.write(f'**Username:** @{username}')
 
+with tab_curves:
+    if athlete.get('athlete_id') is not None:
+        show_performance_curves(int(athlete['athlete_id']))
+
 st.divider()
 st.caption(f'Data last loaded at: {fmt_dt(athlete.get("mart_loaded_at"))}')
@@ -20,6 +20,7 @@ _GCP_PROJECT_ID = os.getenv('GCP_PROJECT_ID')
 _BQ_DATASET_MARTS = os.getenv('BIGQUERY_DATASET_MARTS')
 LOCATION = 'us-central1'
 TABLE_ID = 'fct_activities'
+SUMMARY_TABLE_ID = 'fct_activity_summary'
 
 vertexai.init(project=_GCP_PROJECT_ID, location=LOCATION)
 bq_client = bigquery.Client(project=_GCP_PROJECT_ID)
@@ -77,7 +78,7 @@ sql_declaration = FunctionDeclaration(
         'properties': {
             'query': {
                 'type': 'string',
-                'description': f'The SQL query to run. The table is `{_GCP_PROJECT_ID}.{_BQ_DATASET_MARTS}.{TABLE_ID}`',
+                'description': f'The SQL query to run. The tables are `{_GCP_PROJECT_ID}.{_BQ_DATASET_MARTS}.{TABLE_ID}` and `{_GCP_PROJECT_ID}.{_BQ_DATASET_MARTS}.{SUMMARY_TABLE_ID}`',
             }
         },
         'required': ['query'],
@@ -120,6 +121,16 @@ The table `{_GCP_PROJECT_ID}.{_BQ_DATASET_MARTS}.{TABLE_ID}` contains triathlon
 - avg_watts / max_watts / weighted_watts (FLOAT): Power metrics for Cycling.
 - is_commute / is_trainer (BOOLEAN): Flags for indoor or transport activities.
 - has_heartrate (BOOLEAN): Whether HR data is available.
+
+The table `{_GCP_PROJECT_ID}.{_BQ_DATASET_MARTS}.{SUMMARY_TABLE_ID}` summarizes the recorded streams with one row per activity (join on activity_id):
+
+- moving_s (INTEGER) / moving_ratio (FLOAT): Moving seconds and their share of the elapsed time.
+- hr_zone_s (ARRAY<INTEGER>): Moving seconds in heart-rate zones Z1..Z5 (index 0 = Z1), empty without heart rate or max HR.
+- power_zone_s (ARRAY<INTEGER>): Moving seconds in power zones Z1..Z7 (index 0 = Z1), empty without power or FTP.
+- heartrate_percentiles / cadence_percentiles / watts_percentiles / velocity_percentiles (ARRAY<FLOAT>): 5th, 25th, 50th, 75th and 95th percentile (velocity in m/s).
+- normalized_power_w (FLOAT): Normalized power for Cycling.
+- hr_drift_pct (FLOAT): Rise of the heart rate from the first to the second half, in percent.
+- decoupling_pct (FLOAT): Aerobic decoupling (power or speed per heartbeat, first vs. second half), in percent; below 5 indicates good aerobic endurance.
 """
 
 # Gemini System Instruction: We give it the schema and rules for analysis and SQL generation
@@ -2,12 +2,16 @@
 
 import os
 import re
+from typing import Literal
 
 from dotenv import load_dotenv
 from google.cloud import bigquery
 from google.oauth2 import service_account
+import numpy as np
 import pandas as pd
 import streamlit as st
+from utilities.downsampling import downsample
+from utilities.stream_codecs import STREAM_COLUMNS, decode_compact_streams
 
 
 load_dotenv()
@@ -20,6 +24,12 @@ _ALLOWED_TABLES = {
     'dim_gear',
     'fct_activities',
     'fct_activity_streams',
+    'fct_activity_streams_compact',
+    'fct_activity_stream_pyramid',
+    'fct_activity_summary',
+    'fct_curve_envelope',
+    'fct_personal_records',
+    'fct_training_load_daily',
     'fct_activities_weekly',
     'fct_consistency_weekly',
     'fct_consistency_multisport_weekly',
@@ -28,6 +38,26 @@ _ID_RE = re.compile(r'^[A-Za-z0-9_]+$')
 
 _GCP_PROJECT_ID = os.getenv('GCP_PROJECT_ID')
 _BQ_DATASET_MARTS = os.getenv('BIGQUERY_DATASET_MARTS')
+# 'compact' reads the encoded streams mart (dbt var compact_streams)
+_STREAM_STORAGE_FORMAT = os.getenv('STREAM_STORAGE_FORMAT', 'rows')
+# Downsampled stream tiers of the ingestion ('' if disabled, dbt var stream_pyramid)
+_STREAM_PYRAMID = bool(os.getenv('STREAM_PYRAMID_TIERS', '500,2500,10000').strip())
+# Columns of load_activity_streams, and the series it downsamples
+_STREAM_CHART_COLUMNS = [
+    'sequence_index',
+    'time_s',
+    'distance_m',
+    'heartrate_bpm',
+    'velocity_smooth_mps',
+    'altitude_m',
+    'cadence_rpm',
+]
+_STREAM_CHART_SERIES = [
+    'heartrate_bpm',
+    'velocity_smooth_mps',
+    'altitude_m',
+    'cadence_rpm',
+]
 
 
 # -------------
@@ -132,11 +162,43 @@ def load_activities_weekly(
 
 
 @st.cache_data(ttl=3600, show_spinner=False)  # type: ignore[misc]
-def load_activity_streams(activity_id: int, viewer_email: str = '') -> pd.DataFrame:
-    """Load time-series streams for a single activity."""
+def load_activity_streams(
+    activity_id: int,
+    max_points: int | None = None,
+    aggregate: Literal['minmax', 'mean'] = 'minmax',
+    start_s: float | None = None,
+    end_s: float | None = None,
+    start_m: float | None = None,
+    end_m: float | None = None,
+    viewer_email: str = '',
+) -> pd.DataFrame:
+    """Load time-series streams for a single activity.
+
+    With `max_points`, BigQuery buckets the points by sequence_index and returns
+    about `max_points` rows: per bucket the rows with the lowest and highest value
+    of each stream ('minmax'), or one row of bucket means ('mean'). A time
+    (`start_s`/`end_s`, elapsed seconds) or distance window (`start_m`/`end_m`)
+    limits the points first.
+    """
     client = get_bq_client()
+    if _STREAM_STORAGE_FORMAT == 'compact':
+        df = _load_activity_streams_compact(client, activity_id, _STREAM_CHART_COLUMNS)
+        return _window_and_downsample(
+            df, max_points, aggregate, start_s, end_s, start_m, end_m
+        )
+
     table_fqn = _table('fct_activity_streams')
-    query = f"""
+    job_config = bigquery.QueryJobConfig(
+        query_parameters=[
+            bigquery.ScalarQueryParameter('activity_id', 'INT64', activity_id),
+            bigquery.ScalarQueryParameter('start_s', 'FLOAT64', start_s),
+            bigquery.ScalarQueryParameter('end_s', 'FLOAT64', end_s),
+            bigquery.ScalarQueryParameter('start_m', 'FLOAT64', start_m),
+            bigquery.ScalarQueryParameter('end_m', 'FLOAT64', end_m),
+            bigquery.ScalarQueryParameter('max_points', 'INT64', max_points),
+        ]
+    )
+    points = f"""
         SELECT
             sequence_index,
             time_s,
@@ -147,9 +209,195 @@ def load_activity_streams(activity_id: int, viewer_email: str = '') -> pd.DataFr
             cadence_rpm
         FROM {table_fqn}
         WHERE activity_id = @activity_id
+          AND (@start_s IS NULL OR time_s >= @start_s)
+          AND (@end_s IS NULL OR time_s <= @end_s)
+          AND (@start_m IS NULL OR distance_m >= @start_m)
+          AND (@end_m IS NULL OR distance_m <= @end_m)
+    """  # nosec B608: table_fqn is built from allowlisted identifiers only
+
+    if max_points is None:
+        query = f'{points} ORDER BY sequence_index'
+        return client.query(query, job_config=job_config).to_dataframe()
+
+    if aggregate == 'mean':
+        # One row per bucket: the means of the bucket's points
+        num_buckets = '@max_points'
+        selected = """
+            SELECT
+                MIN(sequence_index) AS sequence_index,
+                AVG(time_s) AS time_s,
+                AVG(distance_m) AS distance_m,
+                AVG(heartrate_bpm) AS heartrate_bpm,
+                AVG(velocity_smooth_mps) AS velocity_smooth_mps,
+                AVG(altitude_m) AS altitude_m,
+                AVG(cadence_rpm) AS cadence_rpm
+            FROM buckets
+            GROUP BY bucket
+        """
+    else:
+        # Up to two rows per stream and bucket: its lowest and highest point
+        num_buckets = f'DIV(@max_points, {2 * len(_STREAM_CHART_SERIES)})'
+        extremes = ' OR '.join(
+            f'ROW_NUMBER() OVER (PARTITION BY bucket ORDER BY {col} {order}) = 1'
+            for col in _STREAM_CHART_SERIES
+            for order in ('ASC NULLS LAST', 'DESC NULLS LAST')
+        )
+        selected = f"""
+            SELECT * EXCEPT (bucket)
+            FROM buckets
+            QUALIFY ROW_NUMBER() OVER (PARTITION BY bucket ORDER BY sequence_index) = 1
+                OR {extremes}
+        """  # nosec B608: built from the fixed stream columns only
+    query = f"""
+        WITH points AS ({points}),
+        buckets AS (
+            SELECT
+                *,
+                DIV(
+                    ROW_NUMBER() OVER (ORDER BY sequence_index) - 1,
+                    CAST(CEIL(COUNT(*) OVER () / GREATEST({num_buckets}, 1)) AS INT64)
+                ) AS bucket
+            FROM points
+        )
+        {selected}
         ORDER BY sequence_index
     """  # nosec B608: table_fqn is built from allowlisted identifiers only
 
+    return client.query(query, job_config=job_config).to_dataframe()
+
+
+def _window_and_downsample(
+    df: pd.DataFrame,
+    max_points: int | None,
+    aggregate: Literal['minmax', 'mean'],
+    start_s: float | None,
+    end_s: float | None,
+    start_m: float | None,
+    end_m: float | None,
+) -> pd.DataFrame:
+    """The window and downsampling of `load_activity_streams`, on decoded streams."""
+    for col, low, high in (('time_s', start_s, end_s), ('distance_m', start_m, end_m)):
+        if low is not None:
+            df = df[df[col] >= low]
+        if high is not None:
+            df = df[df[col] <= high]
+    df = df.reset_index(drop=True)
+    if max_points is None or len(df) <= max_points:
+        return df
+    if aggregate == 'mean':
+        buckets = np.arange(len(df)) // -(-len(df) // max_points)
+        means = df.drop(columns='sequence_index').groupby(buckets).mean()
+        means.insert(0, 'sequence_index', df['sequence_index'].groupby(buckets).min())
+        return means.reset_index(drop=True)
+    return downsample(df, 'sequence_index', _STREAM_CHART_SERIES, max_points)
+
+
+def _load_activity_streams_compact(
+    client: bigquery.Client, activity_id: int, columns: list[str]
+) -> pd.DataFrame:
+    """Load the compact streams of an activity and decode them locally."""
+    table_fqn = _table('fct_activity_streams_compact')
+    stream_types = [k for k, v in STREAM_COLUMNS.items() if v in columns]
+    query = f"""
+        SELECT
+            stream_type,
+            value_type,
+            scale,
+            num_points,
+            sequence_index,
+            values_delta
+        FROM {table_fqn}
+        WHERE activity_id = @activity_id
+          AND stream_type IN UNNEST(@stream_types)
+    """  # nosec B608: table_fqn is built from allowlisted identifiers only
+
+    job_config = bigquery.QueryJobConfig(
+        query_parameters=[
+            bigquery.ScalarQueryParameter('activity_id', 'INT64', activity_id),
+            bigquery.ArrayQueryParameter('stream_types', 'STRING', stream_types),
+        ]
+    )
+
+    compact = client.query(query, job_config=job_config).to_dataframe()
+    return decode_compact_streams(compact).reindex(columns=columns)
+
+
+@st.cache_data(ttl=3600, show_spinner=False)  # type: ignore[misc]
+def load_activity_stream_tier(
+    activity_id: int,
+    max_points: int,
+    start_s: float | None = None,
+    end_s: float | None = None,
+    viewer_email: str = '',
+) -> pd.DataFrame:
+    """Load the coarsest precomputed stream tier with about `max_points` in the range.
+
+    A zoom range (`start_s`/`end_s` in elapsed seconds) selects a finer tier.
+    Returns the columns of `load_activity_streams`; streams only have values at
+    their own envelope points. Empty if the activity has no tiers (yet).
+    """
+    columns = _STREAM_CHART_COLUMNS
+    if not _STREAM_PYRAMID:
+        return pd.DataFrame(columns=columns)
+
+    client = get_bq_client()
+    table_fqn = _table('fct_activity_stream_pyramid')
+    query = f"""
+        WITH points AS (
+            SELECT
+                *,
+                (@start_s IS NULL OR time_s >= @start_s)
+                AND (@end_s IS NULL OR time_s <= @end_s) AS in_range
+            FROM {table_fqn}
+            WHERE activity_id = @activity_id
+        ),
+        chosen AS (
+            -- Coarsest tier with max_points in the range at its density, else the finest
+            SELECT COALESCE(MIN(IF(tier * share >= @max_points, tier, NULL)), MAX(tier)) AS tier
+            FROM (
+                SELECT tier, COUNTIF(in_range) / COUNT(*) AS share
+                FROM points
+                GROUP BY tier
+            )
+        )
+        SELECT sequence_index, time_s, distance_m, stream_type, value
+        FROM points
+        JOIN chosen USING (tier)
+        WHERE in_range
+        ORDER BY sequence_index
+    """  # nosec B608: table_fqn is built from allowlisted identifiers only
+
+    job_config = bigquery.QueryJobConfig(
+        query_parameters=[
+            bigquery.ScalarQueryParameter('activity_id', 'INT64', activity_id),
+            bigquery.ScalarQueryParameter('max_points', 'INT64', max_points),
+            bigquery.ScalarQueryParameter('start_s', 'FLOAT64', start_s),
+            bigquery.ScalarQueryParameter('end_s', 'FLOAT64', end_s),
+        ]
+    )
+
+    points = client.query(query, job_config=job_config).to_dataframe()
+    if points.empty:
+        return pd.DataFrame(columns=columns)
+    wide = points.pivot(
+        index=['sequence_index', 'time_s', 'distance_m'],
+        columns='stream_type',
+        values='value',
+    ).rename(columns=STREAM_COLUMNS)
+    return wide.reset_index().reindex(columns=columns)
+
+
+@st.cache_data(ttl=3600, show_spinner=False)  # type: ignore[misc]
+def load_activity_summary(activity_id: int, viewer_email: str = '') -> pd.DataFrame:
+    """Load the stream summary of a single activity (one row, empty if missing)."""
+    client = get_bq_client()
+    table_fqn = _table('fct_activity_summary')
+    query = f"""
+        SELECT *
+        FROM {table_fqn}
+        WHERE activity_id = @activity_id
+    """  # nosec B608: table_fqn is built from allowlisted identifiers only
+
     job_config = bigquery.QueryJobConfig(
         query_parameters=[
             bigquery.ScalarQueryParameter('activity_id', 'INT64', activity_id)
@@ -159,6 +407,88 @@ def load_activity_streams(activity_id: int, viewer_email: str = '') -> pd.DataFr
     return client.query(query, job_config=job_config).to_dataframe()
 
 
+@st.cache_data(ttl=3600, show_spinner=False)  # type: ignore[misc]
+def load_curve_envelope(athlete_id: int, viewer_email: str = '') -> pd.DataFrame:
+    """Load the all-time and seasonal power and speed curve bests of an athlete."""
+    client = get_bq_client()
+    table_fqn = _table('fct_curve_envelope')
+    query = f"""
+        SELECT
+            discipline,
+            season,
+            curve,
+            duration_s,
+            value,
+            activity_id,
+            activity_date_local
+        FROM {table_fqn}
+        WHERE athlete_id = @athlete_id
+        ORDER BY discipline, season, curve, duration_s
+    """  # nosec B608: table_fqn is built from allowlisted identifiers only
+
+    job_config = bigquery.QueryJobConfig(
+        query_parameters=[
+            bigquery.ScalarQueryParameter('athlete_id', 'INT64', athlete_id)
+        ]
+    )
+
+    return client.query(query, job_config=job_config).to_dataframe()
+
+
+@st.cache_data(ttl=3600, show_spinner=False)  # type: ignore[misc]
+def load_personal_records(athlete_id: int, viewer_email: str = '') -> pd.DataFrame:
+    """Load the all-time and seasonal best-effort records of an athlete."""
+    client = get_bq_client()
+    table_fqn = _table('fct_personal_records')
+    query = f"""
+        SELECT
+            discipline,
+            season,
+            effort,
+            distance_m,
+            elapsed_s,
+            pace_min_per_km,
+            activity_id,
+            activity_date_local
+        FROM {table_fqn}
+        WHERE athlete_id = @athlete_id
+        ORDER BY discipline, season, distance_m
+    """  # nosec B608: table_fqn is built from allowlisted identifiers only
+
+    job_config = bigquery.QueryJobConfig(
+        query_parameters=[
+            bigquery.ScalarQueryParameter('athlete_id', 'INT64', athlete_id)
+        ]
+    )
+
+    return client.query(query, job_config=job_config).to_dataframe()
+
+
+@st.cache_data(ttl=3600, show_spinner=False)  # type: ignore[misc]
+def load_training_load_daily(
+    athlete_id: int, days: int = 180, viewer_email: str = ''
+) -> pd.DataFrame:
+    """Load the daily training load, ATL, CTL and TSB of the last `days` days."""
+    client = get_bq_client()
+    table_fqn = _table('fct_training_load_daily')
+    query = f"""
+        SELECT day, load, atl, ctl, tsb
+        FROM {table_fqn}
+        WHERE athlete_id = @athlete_id
+          AND day >= DATE_SUB(CURRENT_DATE('Europe/Berlin'), INTERVAL @days DAY)
+        ORDER BY day
+    """  # nosec B608: table_fqn is built from allowlisted identifiers only
+
+    job_config = bigquery.QueryJobConfig(
+        query_parameters=[
+            bigquery.ScalarQueryParameter('athlete_id', 'INT64', athlete_id),
+            bigquery.ScalarQueryParameter('days', 'INT64', days),
+        ]
+    )
+
+    return client.query(query, job_config=job_config).to_dataframe()
+
+
 @st.cache_data(ttl=900, show_spinner=False)  # type: ignore[misc]
 def load_activities_current_week(viewer_email: str = '') -> pd.DataFrame:
     """Loads activities for the current week (Mon-Sun) based on activity_date_local."""
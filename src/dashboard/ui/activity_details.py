@@ -2,18 +2,105 @@
 
 import altair as alt
 import pandas as pd
+from queries import (
+    load_activity_stream_tier,
+    load_activity_streams,
+    load_activity_summary,
+)
 import streamlit as st
+from ui.constants import (
+    CHART_DOWNSAMPLING,
+    CHART_MAX_POINTS,
+    CHART_POINTS,
+    CHART_STREAM_POINTS,
+)
 from ui.formatters import format_pace_min_per_km, format_seconds_to_hhmmss
+from utilities.downsampling import as_float, downsample
 
 
-def _downsample_streams(df: pd.DataFrame, max_points: int = 2500) -> pd.DataFrame:
-    """Downsample by row stride to keep charts fast."""
-    if df.empty:
-        return df
-    if len(df) <= max_points:
-        return df
-    step = max(1, len(df) // max_points)
-    return df.iloc[::step].reset_index(drop=True)
+def _prepare_streams(df_streams: pd.DataFrame) -> pd.DataFrame:
+    """Coerce stream columns to numbers and add the chart units."""
+    # Numeric arrays of the plotted columns only, instead of a copy of all columns
+    numeric_cols = [
+        'time_s',
+        'distance_m',
+        'heartrate_bpm',
+        'altitude_m',
+        'velocity_smooth_mps',
+        'cadence_rpm',
+    ]
+    columns = {
+        col: as_float(df_streams[col])
+        for col in numeric_cols
+        if col in df_streams.columns
+    }
+
+    # Derived fields
+    if 'distance_m' in columns:
+        columns['distance_km'] = columns['distance_m'] / 1000.0
+    if 'velocity_smooth_mps' in columns:
+        columns['speed_kph'] = columns['velocity_smooth_mps'] * 3.6
+    if 'time_s' in columns:
+        columns['time_min'] = columns['time_s'] / 60.0
+    return pd.DataFrame(columns, copy=False)
+
+
+def _render_zones(zone_s: list[int], title: str) -> None:
+    """Bar chart of the minutes spent in each zone."""
+    df_zones = pd.DataFrame({
+        'zone': [f'Z{i}' for i in range(1, len(zone_s) + 1)],
+        'minutes': [seconds / 60.0 for seconds in zone_s],
+    })
+    chart = (
+        alt
+        .Chart(df_zones)
+        .mark_bar()
+        .encode(
+            x=alt.X('zone', title='Zone', sort=None),
+            y=alt.Y('minutes', title='min'),
+            tooltip=[
+                alt.Tooltip('zone', title='Zone'),
+                alt.Tooltip('minutes', title='min', format='.1f'),
+            ],
+        )
+        .properties(title=title, height=180)
+    )
+    st.altair_chart(chart)
+
+
+def _render_summary(activity_id: int) -> None:
+    """Render zones, drift and decoupling from the precomputed stream summary."""
+    df_summary = load_activity_summary(activity_id)
+    if df_summary.empty:
+        return
+    summary = df_summary.iloc[0]
+
+    def fmt(value: float | None, unit: str) -> str:
+        return '–' if value is None or pd.isna(value) else f'{value:.1f} {unit}'
+
+    # None without elapsed time
+    moving_ratio = summary['moving_ratio']
+    if moving_ratio is not None and not pd.isna(moving_ratio):
+        moving_ratio *= 100
+
+    c1, c2, c3, c4 = st.columns(4)
+    with c1:
+        st.metric('Moving ratio', fmt(moving_ratio, '%'))
+    with c2:
+        st.metric('HR drift', fmt(summary['hr_drift_pct'], '%'))
+    with c3:
+        st.metric('Decoupling', fmt(summary['decoupling_pct'], '%'))
+    with c4:
+        st.metric('Normalized power', fmt(summary['normalized_power_w'], 'W'))
+
+    cL, cR = st.columns(2)
+    with cL:
+        if len(summary['hr_zone_s']):
+            _render_zones(list(summary['hr_zone_s']), 'Time in HR zones')
+    with cR:
+        if len(summary['power_zone_s']):
+            _render_zones(list(summary['power_zone_s']), 'Time in power zones')
+    st.divider()
 
 
 def render_activity_details(
@@ -54,44 +141,55 @@ def render_activity_details(
 
     st.divider()
 
+    # ---- Summary section ----
+    if activity_row.get('activity_id') is not None:
+        _render_summary(int(activity_row['activity_id']))
+
     # ---- Streams section ----
     if df_streams is None or df_streams.empty:
         st.info('No stream data available for this activity.')
         return
 
-    df = df_streams.copy()
-
-    # Ensure numeric types where present
-    numeric_cols = [
-        'time_s',
-        'distance_m',
-        'heartrate_bpm',
-        'altitude_m',
-        'velocity_smooth_mps',
-        'cadence_rpm',
-    ]
-    for col in numeric_cols:
-        if col in df.columns:
-            df[col] = pd.to_numeric(df[col], errors='coerce')
-
-    # Derived fields
-    if 'distance_m' in df.columns:
-        df['distance_km'] = df['distance_m'] / 1000.0
-    if 'velocity_smooth_mps' in df.columns:
-        df['speed_kph'] = df['velocity_smooth_mps'] * 3.6
-    if 'time_s' in df.columns:
-        df['time_min'] = df['time_s'] / 60.0
+    df = _prepare_streams(df_streams)
 
     if 'time_s' not in df.columns:
         st.warning('Stream data has no time axis (time_s).')
         return
 
-    df = df.dropna(subset=['time_s']).reset_index(drop=True)
-    df = _downsample_streams(df, max_points=2500)
+    if df['time_s'].hasnans:
+        df = df.dropna(subset=['time_s']).reset_index(drop=True)
 
     chart_tab, map_tab = st.tabs(['Charts', 'Map'])
 
     with chart_tab:
+        # A zoom range loads a finer precomputed tier of the streams, or the
+        # range's points bucketed by BigQuery if the activity has no tiers
+        activity_id = activity_row.get('activity_id')
+        end_min = float(df['time_min'].max())
+        if activity_id is not None and end_min > 0:
+            zoom = st.slider(
+                'Zoom (min)',
+                min_value=0.0,
+                max_value=end_min,
+                value=(0.0, end_min),
+                key=f'zoom_{activity_id}',
+            )
+            if zoom != (0.0, end_min):
+                df_zoom = load_activity_stream_tier(
+                    int(activity_id),
+                    CHART_MAX_POINTS,
+                    start_s=zoom[0] * 60.0,
+                    end_s=zoom[1] * 60.0,
+                )
+                if df_zoom.empty:
+                    df_zoom = load_activity_streams(
+                        int(activity_id),
+                        CHART_STREAM_POINTS,
+                        start_s=zoom[0] * 60.0,
+                        end_s=zoom[1] * 60.0,
+                    )
+                df = _prepare_streams(df_zoom)
+
         x_mode = st.radio(
             'X-axis',
             options=['Time (min)', 'Distance (km)'],
@@ -105,13 +203,20 @@ def render_activity_details(
             st.warning('Selected X-axis not available in stream data.')
             return
 
+        # One downsampling over all plotted series, so the charts share their rows
+        df_charts = downsample(
+            df, x_col, list(CHART_POINTS), CHART_POINTS, CHART_DOWNSAMPLING
+        )
+
         def line_chart(y_col: str, title: str, y_title: str) -> None:
-            if y_col not in df.columns or df[y_col].dropna().empty:
+            if y_col not in df_charts.columns or df_charts[y_col].dropna().empty:
                 st.caption(f'{title}: not available')
                 return
+            # Tiers only hold each stream at its own envelope points
+            df_chart = df_charts.dropna(subset=[y_col])
             chart = (
                 alt
-                .Chart(df)
+                .Chart(df_chart)
                 .mark_line()
                 .encode(
                     x=alt.X(x_col, title=x_mode),
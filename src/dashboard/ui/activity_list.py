@@ -3,10 +3,10 @@
 from typing import Optional
 
 import pandas as pd
-from queries import load_activity_streams
+from queries import load_activity_stream_tier, load_activity_streams
 import streamlit as st
 from ui.activity_details import render_activity_details
-from ui.constants import KPI_ICONS, PAGE_SIZE
+from ui.constants import CHART_MAX_POINTS, CHART_STREAM_POINTS, KPI_ICONS, PAGE_SIZE
 from ui.formatters import (
     format_pace_min_per_km,
     format_seconds_to_hhmmss,
@@ -20,6 +20,15 @@ from ui.routing import (
 from ui.visualization_charts import show_activity_map, sport_badge
 
 
+def _load_chart_streams(activity_id: int) -> pd.DataFrame:
+    """Load the stream tier matching the charts, or bucketed points if it has none."""
+    df_streams = load_activity_stream_tier(activity_id, CHART_MAX_POINTS)
+    if df_streams.empty:
+        # Activities ingested before the stream pyramid
+        df_streams = load_activity_streams(activity_id, CHART_STREAM_POINTS)
+    return df_streams
+
+
 def render_activity_list(
     df: pd.DataFrame,
     *,
@@ -118,7 +127,7 @@ def render_activity_list(
             if selected_activity_id == activity_id:
                 with st.container(border=True):
                     try:
-                        df_streams = load_activity_streams(activity_id)
+                        df_streams = _load_chart_streams(activity_id)
                     except Exception as e:
                         st.error(f'Failed to load activity streams: {e}')
                         df_streams = pd.DataFrame()
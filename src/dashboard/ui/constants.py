@@ -1,5 +1,8 @@
 """UI Constants for the Dashboard"""
 
+from typing import Literal
+
+
 # COLORS
 SPORT_COLORS: dict[str, str] = {
     'Run': '#DA5234',
@@ -48,3 +51,19 @@ KPI_ICONS: dict[str, str] = {
 
 # Pagination for activities list
 PAGE_SIZE: int = 10
+
+# Points per stream chart; two envelope points per pixel of a half-width chart
+CHART_MAX_POINTS: int = 1000
+# Rows of the streams bucketed by BigQuery for activities without stream tiers,
+# i.e. the lowest and highest points of the four chart series per bucket
+CHART_STREAM_POINTS: int = 4 * CHART_MAX_POINTS
+# Rows chosen per plotted column of the full-resolution streams; they are
+# downsampled once and the chosen rows merged, so all charts share their x-axis rows
+CHART_POINTS: dict[str, int] = {
+    'heartrate_bpm': 1000,
+    'speed_kph': 1000,
+    'altitude_m': 500,  # smooth, fewer points suffice
+    'cadence_rpm': 1000,
+}
+# 'minmax' (keeps spikes and dips) or 'lttb' (Largest-Triangle-Three-Buckets)
+CHART_DOWNSAMPLING: Literal['minmax', 'lttb'] = 'minmax'
@@ -0,0 +1,118 @@
+"""Mean-maximal power and best pace curves and personal records of an athlete."""
+
+import altair as alt
+import pandas as pd
+from queries import load_curve_envelope, load_personal_records
+import streamlit as st
+from ui.formatters import format_pace_min_per_km, format_seconds_to_hhmmss
+
+
+# -----------------------------
+# Configuration
+# -----------------------------
+SEASONS_SHOWN = 3  # all-time plus the latest seasons
+PACE_DISCIPLINES = {'Run', 'Swim'}  # shown as pace instead of speed
+EFFORT_LABELS = {
+    '400m': '400 m',
+    '1k': '1 km',
+    '5k': '5 km',
+    '10k': '10 km',
+    'half_marathon': 'Half marathon',
+    'marathon': 'Marathon',
+}
+
+
+# -----------------------------
+# Single-call orchestration
+# -----------------------------
+def show_performance_curves(athlete_id: int) -> None:
+    """Render the power and pace curves of the athlete for a chosen discipline."""
+    df_envelope = load_curve_envelope(athlete_id)
+    if df_envelope.empty:
+        st.info('No performance curves available yet.')
+        return
+
+    disciplines = sorted(df_envelope['discipline'].dropna().unique())
+    discipline = st.selectbox('Discipline', disciplines, key='curve_discipline')
+    df = prepare_curves(df_envelope[df_envelope['discipline'] == discipline])
+
+    power = df[df['curve'] == 'power']
+    if not power.empty:
+        st.altair_chart(
+            render_curve_chart(power, 'value', 'Power (W)', 'Mean-maximal power')
+        )
+    speed = df[df['curve'] == 'speed']
+    if not speed.empty:
+        if discipline in PACE_DISCIPLINES:
+            chart = render_curve_chart(
+                speed, 'pace_min_per_km', 'Pace (min/km)', 'Best pace', reverse=True
+            )
+        else:
+            chart = render_curve_chart(speed, 'speed_kph', 'Speed (km/h)', 'Best speed')
+        st.altair_chart(chart)
+
+    df_records = load_personal_records(athlete_id)
+    df_records = df_records[df_records['discipline'] == discipline]
+    if not df_records.empty:
+        st.markdown('**Personal records**')
+        st.dataframe(prepare_records(df_records), width='stretch', hide_index=True)
+
+
+# --------------------------------
+# Data preparation and rendering
+# --------------------------------
+def prepare_curves(df: pd.DataFrame) -> pd.DataFrame:
+    """Keep all-time and the latest seasons, and add display units."""
+    seasons = sorted(
+        (s for s in df['season'].unique() if s != 'all_time'), reverse=True
+    )[: SEASONS_SHOWN - 1]
+    df = df[df['season'].isin(['all_time', *seasons])].copy()
+    df['season'] = df['season'].replace({'all_time': 'All time'})
+    df['duration'] = df['duration_s'].astype(int).map(format_seconds_to_hhmmss)
+    df['speed_kph'] = df['value'] * 3.6
+    df['pace_min_per_km'] = (1000.0 / 60.0) / df['value'].where(df['value'] > 0)
+    df['pace'] = df['pace_min_per_km'].map(format_pace_min_per_km)
+    return df
+
+
+def render_curve_chart(
+    df: pd.DataFrame, y_col: str, y_title: str, title: str, reverse: bool = False
+) -> alt.Chart:
+    """Curve over the window duration (log scale), one line per season."""
+    return (
+        alt
+        .Chart(df)
+        .mark_line(point=True)
+        .encode(
+            x=alt.X('duration_s:Q', title='Duration (s)', scale=alt.Scale(type='log')),
+            y=alt.Y(f'{y_col}:Q', title=y_title, scale=alt.Scale(reverse=reverse)),
+            color=alt.Color('season:N', title='Season'),
+            tooltip=[
+                alt.Tooltip('season:N', title='Season'),
+                alt.Tooltip('duration:N', title='Duration'),
+                alt.Tooltip(f'{y_col}:Q', title=y_title, format='.1f'),
+                alt.Tooltip('pace:N', title='Pace (min/km)'),
+                alt.Tooltip('activity_date_local:T', title='Date'),
+            ],
+        )
+        .properties(title=title, height=280)
+    )
+
+
+def prepare_records(df: pd.DataFrame) -> pd.DataFrame:
+    """One row per distance with the all-time and latest season's record times."""
+    latest_season = max((s for s in df['season'] if s != 'all_time'), default=None)
+    df = df.sort_values('distance_m')
+    all_time = df[df['season'] == 'all_time'].set_index('effort')
+    table = pd.DataFrame({
+        'Distance': all_time.index.map(lambda e: EFFORT_LABELS.get(e, e)),
+        'Time': all_time['elapsed_s'].round().astype(int).map(format_seconds_to_hhmmss),
+        'Pace (min/km)': all_time['pace_min_per_km'].map(format_pace_min_per_km),
+        'Date': all_time['activity_date_local'],
+    })
+    if latest_season is not None:
+        season = df[df['season'] == latest_season].set_index('effort')['elapsed_s']
+        table[latest_season] = season.reindex(all_time.index).map(
+            lambda s: format_seconds_to_hhmmss(int(round(s))) if pd.notna(s) else ''
+        )
+    return table.reset_index(drop=True)
@@ -173,6 +173,44 @@ def render_distribution_donut(df: pd.DataFrame) -> alt.LayerChart:
     return chart
 
 
+# ------------------------------
+# Training load (ATL/CTL/TSB)
+# ------------------------------
+def render_training_load_chart(df: pd.DataFrame, title: str) -> alt.LayerChart:
+    """Render fitness (CTL) and fatigue (ATL) lines over form (TSB) bars."""
+    base = alt.Chart(df).encode(x=alt.X('day:T', title=None))
+    tooltip = [
+        alt.Tooltip('day:T', title='Day'),
+        alt.Tooltip('load:Q', title='Load', format='.0f'),
+        alt.Tooltip('ctl:Q', title='Fitness (CTL)', format='.1f'),
+        alt.Tooltip('atl:Q', title='Fatigue (ATL)', format='.1f'),
+        alt.Tooltip('tsb:Q', title='Form (TSB)', format='.1f'),
+    ]
+
+    form = base.mark_bar(opacity=0.4).encode(
+        y=alt.Y('tsb:Q', title='Load'),
+        color=alt.condition(
+            alt.datum.tsb >= 0, alt.value('#2E9E5B'), alt.value('#DA5234')
+        ),
+        tooltip=tooltip,
+    )
+    lines = (
+        base
+        .transform_fold(['ctl', 'atl'], as_=['metric', 'value'])
+        .mark_line()
+        .encode(
+            y=alt.Y('value:Q'),
+            color=alt.Color(
+                'metric:N',
+                scale=alt.Scale(domain=['ctl', 'atl'], range=['#1967D2', '#A75ABA']),
+                legend=alt.Legend(title=None, orient='top'),
+            ),
+            tooltip=tooltip,
+        )
+    )
+    return alt.layer(form, lines).properties(height=240, title=title)
+
+
 # --------------------------
 # Map rendering
 # --------------------------
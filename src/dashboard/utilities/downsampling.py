@@ -0,0 +1,116 @@
+"""This file downsamples activity streams for the charts, keeping their shape.
+
+Both methods split the rows into buckets of equal size and pick representative
+rows per bucket with one vectorized pass over a (buckets x bucket size) view:
+'minmax' keeps the lowest and highest point of every bucket, so spikes and dips
+survive; 'lttb' keeps the point spanning the largest triangle with the centroids
+of the neighbouring buckets (Largest-Triangle-Three-Buckets, with the previous
+bucket's centroid instead of its chosen point so buckets need no sequential
+pass). The rows chosen for the series of a chart are merged, so all series stay
+aligned on the same x-axis rows.
+"""
+
+from collections.abc import Mapping
+from typing import Literal, Union
+
+import numpy as np
+import numpy.typing as npt
+import pandas as pd
+
+
+FloatArray = npt.NDArray[np.float64]
+IntArray = npt.NDArray[np.intp]
+Method = Literal['minmax', 'lttb']
+
+
+def as_float(series: pd.Series) -> FloatArray:
+    """The values of a stream column as floats, NaN where missing or not numeric."""
+    values = pd.to_numeric(series, errors='coerce')
+    return np.asarray(values.to_numpy(dtype=float, na_value=np.nan), dtype=float)
+
+
+def _buckets(values: FloatArray, num_buckets: int) -> tuple[FloatArray, int]:
+    """The values NaN-padded into a (buckets x bucket size) array, and the size."""
+    size = -(-len(values) // num_buckets)
+    padded = np.full(size * -(-len(values) // size), np.nan)
+    padded[: len(values)] = values
+    return padded.reshape(-1, size), size
+
+
+def minmax_indices(y: FloatArray, num_buckets: int) -> IntArray:
+    """Rows of the lowest and highest value of each bucket, NaN ignored."""
+    if num_buckets < 1 or not len(y):
+        return np.zeros(0, dtype=np.intp)
+    buckets, size = _buckets(y, num_buckets)
+    missing = np.isnan(buckets)
+    starts = np.arange(len(buckets)) * size
+    has_values = ~missing.all(axis=1)
+    lows = np.where(missing, np.inf, buckets).argmin(axis=1) + starts
+    highs = np.where(missing, -np.inf, buckets).argmax(axis=1) + starts
+    return np.concatenate((lows[has_values], highs[has_values]))
+
+
+def lttb_indices(x: FloatArray, y: FloatArray, num_points: int) -> IntArray:
+    """Rows of about `num_points` LTTB points: the first, the last and one per bucket.
+
+    Rows with a NaN value are never chosen.
+    """
+    valid = np.flatnonzero(~np.isnan(x) & ~np.isnan(y))
+    if num_points < 3 or len(valid) <= num_points:
+        return valid
+    first, last = valid[0], valid[-1]
+    inner = valid[1:-1]
+    bx, size = _buckets(x[inner], num_points - 2)
+    by, _ = _buckets(y[inner], num_points - 2)
+    missing = np.isnan(bx)
+    counts = (~missing).sum(axis=1)
+    cx = np.where(missing, 0.0, bx).sum(axis=1) / counts
+    cy = np.where(missing, 0.0, by).sum(axis=1) / counts
+    # Centroids of the previous and the next bucket, the first and last point at the ends
+    ax = np.concatenate(([x[first]], cx[:-1]))[:, None]
+    ay = np.concatenate(([y[first]], cy[:-1]))[:, None]
+    nx = np.concatenate((cx[1:], [x[last]]))[:, None]
+    ny = np.concatenate((cy[1:], [y[last]]))[:, None]
+    areas = np.abs((ax - nx) * (by - ay) - (ax - bx) * (ny - ay))
+    chosen = np.where(missing, -1.0, areas).argmax(axis=1) + np.arange(len(bx)) * size
+    return np.concatenate(([first], inner[chosen], [last]))
+
+
+def downsample(
+    df: pd.DataFrame,
+    x_col: str,
+    y_cols: list[str],
+    max_points: Union[int, Mapping[str, int]],
+    method: Method = 'minmax',
+) -> pd.DataFrame:
+    """The rows of `df` that keep the shape of the `y_cols` over `x_col`.
+
+    `df` must be sorted by `x_col`; rows without x are dropped. `max_points` is
+    either a budget of rows shared evenly by the series, or the rows of each
+    series by column. The rows chosen for the series are merged.
+    """
+    x = as_float(df[x_col])
+    rows = np.flatnonzero(~np.isnan(x))
+    y_cols = [col for col in y_cols if col in df.columns]
+    if not y_cols:
+        return df.iloc[rows].reset_index(drop=True)
+    if isinstance(max_points, Mapping):
+        budgets = {col: max_points[col] for col in y_cols}
+        limit = max(budgets.values())
+    else:
+        budgets = dict.fromkeys(y_cols, max_points // len(y_cols))
+        limit = max_points
+    if len(rows) <= limit:
+        return df.iloc[rows].reset_index(drop=True)
+
+    chosen = [rows[[0, -1]]]
+    for col in y_cols:
+        budget = max(budgets[col], 3)
+        y = as_float(df[col])
+        if len(rows) < len(y):
+            y = y[rows]
+        if method == 'lttb':
+            chosen.append(rows[lttb_indices(x[rows], y, budget)])
+        else:
+            chosen.append(rows[minmax_indices(y, budget // 2)])
+    return df.iloc[np.unique(np.concatenate(chosen))].reset_index(drop=True)
@@ -0,0 +1,50 @@
+"""This file decodes activity streams stored in the compact raw format."""
+
+import numpy as np
+import pandas as pd
+
+
+# Stream type -> column of fct_activity_streams
+STREAM_COLUMNS = {
+    'time': 'time_s',
+    'distance': 'distance_m',
+    'heartrate': 'heartrate_bpm',
+    'velocity_smooth': 'velocity_smooth_mps',
+    'altitude': 'altitude_m',
+    'cadence': 'cadence_rpm',
+    'moving': 'moving',
+    'watts': 'power_w',
+    'temp': 'temp_c',
+    'grade_smooth': 'grade_smooth_pct',
+}
+
+
+def decode_compact_streams(compact: pd.DataFrame) -> pd.DataFrame:
+    """Decodes compact numeric stream rows into the wide fct_activity_streams layout.
+
+    Expects the columns stream_type, value_type, scale, num_points, sequence_index
+    and values_delta; latlng rows are ignored. Returns one row per sequence_index.
+    """
+    series = []
+    for row in compact.itertuples(index=False):
+        column = STREAM_COLUMNS.get(row.stream_type)
+        if column is None or row.value_type == 'latlng':
+            continue
+        values = np.cumsum(np.asarray(row.values_delta, dtype=np.int64))
+        if row.value_type == 'float':
+            data = values / row.scale
+        elif row.value_type == 'bool':
+            data = values.astype(bool)
+        else:
+            data = values
+        index = (
+            np.asarray(row.sequence_index, dtype=np.int64)
+            if len(row.sequence_index)
+            else np.arange(row.num_points)
+        )
+        series.append(pd.Series(data, index=index, name=column))
+
+    if not series:
+        return pd.DataFrame(columns=['sequence_index'])
+    wide = pd.concat(series, axis=1).sort_index()
+    return wide.rename_axis('sequence_index').reset_index()
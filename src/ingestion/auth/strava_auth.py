@@ -1,11 +1,31 @@
-"""This module."""
+"""This module handles the Strava OAuth token refresh and caching."""
 
+from dataclasses import asdict, dataclass
 import os
+import threading
+import time
+from typing import Any, Optional
 
 import requests
 
+from ingestion.state.base import BaseStateStore
 
-AUTH_URL = 'https://www.strava.com/oauth/token'
+
+AUTH_URL = os.environ.get('STRAVA_AUTH_URL', 'https://www.strava.com/oauth/token')
+TOKEN_STATE_KEY = 'strava_token'
+
+
+@dataclass
+class StravaToken:
+    """Access token, rotated refresh token and expiry returned by Strava."""
+
+    access_token: str
+    refresh_token: str
+    expires_at: int  # epoch seconds
+
+    def expires_within(self, seconds: float, now: float) -> bool:
+        """Whether the token expires within the next `seconds`."""
+        return self.expires_at - now <= seconds
 
 
 def _load_strava_credentials() -> tuple[str, str, str]:
@@ -21,10 +41,10 @@ def _load_strava_credentials() -> tuple[str, str, str]:
     return client_id, client_secret, refresh_token
 
 
-def _get_fresh_access_token(
+def _refresh_token(
     client_id: str, client_secret: str, refresh_token: str
-) -> str:
-    """Fetches a new access token using the refresh token."""
+) -> StravaToken:
+    """Exchanges the refresh token for a new access token."""
     print('Refreshing Strava access token...')
     payload = {
         'client_id': client_id,
@@ -36,14 +56,145 @@ def _get_fresh_access_token(
     try:
         response = requests.post(AUTH_URL, data=payload, timeout=10)
         response.raise_for_status()
-        new_token: str = response.json()['access_token']
+        data = response.json()
+        token = StravaToken(
+            access_token=data['access_token'],
+            # Strava may rotate the refresh token on every refresh
+            refresh_token=data.get('refresh_token') or refresh_token,
+            expires_at=int(data.get('expires_at', 0)),
+        )
         print('Successfully refreshed access token.')
-        return new_token
+        return token
     except requests.exceptions.HTTPError as e:
         print(f'Error refreshing token: {e.response.text}')
         raise
 
 
+def _get_fresh_access_token(
+    client_id: str, client_secret: str, refresh_token: str
+) -> str:
+    """Fetches a new access token using the refresh token."""
+    return _refresh_token(client_id, client_secret, refresh_token).access_token
+
+
+class StravaTokenManager:
+    """Caches the access token until shortly before it expires.
+
+    The token and the rotated refresh token are persisted to a pluggable state
+    store kept apart from the pipeline state, so short runs can skip the OAuth
+    round trip and a rotated refresh token is never lost. The store holds
+    credentials and must be access-restricted.
+    """
+
+    def __init__(
+        self,
+        client_id: str,
+        client_secret: str,
+        refresh_token: str,
+        store: Optional[BaseStateStore] = None,
+        store_key: str = TOKEN_STATE_KEY,
+        refresh_margin_s: float = 600,
+        legacy_store: Optional[BaseStateStore] = None,
+    ) -> None:
+        """Initializes the manager; the token is loaded lazily.
+
+        `legacy_store` is the pipeline state store, which held the whole token
+        before; a token found there is moved to `store` and deleted.
+        """
+        self.client_id = client_id
+        self.client_secret = client_secret
+        self.refresh_token = refresh_token
+        self.store = store
+        self.store_key = store_key
+        self.refresh_margin_s = refresh_margin_s
+        self.legacy_store = legacy_store
+
+        self._token: Optional[StravaToken] = None
+        self._loaded = False
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    @classmethod
+    def from_env(
+        cls, store: Optional[BaseStateStore] = None, **kwargs: Any
+    ) -> 'StravaTokenManager':
+        """Creates a manager from the STRAVA_* environment variables."""
+        client_id, client_secret, refresh_token = _load_strava_credentials()
+        return cls(client_id, client_secret, refresh_token, store=store, **kwargs)
+
+    def _load(self) -> None:
+        """Reads the cached token once from the store."""
+        self._loaded = True
+        if self.store is None:
+            return
+        document = self.store.get(self.store_key)
+        if not document and self.legacy_store is not None:
+            document = self.legacy_store.get(self.store_key)
+            if document:
+                self.store.put(self.store_key, document)
+                self.legacy_store.delete(self.store_key)
+        if document:
+            # Reused by get_access_token until it enters the refresh margin
+            self._token = StravaToken(**document)
+            # A rotated refresh token supersedes the configured one
+            self.refresh_token = self._token.refresh_token
+
+    def _refresh(self) -> StravaToken:
+        token = _refresh_token(self.client_id, self.client_secret, self.refresh_token)
+        self._token = token
+        self.refresh_token = token.refresh_token
+        if self.store is not None:
+            self.store.put(self.store_key, asdict(token))
+        return token
+
+    def get_access_token(self) -> str:
+        """Returns a cached access token, refreshing it shortly before expiry."""
+        with self._lock:
+            if not self._loaded:
+                self._load()
+            token = self._token
+            if token is None or token.expires_within(
+                self.refresh_margin_s, time.time()
+            ):
+                token = self._refresh()
+            return token.access_token
+
+    # --------------------------
+    # Background refresh
+    # --------------------------
+    def _refresh_loop(self) -> None:
+        while not self._stop.is_set():
+            try:
+                self.get_access_token()
+            except requests.RequestException as e:
+                print(f'Background token refresh failed, retrying: {e}')
+                self._stop.wait(60)
+                continue
+            with self._lock:
+                expires_at = self._token.expires_at if self._token else 0
+            # Wake up right when the token enters the refresh margin
+            wait_s = max(30.0, expires_at - self.refresh_margin_s - time.time() + 1)
+            self._stop.wait(wait_s)
+
+    def start_background_refresh(self) -> None:
+        """Keeps the token fresh during long runs such as backfills."""
+        if self._thread is not None:
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(
+            target=self._refresh_loop, name='strava-token-refresh', daemon=True
+        )
+        self._thread.start()
+
+    def stop_background_refresh(self) -> None:
+        """Stops the background refresh thread."""
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+
+
 # This is the primary function other modules will call
 def get_access_token() -> str:
     """Loads credentials and returns a fresh access token."""
@@ -0,0 +1,111 @@
+"""This module loads the roster of athletes ingested by the pipeline."""
+
+from dataclasses import dataclass
+import json
+import os
+from typing import Any, Optional
+
+from ingestion.auth.strava_auth import (
+    TOKEN_STATE_KEY,
+    StravaTokenManager,
+    _load_strava_credentials,
+)
+from ingestion.state.base import BaseStateStore
+
+
+ROSTER_FILE = os.environ.get('STRAVA_ROSTER_FILE')
+DEFAULT_ATHLETE_KEY = 'default'
+# Thresholds of the stream summary's zones and training load, unless set per athlete
+ATHLETE_MAX_HR = (
+    int(os.environ['ATHLETE_MAX_HR']) if os.environ.get('ATHLETE_MAX_HR') else None
+)
+ATHLETE_FTP_W = (
+    int(os.environ['ATHLETE_FTP_W']) if os.environ.get('ATHLETE_FTP_W') else None
+)
+ATHLETE_RESTING_HR = int(os.environ.get('ATHLETE_RESTING_HR', '60'))
+
+
+@dataclass(frozen=True)
+class RosterEntry:
+    """Credentials of one athlete who authorized the Strava app, and their thresholds.
+
+    Without a maximum heart rate or FTP the athlete's zones of that kind are left
+    empty; the training load needs the FTP (TSS) or both heart rates (TRIMP).
+    """
+
+    key: str
+    client_id: str
+    client_secret: str
+    refresh_token: str
+    max_hr: Optional[int] = ATHLETE_MAX_HR
+    ftp_w: Optional[int] = ATHLETE_FTP_W
+    resting_hr: int = ATHLETE_RESTING_HR
+
+    def state_key(self, base: str) -> str:
+        """Per-athlete key of a state document; the default athlete keeps `base`."""
+        return base if self.key == DEFAULT_ATHLETE_KEY else f'{base}.{self.key}'
+
+    def token_manager(
+        self,
+        store: Optional[BaseStateStore],
+        legacy_store: Optional[BaseStateStore] = None,
+    ) -> StravaTokenManager:
+        """Creates the token manager with the athlete's own token state."""
+        return StravaTokenManager(
+            self.client_id,
+            self.client_secret,
+            self.refresh_token,
+            store=store,
+            store_key=self.state_key(TOKEN_STATE_KEY),
+            legacy_store=legacy_store,
+        )
+
+
+def _optional_int(value: Any) -> Optional[int]:
+    return int(value) if value is not None else None
+
+
+def load_roster(path: Optional[str] = ROSTER_FILE) -> list[RosterEntry]:
+    """Reads the roster, or returns the single athlete of the STRAVA_* variables.
+
+    The roster file is a JSON list of `{"key": ..., "refresh_token": ...}`
+    objects. `client_id`/`client_secret` default to the app credentials in
+    STRAVA_CLIENT_ID/STRAVA_CLIENT_SECRET, the optional `max_hr`, `ftp_w` and
+    `resting_hr` to ATHLETE_MAX_HR, ATHLETE_FTP_W and ATHLETE_RESTING_HR. The
+    file holds credentials and must be access-restricted.
+    """
+    if not path:
+        client_id, client_secret, refresh_token = _load_strava_credentials()
+        return [
+            RosterEntry(DEFAULT_ATHLETE_KEY, client_id, client_secret, refresh_token)
+        ]
+
+    with open(path, encoding='utf-8') as f:
+        athletes = json.load(f)
+
+    roster = []
+    for athlete in athletes:
+        app_id = athlete.get('client_id') or os.environ.get('STRAVA_CLIENT_ID')
+        app_secret = athlete.get('client_secret') or os.environ.get(
+            'STRAVA_CLIENT_SECRET'
+        )
+        if not (athlete.get('key') and athlete.get('refresh_token')):
+            raise ValueError(f'Roster entry without key or refresh token in {path}.')
+        if not (app_id and app_secret):
+            raise OSError('Missing Strava app credentials for the roster.')
+        roster.append(
+            RosterEntry(
+                key=str(athlete['key']),
+                client_id=str(app_id),
+                client_secret=str(app_secret),
+                refresh_token=str(athlete['refresh_token']),
+                max_hr=_optional_int(athlete.get('max_hr', ATHLETE_MAX_HR)),
+                ftp_w=_optional_int(athlete.get('ftp_w', ATHLETE_FTP_W)),
+                resting_hr=int(athlete.get('resting_hr', ATHLETE_RESTING_HR)),
+            )
+        )
+
+    keys = [entry.key for entry in roster]
+    if len(set(keys)) != len(keys):
+        raise ValueError(f'Duplicate athlete keys in {path}.')
+    return roster
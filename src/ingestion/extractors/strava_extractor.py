@@ -1,21 +1,35 @@
 """This module contains the extractor for interacting with the Strava API."""
 
+from collections.abc import Callable, Iterator
+from dataclasses import asdict, dataclass
 from datetime import datetime, timedelta, timezone
-from typing import Any, cast
+import os
+import random
+import threading
+import time
+from typing import Any, Optional, Union, cast
 
 from pydantic import ValidationError
 import requests
+from requests.adapters import HTTPAdapter
 
 from ingestion.extractors.base import BaseExtractor
+from ingestion.extractors.strava_rate_limiter import StravaRateLimiter
+from ingestion.metrics.run_metrics import RunMetrics
 from models.strava_activity_model import StravaActivity
 from models.strava_athlete_info_model import StravaAthleteInfo
 from models.strava_gear_model import StravaGear
 
 
+# Receives the raw item and the error of an activity that failed validation
+OnInvalidActivity = Callable[[dict[str, Any], ValidationError], None]
+
+
 class StravaEndpoints:
     """A helper class as a central Strava API URL management."""
 
-    BASE_URL = 'https://www.strava.com/api/v3'
+    # Overridable to point the pipeline at a local stand-in of the API
+    BASE_URL = os.environ.get('STRAVA_API_BASE_URL', 'https://www.strava.com/api/v3')
 
     @staticmethod
     def get_athlete() -> str:
@@ -32,6 +46,11 @@ class StravaEndpoints:
         """URL to fetch activities."""
         return f'{StravaEndpoints.BASE_URL}/athlete/activities'
 
+    @staticmethod
+    def get_activity(activity_id: str) -> str:
+        """URL to fetch a single activity."""
+        return f'{StravaEndpoints.BASE_URL}/activities/{activity_id}'
+
     @staticmethod
     def get_gear_details(gear_id: str) -> str:
         """URL to fetch gear details."""
@@ -43,11 +62,152 @@ class StravaEndpoints:
         return f'{StravaEndpoints.BASE_URL}/activities/{activity_id}/streams'
 
 
+@dataclass
+class EndpointStats:
+    """Request statistics collected for a single Strava endpoint."""
+
+    calls: int = 0
+    retries: int = 0
+    errors: int = 0
+    bytes: int = 0
+    total_latency_s: float = 0.0
+    max_latency_s: float = 0.0
+
+    def record(self, latency_s: float, num_bytes: int) -> None:
+        """Adds a single HTTP round trip."""
+        self.calls += 1
+        self.bytes += num_bytes
+        self.total_latency_s += latency_s
+        self.max_latency_s = max(self.max_latency_s, latency_s)
+
+    @property
+    def avg_latency_s(self) -> float:
+        """Average latency per call."""
+        return self.total_latency_s / self.calls if self.calls else 0.0
+
+
 class StravaExtractor(BaseExtractor):
     """Extracts and validates data from Strava API"""
 
-    def __init__(self, access_token: str) -> None:
-        self.headers = {'Authorization': f'Bearer {access_token}'}
+    RETRY_STATUS_CODES = frozenset({429, 500, 502, 503, 504})
+
+    def __init__(
+        self,
+        access_token: Union[str, Callable[[], str]],
+        rate_limiter: Optional[StravaRateLimiter] = None,
+        pool_size: int = 10,
+        max_retries: int = 4,
+        backoff_base_s: float = 1.0,
+        backoff_max_s: float = 60.0,
+        timeout_s: float = 10,
+        metrics: Optional[RunMetrics] = None,
+    ) -> None:
+        # A callable (e.g. StravaTokenManager.get_access_token) is asked per request
+        self._access_token = access_token
+        self.rate_limiter = rate_limiter or StravaRateLimiter()
+        self.max_retries = max_retries
+        self.backoff_base_s = backoff_base_s
+        self.backoff_max_s = backoff_max_s
+        self.timeout_s = timeout_s
+        self.metrics = metrics or RunMetrics()
+
+        # One keep-alive connection pool shared by all worker threads
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=pool_size)
+        self.session.mount('https://', adapter)
+        self.session.mount('http://', adapter)
+
+        self.stats: dict[str, EndpointStats] = {}
+        self._stats_lock = threading.Lock()
+
+    @property
+    def headers(self) -> dict[str, str]:
+        """Authorization header with the current access token."""
+        token = (
+            self._access_token() if callable(self._access_token) else self._access_token
+        )
+        return {'Authorization': f'Bearer {token}'}
+
+    def close(self) -> None:
+        """Closes the pooled HTTP connections."""
+        self.session.close()
+
+    def _backoff(self, attempt: int) -> float:
+        """Full-jitter exponential backoff for the given retry attempt."""
+        cap = min(self.backoff_max_s, self.backoff_base_s * 2**attempt)
+        return random.uniform(0, cap)  # nosec B311: jitter, not cryptography
+
+    def _record(
+        self,
+        endpoint: str,
+        latency_s: float = 0.0,
+        num_bytes: int = 0,
+        retry: bool = False,
+        error: bool = False,
+        call: bool = True,
+    ) -> None:
+        with self._stats_lock:
+            stats = self.stats.setdefault(endpoint, EndpointStats())
+            if call:
+                stats.record(latency_s, num_bytes)
+            stats.retries += int(retry)
+            stats.errors += int(error)
+        self.metrics.add(
+            f'api.{endpoint}',
+            seconds=latency_s,
+            calls=int(call),
+            bytes=num_bytes,
+            retries=int(retry),
+            errors=int(error),
+        )
+
+    def _get(
+        self, endpoint: str, url: str, params: Optional[dict[str, Any]] = None
+    ) -> requests.Response:
+        """Sends a GET request within the rate limits, retrying transient failures.
+
+        A 429 blocks the limiter until the current window resets. 5xx responses and
+        connection errors are retried with jittered exponential backoff.
+        """
+        attempt = 0
+        while True:
+            self.rate_limiter.acquire()
+            start = time.perf_counter()
+            try:
+                response = self.session.get(
+                    url, headers=self.headers, params=params, timeout=self.timeout_s
+                )
+            except (requests.ConnectionError, requests.Timeout):
+                self._record(endpoint, time.perf_counter() - start, error=True)
+                if attempt >= self.max_retries:
+                    raise
+            else:
+                self._record(
+                    endpoint, time.perf_counter() - start, len(response.content)
+                )
+                self.rate_limiter.update(response.headers)
+                if (
+                    response.status_code not in self.RETRY_STATUS_CODES
+                    or attempt >= self.max_retries
+                ):
+                    return response
+                if response.status_code == 429:
+                    print(f'Rate limited by Strava on {url}.')
+                    self.rate_limiter.mark_exhausted()
+
+            delay = self._backoff(attempt)
+            attempt += 1
+            self._record(endpoint, retry=True, call=False)
+            print(f'Retrying {endpoint} in {delay:.1f}s (attempt {attempt}).')
+            time.sleep(delay)
+
+    def stats_summary(self) -> dict[str, dict[str, Any]]:
+        """Returns the request statistics per endpoint."""
+        with self._stats_lock:
+            return {
+                endpoint: {**asdict(stats), 'avg_latency_s': stats.avg_latency_s}
+                for endpoint, stats in self.stats.items()
+            }
 
     def fetch_athlete_info(self) -> StravaAthleteInfo:
         """Fetches athlete information."""
@@ -55,7 +215,7 @@ class StravaExtractor(BaseExtractor):
         athlete_url = StravaEndpoints.get_athlete()
 
         try:
-            response = requests.get(athlete_url, headers=self.headers, timeout=10)
+            response = self._get('get_athlete', athlete_url)
             response.raise_for_status()
             data = response.json()
             athlete_info = StravaAthleteInfo(**data)
@@ -70,47 +230,113 @@ class StravaExtractor(BaseExtractor):
             raise
         return athlete_info
 
-    def fetch_all_activities(self, days: int = 1) -> list[StravaActivity]:
-        """Fetches all activities."""
+    def iter_activity_pages(
+        self,
+        days: int = 1,
+        after: Optional[int] = None,
+        before: Optional[int] = None,
+        on_invalid: Optional[OnInvalidActivity] = None,
+    ) -> Iterator[list[StravaActivity]]:
+        """Lazily yields the validated activities page by page.
+
+        Covers activities started between `after` and `before` (epoch seconds).
+        Without `after`, activities of the last `days` days are fetched. Items that
+        fail validation are skipped and passed to `on_invalid` with the error.
+        """
         print('Start fetching all activities.')
 
-        after = int(
-            (datetime.now(timezone.utc) - timedelta(days=days))
-            .replace(hour=0, minute=0, second=0)
-            .timestamp()
-        )
+        if after is None:
+            after = int(
+                (datetime.now(timezone.utc) - timedelta(days=days))
+                .replace(hour=0, minute=0, second=0)
+                .timestamp()
+            )
 
         activities_url = StravaEndpoints.get_activities()
-        all_activities: list[StravaActivity] = []
         page = 1
+        total_valid_count = 0
         total_invalid_count = 0
 
         while True:
-            # Remove after param to fetch all activities to backfill the historical data
+            # Historical data is fetched window by window via the backfill mode
             params = {'per_page': 200, 'page': page, 'after': after}
-            # params = {'per_page': 200, 'page': page}
+            if before is not None:
+                params['before'] = before
 
-            response = requests.get(
-                activities_url, headers=self.headers, params=params, timeout=10
-            )
+            response = self._get('get_activities', activities_url, params=params)
             response.raise_for_status()
             data = response.json()
             if not data:
                 break
 
-            for item in data:
-                try:
-                    all_activities.append(StravaActivity(**item))
-                except ValidationError as e:
-                    total_invalid_count += 1
-                    print(f'Validation error: {e.errors()}')
+            activities: list[StravaActivity] = []
+            with self.metrics.stage('validate_activities'):
+                for item in data:
+                    try:
+                        activities.append(StravaActivity(**item))
+                    except ValidationError as e:
+                        total_invalid_count += 1
+                        print(f'Validation error: {e.errors()}')
+                        if on_invalid is not None:
+                            on_invalid(item, e)
+            self.metrics.add('validate_activities', rows=len(activities))
 
+            total_valid_count += len(activities)
+            yield activities
             page += 1
 
         print(
-            f'All activities fetched: {len(all_activities)} valid, {total_invalid_count} invalid.'
+            f'All activities fetched: {total_valid_count} valid, {total_invalid_count} invalid.'
+        )
+
+    def iter_activities(
+        self,
+        days: int = 1,
+        after: Optional[int] = None,
+        before: Optional[int] = None,
+        on_invalid: Optional[OnInvalidActivity] = None,
+    ) -> Iterator[StravaActivity]:
+        """Lazily yields the validated activities one by one."""
+        for page in self.iter_activity_pages(
+            days=days, after=after, before=before, on_invalid=on_invalid
+        ):
+            yield from page
+
+    def fetch_all_activities(
+        self,
+        days: int = 1,
+        after: Optional[int] = None,
+        before: Optional[int] = None,
+        on_invalid: Optional[OnInvalidActivity] = None,
+    ) -> list[StravaActivity]:
+        """Fetches all activities started between `after` and `before` (epoch seconds).
+
+        Without `after`, activities of the last `days` days are fetched.
+        """
+        return list(
+            self.iter_activities(
+                days=days, after=after, before=before, on_invalid=on_invalid
+            )
         )
-        return all_activities
+
+    def fetch_activity(self, activity_id: str) -> StravaActivity:
+        """Fetches a single activity by ID."""
+        print(f'Start fetching activity ID: {activity_id}')
+        activity_url = StravaEndpoints.get_activity(activity_id)
+
+        try:
+            response = self._get('get_activity', activity_url)
+            response.raise_for_status()
+            return StravaActivity(**response.json())
+        except requests.RequestException as e:
+            print(f'HTTP error occurred: {e}')
+            raise
+        except ValidationError as e:
+            print(f'Validation error: {e.errors()}')
+            raise
+        except Exception as e:
+            print(f'An unexpected error occurred: {e}')
+            raise
 
     def fetch_activity_streams(self, activity_id: str) -> dict[str, Any]:
         """Fetches activity streams by activity ID and stream types."""
@@ -122,9 +348,7 @@ class StravaExtractor(BaseExtractor):
         }
 
         try:
-            response = requests.get(
-                stream_url, headers=self.headers, params=params, timeout=10
-            )
+            response = self._get('get_activity_streams', stream_url, params=params)
             if response.status_code == 404:
                 print(f'No streams available for activity {activity_id}')
                 return {}
@@ -144,7 +368,7 @@ class StravaExtractor(BaseExtractor):
         gear_url = StravaEndpoints.get_gear_details(gear_id)
 
         try:
-            response = requests.get(gear_url, headers=self.headers, timeout=10)
+            response = self._get('get_gear_details', gear_url)
             response.raise_for_status()
             return StravaGear(**response.json())
         except requests.RequestException as e:
@@ -0,0 +1,212 @@
+"""This module contains a thread-safe limiter for the Strava API rate limits."""
+
+from collections.abc import Callable, Mapping
+from datetime import datetime, timedelta, timezone
+import threading
+import time
+from typing import Optional
+
+
+SHORT_WINDOW_S = 15 * 60
+
+
+class RateLimitExhausted(Exception):
+    """Raised when the next free request slot is further away than allowed."""
+
+    def __init__(self, wait_s: float) -> None:
+        super().__init__(f'Strava rate limit exhausted, next slot in {wait_s:.0f}s.')
+        self.wait_s = wait_s
+
+
+def _parse_pair(value: Optional[str]) -> Optional[tuple[int, int]]:
+    """Parses a '<15-minute>,<daily>' header value."""
+    if not value:
+        return None
+    try:
+        short, daily = (int(v.strip()) for v in value.split(','))
+    except ValueError:
+        return None
+    return short, daily
+
+
+class StravaRateLimiter:
+    """Throttles requests to the 15-minute and daily Strava budgets.
+
+    Strava reports the limits and the current usage in the
+    `X-RateLimit-Limit`/`X-RateLimit-Usage` headers (and the stricter
+    `X-ReadRateLimit-*` pair for read endpoints) as '<15-minute>,<daily>'.
+    The short window resets at every quarter hour, the daily one at midnight UTC.
+    Requests reserve a slot before they are sent, so concurrent workers never
+    overshoot the budget between two header updates.
+    """
+
+    def __init__(
+        self,
+        safety_margin: int = 2,
+        max_wait_s: float = SHORT_WINDOW_S + 60,
+        clock: Callable[[], float] = time.time,
+        sleep: Callable[[float], None] = time.sleep,
+    ) -> None:
+        """Initializes the limiter without any known budget."""
+        self.safety_margin = safety_margin
+        self.max_wait_s = max_wait_s
+        self._clock = clock
+        self._sleep = sleep
+        self._lock = threading.Lock()
+
+        self.short_limit: Optional[int] = None
+        self.daily_limit: Optional[int] = None
+        self.short_usage = 0
+        self.daily_usage = 0
+        self._short_window = self._short_window_id(clock())
+        self._day = self._day_id(clock())
+        self._blocked_until = 0.0
+
+    # ---------------
+    # Windows
+    # ---------------
+    @staticmethod
+    def _short_window_id(now: float) -> int:
+        return int(now // SHORT_WINDOW_S)
+
+    @staticmethod
+    def _day_id(now: float) -> int:
+        return int(now // 86_400)
+
+    def _roll_windows(self, now: float) -> None:
+        """Resets the usage counters once their window has passed."""
+        short_window = self._short_window_id(now)
+        if short_window != self._short_window:
+            self._short_window = short_window
+            self.short_usage = 0
+        day = self._day_id(now)
+        if day != self._day:
+            self._day = day
+            self.daily_usage = 0
+
+    def seconds_until_short_reset(self) -> float:
+        """Seconds until the next quarter-hour window starts."""
+        now = self._clock()
+        return float(SHORT_WINDOW_S - now % SHORT_WINDOW_S)
+
+    def seconds_until_daily_reset(self) -> float:
+        """Seconds until midnight UTC."""
+        now = datetime.fromtimestamp(self._clock(), tz=timezone.utc)
+        midnight = (now + timedelta(days=1)).replace(
+            hour=0, minute=0, second=0, microsecond=0
+        )
+        return (midnight - now).total_seconds()
+
+    def _required_wait(self) -> float:
+        """Returns 0 if a request may be sent now, otherwise the seconds to wait."""
+        blocked_s = self._blocked_until - self._clock()
+        if blocked_s > 0:
+            return blocked_s
+        if (
+            self.daily_limit is not None
+            and self.daily_usage + self.safety_margin >= self.daily_limit
+        ):
+            return self.seconds_until_daily_reset()
+        if (
+            self.short_limit is not None
+            and self.short_usage + self.safety_margin >= self.short_limit
+        ):
+            return self.seconds_until_short_reset()
+        return 0.0
+
+    # ---------------
+    # Public API
+    # ---------------
+    def acquire(self) -> None:
+        """Blocks until a request slot is available and reserves it."""
+        while True:
+            with self._lock:
+                self._roll_windows(self._clock())
+                wait_s = self._required_wait()
+                if wait_s <= 0:
+                    self.short_usage += 1
+                    self.daily_usage += 1
+                    return
+
+            if wait_s > self.max_wait_s:
+                raise RateLimitExhausted(wait_s)
+            print(f'Rate limit budget reached. Waiting {wait_s:.0f}s...')
+            # Sleep past the boundary so the next check sees the new window
+            self._sleep(wait_s + 1)
+
+    def update(self, headers: Mapping[str, str]) -> None:
+        """Updates limits and usage from the headers of a Strava response."""
+        pairs = [
+            (
+                _parse_pair(headers.get('X-RateLimit-Limit')),
+                _parse_pair(headers.get('X-RateLimit-Usage')),
+            ),
+            (
+                _parse_pair(headers.get('X-ReadRateLimit-Limit')),
+                _parse_pair(headers.get('X-ReadRateLimit-Usage')),
+            ),
+        ]
+        known = [
+            (lim, use) for lim, use in pairs if lim is not None and use is not None
+        ]
+        if not known:
+            return
+
+        with self._lock:
+            self._roll_windows(self._clock())
+            # Track the pair that leaves the least headroom
+            short_limit, short_usage = min(
+                ((lim[0], use[0]) for lim, use in known), key=lambda p: p[0] - p[1]
+            )
+            daily_limit, daily_usage = min(
+                ((lim[1], use[1]) for lim, use in known), key=lambda p: p[0] - p[1]
+            )
+            self.short_limit = short_limit
+            self.daily_limit = daily_limit
+            # Keep local reservations of requests still in flight
+            self.short_usage = max(self.short_usage, short_usage)
+            self.daily_usage = max(self.daily_usage, daily_usage)
+
+    def estimate_seconds(self, num_requests: int) -> float:
+        """Estimates how long `num_requests` more requests take within the budget.
+
+        Only the budget is taken into account, not the request latency. Returns 0
+        while no limits are known yet.
+        """
+        with self._lock:
+            self._roll_windows(self._clock())
+            if self.short_limit is None or self.daily_limit is None:
+                return 0.0
+            short_cap = self.short_limit - self.safety_margin
+            daily_cap = self.daily_limit - self.safety_margin
+            if short_cap <= 0 or daily_cap <= 0:
+                return float('inf')
+
+            short_left = max(0, short_cap - self.short_usage)
+            daily_left = max(0, daily_cap - self.daily_usage)
+            until_short = self.seconds_until_short_reset()
+            until_day = self.seconds_until_daily_reset()
+            remaining = num_requests
+            elapsed = 0.0
+            while True:
+                taken = min(remaining, short_left, daily_left)
+                remaining -= taken
+                daily_left -= taken
+                short_left -= taken
+                if remaining <= 0:
+                    return elapsed
+                if daily_left <= 0:
+                    # Midnight UTC also starts a new quarter-hour window
+                    elapsed += until_day
+                    until_day, until_short = 86_400.0, float(SHORT_WINDOW_S)
+                    daily_left, short_left = daily_cap, short_cap
+                else:
+                    elapsed += until_short
+                    until_day -= until_short
+                    until_short = float(SHORT_WINDOW_S)
+                    short_left = short_cap
+
+    def mark_exhausted(self) -> None:
+        """Marks the short window as used up, e.g. after a 429 response."""
+        with self._lock:
+            self._blocked_until = self._clock() + self.seconds_until_short_reset()
@@ -0,0 +1,70 @@
+"""This module contains a loader that runs load jobs in the background."""
+
+import queue
+import threading
+from typing import Any, Optional
+
+from .base import BaseLoader, Loadable
+
+
+class BackgroundLoadError(Exception):
+    """Raised when a load job of the background thread has failed."""
+
+
+class AsyncLoader(BaseLoader):
+    """Runs the load jobs of another loader on a background thread.
+
+    At most `max_pending` jobs wait in the queue, so the producer blocks instead of
+    accumulating data while the loader overlaps with further API fetches. Jobs are
+    executed in submission order.
+    """
+
+    def __init__(self, loader: BaseLoader, max_pending: int = 2) -> None:
+        """Initializes the loader and starts the background thread."""
+        self.loader = loader
+        self._queue: queue.Queue[Optional[tuple[Any, ...]]] = queue.Queue(
+            maxsize=max_pending
+        )
+        self._error: Optional[BaseException] = None
+        self._thread = threading.Thread(
+            target=self._work, name='async-loader', daemon=True
+        )
+        self._thread.start()
+
+    def _work(self) -> None:
+        while True:
+            job = self._queue.get()
+            try:
+                if job is None:
+                    return
+                # After a failure the remaining jobs are drained but not executed
+                if self._error is None:
+                    data, dataset, table_name, args, kwargs = job
+                    self.loader.load_data(data, dataset, table_name, *args, **kwargs)
+            except Exception as e:
+                self._error = e
+            finally:
+                self._queue.task_done()
+
+    def _raise_if_failed(self) -> None:
+        if self._error is not None:
+            raise BackgroundLoadError(
+                f'Background load failed: {self._error}'
+            ) from self._error
+
+    def load_data(
+        self, data: Loadable, dataset: str, table_name: str, *args: Any, **kwargs: Any
+    ) -> None:
+        """Queues a load job, blocking while `max_pending` jobs are waiting."""
+        self._raise_if_failed()
+        self._queue.put((data, dataset, table_name, args, kwargs))
+
+    def join(self) -> None:
+        """Waits until all queued jobs are done and raises if any of them failed."""
+        self._queue.join()
+        self._raise_if_failed()
+
+    def close(self) -> None:
+        """Stops the background thread after the queued jobs."""
+        self._queue.put(None)
+        self._thread.join()
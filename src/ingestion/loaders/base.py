@@ -1,20 +1,22 @@
 """This module defines the base interface for all data loaders."""
 
 from abc import ABC, abstractmethod
-from typing import Any
+from collections.abc import Mapping, Sequence
+from typing import Any, Union
 
 import pandas as pd
+import pyarrow as pa
+
+
+JsonRows = Sequence[Mapping[str, Any]]
+ArrowData = Union[pa.Table, pa.RecordBatch]
+Loadable = Union[pd.DataFrame, ArrowData, JsonRows]
 
 
 class BaseLoader(ABC):
     @abstractmethod
     def load_data(
-        self,
-        data: pd.DataFrame,
-        dataset: str,
-        table_name: str,
-        *args: Any,
-        **kwargs: Any,
+        self, data: Loadable, dataset: str, table_name: str, *args: Any, **kwargs: Any
     ) -> None:
         """Takes data and loads it into the data store."""
         pass
@@ -1,26 +1,160 @@
 """This module contains the loader for interacting with Google's BigQuery."""
 
-from collections.abc import Mapping, Sequence
+from collections.abc import Sequence
+from dataclasses import dataclass
+from datetime import datetime, timedelta, timezone
+import io
 import os
-from typing import Any, Optional, Union
+import time
+from typing import Optional
+import uuid
 
+from google.api_core.exceptions import NotFound
 from google.cloud import bigquery
 import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
 
-from .base import BaseLoader
+from ingestion.metrics.run_metrics import RunMetrics
 
+from .base import BaseLoader, Loadable
 
-JsonRows = Sequence[Mapping[str, Any]]
-Loadable = Union[pd.DataFrame, JsonRows]
+
+PARQUET_COMPRESSION = 'zstd'
+# Staging tables of MERGE loads expire even if the cleanup fails
+STAGING_TABLE_TTL = timedelta(hours=1)
+# Of several rows with the same merge keys, the MERGE keeps the latest ingested one
+LATEST_COLUMN = 'ingested_at'
+
+
+@dataclass
+class LoadStats:
+    """Throughput of a single load job."""
+
+    table_id: str
+    source_format: str
+    rows: int
+    bytes: int
+    seconds: float
+
+    @property
+    def rows_per_s(self) -> float:
+        """Loaded rows per second."""
+        return self.rows / self.seconds if self.seconds else 0.0
+
+    @property
+    def mb_per_s(self) -> float:
+        """Uploaded megabytes per second."""
+        return self.bytes / 1_000_000 / self.seconds if self.seconds else 0.0
 
 
 class BigQueryLoader(BaseLoader):
     """Load data into a Google BigQuery table."""
 
-    def __init__(self) -> None:
+    def __init__(self, metrics: Optional[RunMetrics] = None) -> None:
         """Initializes the BigQueryLoader."""
         self.project_id = os.environ.get('GCP_PROJECT_ID')
         self.client = bigquery.Client(project=self.project_id)
+        self.load_stats: list[LoadStats] = []
+        self.metrics = metrics or RunMetrics()
+
+    @staticmethod
+    def _to_parquet(data: pa.Table) -> io.BytesIO:
+        """Serializes an Arrow table to an in-memory compressed Parquet file."""
+        buffer = io.BytesIO()
+        pq.write_table(data, buffer, compression=PARQUET_COMPRESSION)
+        buffer.seek(0)
+        return buffer
+
+    def _run_load_job(
+        self, data: Loadable, table_id: str, job_config: bigquery.LoadJobConfig
+    ) -> tuple[bigquery.LoadJob, str, int]:
+        """Runs a load job; returns it with its source format and uploaded bytes."""
+        uploaded_bytes = 0
+        if isinstance(data, pa.Table):
+            source_format = bigquery.SourceFormat.PARQUET
+            job_config.source_format = source_format
+            # Load list columns (compact streams) as REPEATED, not as records
+            job_config.parquet_options = bigquery.ParquetOptions.from_api_repr({
+                'enableListInference': True
+            })
+            parquet_file = self._to_parquet(data)
+            uploaded_bytes = parquet_file.getbuffer().nbytes
+            job = self.client.load_table_from_file(
+                parquet_file, table_id, job_config=job_config
+            )
+        elif isinstance(data, pd.DataFrame):
+            source_format = 'DATAFRAME'
+            job = self.client.load_table_from_dataframe(
+                data, table_id, job_config=job_config
+            )
+        else:
+            source_format = bigquery.SourceFormat.NEWLINE_DELIMITED_JSON
+            job = self.client.load_table_from_json(
+                data, table_id, job_config=job_config
+            )
+        job.result()
+        return job, str(source_format), uploaded_bytes
+
+    def _merge(
+        self,
+        data: Loadable,
+        table_id: str,
+        job_config: bigquery.LoadJobConfig,
+        merge_keys: Sequence[str],
+    ) -> tuple[bigquery.LoadJob, str, int]:
+        """Loads into a staging table and MERGEs it into `table_id` on `merge_keys`.
+
+        Rows with a known key are updated and new keys are inserted, so repeated
+        loads of the same records leave no duplicates.
+        """
+        staging_id = f'{table_id}__staging_{uuid.uuid4().hex[:12]}'
+        try:
+            target: Optional[bigquery.Table] = self.client.get_table(table_id)
+        except NotFound:
+            target = None
+        if target is not None and job_config.schema is None:
+            # As for appends, existing columns keep their types
+            job_config.schema = target.schema
+            job_config.autodetect = False
+        job_config.write_disposition = 'WRITE_TRUNCATE'
+
+        try:
+            job, source_format, uploaded_bytes = self._run_load_job(
+                data, staging_id, job_config
+            )
+            staging = self.client.get_table(staging_id)
+            staging.expires = datetime.now(timezone.utc) + STAGING_TABLE_TTL
+            self.client.update_table(staging, ['expires'])
+            columns = [field.name for field in staging.schema]
+            self.client.query(
+                f'CREATE TABLE IF NOT EXISTS `{table_id}` LIKE `{staging_id}`'
+            ).result()
+
+            on = ' AND '.join(f'T.`{key}` = S.`{key}`' for key in merge_keys)
+            update = ', '.join(f'`{column}` = S.`{column}`' for column in columns)
+            insert = ', '.join(f'`{column}`' for column in columns)
+            partition = ', '.join(f'`{key}`' for key in merge_keys)
+            if LATEST_COLUMN in columns:
+                partition += f' ORDER BY `{LATEST_COLUMN}` DESC'
+            query = f"""
+                MERGE `{table_id}` AS T
+                USING (
+                    SELECT *
+                    FROM `{staging_id}`
+                    WHERE TRUE
+                    QUALIFY ROW_NUMBER() OVER (PARTITION BY {partition}) = 1
+                ) AS S
+                ON {on}
+                WHEN MATCHED THEN
+                    UPDATE SET {update}
+                WHEN NOT MATCHED THEN
+                    INSERT ({insert}) VALUES ({insert})
+            """  # nosec B608: identifiers come from the pipeline, not user input
+            self.client.query(query).result()
+        finally:
+            self.client.delete_table(staging_id, not_found_ok=True)
+        return job, f'{source_format}+MERGE', uploaded_bytes
 
     def load_data(
         self,
@@ -29,20 +163,23 @@ class BigQueryLoader(BaseLoader):
         table_name: str,
         write_disposition: str = 'WRITE_APPEND',
         schema: Optional[list[bigquery.SchemaField]] = None,
+        merge_keys: Optional[Sequence[str]] = None,
     ) -> None:
-        """Loads data into the specified BigQuery table."""
+        """Loads data into the specified BigQuery table.
+
+        Accepts a DataFrame, JSON rows or an Arrow Table/RecordBatch. Arrow data is
+        uploaded as compressed Parquet. With `merge_keys`, rows are upserted on
+        these columns instead (the write disposition is ignored).
+        """
         table_id = f'{self.project_id}.{dataset}.{table_name}'
 
-        if isinstance(data, pd.DataFrame):
-            if data.empty:
-                print(f'No data provided for table {table_name}. Skipping.')
-                return
-            record_count = len(data)
-        else:
-            if not data:
-                print(f'No data provided for table {table_name}. Skipping.')
-                return
-            record_count = len(data)
+        if isinstance(data, pa.RecordBatch):
+            data = pa.Table.from_batches([data])
+
+        record_count = len(data)
+        if record_count == 0:
+            print(f'No data provided for table {table_name}. Skipping.')
+            return
 
         print(f'Loading {record_count} records into {table_id}...')
 
@@ -56,17 +193,40 @@ class BigQueryLoader(BaseLoader):
         else:
             job_config.autodetect = isinstance(data, pd.DataFrame)
 
+        start = time.perf_counter()
         try:
-            if isinstance(data, pd.DataFrame):
-                job = self.client.load_table_from_dataframe(
-                    data, table_id, job_config=job_config
+            if merge_keys:
+                job, source_format, uploaded_bytes = self._merge(
+                    data, table_id, job_config, merge_keys
                 )
             else:
-                job = self.client.load_table_from_json(
-                    data, table_id, job_config=job_config
+                job, source_format, uploaded_bytes = self._run_load_job(
+                    data, table_id, job_config
                 )
-
-            job.result()
         except Exception as e:
+            self.metrics.add(
+                f'load.{table_name}', seconds=time.perf_counter() - start, errors=1
+            )
             print(f'Failed to load data into {table_id}: {e}')
             raise
+
+        stats = LoadStats(
+            table_id=table_id,
+            source_format=source_format,
+            rows=record_count,
+            bytes=job.input_file_bytes or uploaded_bytes,
+            seconds=time.perf_counter() - start,
+        )
+        self.load_stats.append(stats)
+        self.metrics.add(
+            f'load.{table_name}',
+            seconds=stats.seconds,
+            calls=1,
+            rows=stats.rows,
+            bytes=stats.bytes,
+        )
+        print(
+            f'Loaded {stats.rows} rows ({stats.bytes / 1_000_000:.2f} MB '
+            f'{stats.source_format}) into {table_id} in {stats.seconds:.1f}s: '
+            f'{stats.rows_per_s:,.0f} rows/s, {stats.mb_per_s:.2f} MB/s.'
+        )
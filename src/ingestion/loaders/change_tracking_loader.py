@@ -0,0 +1,29 @@
+"""This module contains a loader that records which tables received data."""
+
+import threading
+from typing import Any
+
+from .base import BaseLoader, Loadable
+
+
+class ChangeTrackingLoader(BaseLoader):
+    """Passes load jobs to another loader and records the tables it changed.
+
+    A table counts as changed once a non-empty load into it has succeeded, so the
+    transformations downstream can be limited to these tables.
+    """
+
+    def __init__(self, loader: BaseLoader) -> None:
+        """Initializes the loader."""
+        self.loader = loader
+        self.changed_tables: set[str] = set()
+        self._lock = threading.Lock()
+
+    def load_data(
+        self, data: Loadable, dataset: str, table_name: str, *args: Any, **kwargs: Any
+    ) -> None:
+        """Runs the load job and records the table if rows were loaded."""
+        self.loader.load_data(data, dataset, table_name, *args, **kwargs)
+        if len(data):
+            with self._lock:
+                self.changed_tables.add(table_name)
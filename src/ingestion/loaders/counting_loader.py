@@ -0,0 +1,22 @@
+"""This module contains a loader that only counts the loaded rows."""
+
+import threading
+from typing import Any
+
+from .base import BaseLoader, Loadable
+
+
+class CountingLoader(BaseLoader):
+    """Discards the data and counts the loaded rows per table."""
+
+    def __init__(self) -> None:
+        """Initializes the loader."""
+        self.rows: dict[str, int] = {}
+        self._lock = threading.Lock()
+
+    def load_data(
+        self, data: Loadable, dataset: str, table_name: str, *args: Any, **kwargs: Any
+    ) -> None:
+        """Counts the rows of a load job."""
+        with self._lock:
+            self.rows[table_name] = self.rows.get(table_name, 0) + len(data)
@@ -0,0 +1,273 @@
+"""This module contains a local loader writing Parquet files queried with DuckDB."""
+
+from collections.abc import Sequence
+from datetime import datetime, timezone
+import os
+from pathlib import Path
+import shutil
+import threading
+import time
+from typing import Optional
+import uuid
+
+import duckdb
+from google.cloud import bigquery
+import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+from ingestion.metrics.run_metrics import RunMetrics
+
+from .base import BaseLoader, Loadable
+from .bigquery_loader import LATEST_COLUMN, PARQUET_COMPRESSION, LoadStats
+
+
+LOCAL_WAREHOUSE_DIR = os.environ.get('LOCAL_WAREHOUSE_DIR', '.local_warehouse')
+
+# BigQuery column types and their Arrow counterparts
+_ARROW_TYPES: dict[str, pa.DataType] = {
+    'STRING': pa.string(),
+    'JSON': pa.string(),
+    'BYTES': pa.binary(),
+    'INT64': pa.int64(),
+    'INTEGER': pa.int64(),
+    'FLOAT64': pa.float64(),
+    'FLOAT': pa.float64(),
+    'NUMERIC': pa.decimal128(38, 9),
+    'BOOL': pa.bool_(),
+    'BOOLEAN': pa.bool_(),
+    'TIMESTAMP': pa.timestamp('us', tz='UTC'),
+    'DATETIME': pa.timestamp('us'),
+    'DATE': pa.date32(),
+    'TIME': pa.time64('us'),
+}
+
+
+def to_arrow_schema(schema: list[bigquery.SchemaField]) -> pa.Schema:
+    """Maps a flat BigQuery schema to an Arrow schema."""
+    fields = []
+    for field in schema:
+        arrow_type = _ARROW_TYPES.get(field.field_type.upper())
+        if arrow_type is None:
+            raise ValueError(
+                f'Unsupported column type {field.field_type} ({field.name}).'
+            )
+        if field.mode == 'REPEATED':
+            arrow_type = pa.list_(arrow_type)
+        fields.append(
+            pa.field(field.name, arrow_type, nullable=field.mode != 'REQUIRED')
+        )
+    return pa.schema(fields)
+
+
+def _conform(table: pa.Table, schema: pa.Schema) -> pa.Table:
+    """Selects, orders and casts the columns of `schema`; missing ones are null."""
+    columns = [
+        table.column(field.name).cast(field.type)
+        if field.name in table.column_names
+        else pa.nulls(table.num_rows, field.type)
+        for field in schema
+    ]
+    return pa.Table.from_arrays(columns, schema=schema)
+
+
+def _quote(identifier: str) -> str:
+    return '"' + identifier.replace('"', '""') + '"'
+
+
+def _literal(value: str) -> str:
+    return "'" + value.replace("'", "''") + "'"
+
+
+class DuckDBLoader(BaseLoader):
+    """Load data into local Parquet files exposed as DuckDB views.
+
+    Every load job writes one compressed Parquet file to
+    `<root>/<dataset>/<table>/load_date=<YYYY-MM-DD>/`, and the table is a view
+    over all of its files in the DuckDB database `<root>/warehouse.duckdb`.
+    Mirrors `BigQueryLoader`, so runs and benchmarks work without a cloud project.
+    """
+
+    def __init__(
+        self,
+        root_dir: str = LOCAL_WAREHOUSE_DIR,
+        database: Optional[str] = None,
+        metrics: Optional[RunMetrics] = None,
+    ) -> None:
+        """Initializes the loader and opens the DuckDB database."""
+        self.root_dir = Path(root_dir)
+        self.root_dir.mkdir(parents=True, exist_ok=True)
+        self.connection = duckdb.connect(
+            database or str(self.root_dir / 'warehouse.duckdb')
+        )
+        self.load_stats: list[LoadStats] = []
+        self.metrics = metrics or RunMetrics()
+        self._lock = threading.Lock()
+
+    def _table_dir(self, dataset: str, table_name: str) -> Path:
+        return self.root_dir / dataset / table_name
+
+    @staticmethod
+    def _to_arrow(
+        data: Loadable, schema: Optional[list[bigquery.SchemaField]]
+    ) -> pa.Table:
+        if isinstance(data, pa.RecordBatch):
+            table = pa.Table.from_batches([data])
+        elif isinstance(data, pa.Table):
+            table = data
+        elif isinstance(data, pd.DataFrame):
+            table = pa.Table.from_pandas(data, preserve_index=False)
+        else:
+            table = pa.Table.from_pylist([dict(row) for row in data])
+        if schema is not None:
+            table = _conform(table, to_arrow_schema(schema))
+        return table
+
+    def _register_view(self, dataset: str, table_name: str) -> None:
+        """(Re)creates the view over all Parquet files of the table."""
+        files = str(self._table_dir(dataset, table_name) / '**' / '*.parquet')
+        view = f'{_quote(dataset)}.{_quote(table_name)}'
+        self.connection.execute(f'CREATE SCHEMA IF NOT EXISTS {_quote(dataset)}')
+        self.connection.execute(
+            f'CREATE OR REPLACE VIEW {view} AS SELECT * FROM '  # nosec B608
+            f'read_parquet({_literal(files)}, union_by_name = true, '
+            'hive_partitioning = false)'
+        )
+
+    def _merge(
+        self,
+        table_dir: Path,
+        incoming: pa.Table,
+        merge_keys: Sequence[str],
+        has_data: bool,
+    ) -> tuple[pa.Table, dict[Path, pa.Table]]:
+        """Upserts `incoming` on `merge_keys` without rewriting the whole table.
+
+        Returns the deduplicated incoming rows, written as a new file, and the
+        remaining rows of the existing files that held one of their keys. All
+        other files are left as they are, in their own load_date partitions.
+        """
+        keys = ', '.join(_quote(key) for key in merge_keys)
+        partition = keys
+        if LATEST_COLUMN in incoming.column_names:
+            partition += f' ORDER BY {_quote(LATEST_COLUMN)} DESC'
+        self.connection.register('_incoming', incoming)
+        try:
+            deduplicated = self.connection.sql(
+                'SELECT * FROM _incoming WHERE TRUE '
+                f'QUALIFY ROW_NUMBER() OVER (PARTITION BY {partition}) = 1'
+            ).fetch_arrow_table()
+            rewrites: dict[Path, pa.Table] = {}
+            if has_data:
+                # Only the key columns are scanned to find the files to rewrite
+                files = _literal(str(table_dir / '**' / '*.parquet'))
+                affected = self.connection.sql(
+                    'SELECT DISTINCT filename '  # nosec B608
+                    f'FROM read_parquet({files}, filename = true, '
+                    'union_by_name = true, hive_partitioning = false) '
+                    f'SEMI JOIN _incoming USING ({keys})'
+                ).fetchall()
+                for (filename,) in affected:
+                    rewrites[Path(filename)] = self.connection.sql(
+                        f'SELECT * FROM read_parquet({_literal(filename)}) '  # nosec B608
+                        f'ANTI JOIN _incoming USING ({keys})'
+                    ).fetch_arrow_table()
+            return deduplicated, rewrites
+        finally:
+            self.connection.unregister('_incoming')
+
+    def load_data(
+        self,
+        data: Loadable,
+        dataset: str,
+        table_name: str,
+        write_disposition: str = 'WRITE_APPEND',
+        schema: Optional[list[bigquery.SchemaField]] = None,
+        merge_keys: Optional[Sequence[str]] = None,
+    ) -> None:
+        """Writes data as a new Parquet file of the table.
+
+        Accepts a DataFrame, JSON rows or an Arrow Table/RecordBatch. An explicit
+        BigQuery schema is applied as in a BigQuery load job; otherwise the types
+        are inferred from the data. With `merge_keys`, rows are upserted on these
+        columns: only the files holding one of the keys are rewritten.
+        """
+        table_id = f'{dataset}.{table_name}'
+        record_count = len(data)
+        if record_count == 0:
+            print(f'No data provided for table {table_name}. Skipping.')
+            return
+
+        print(f'Loading {record_count} records into {table_id} (local)...')
+        start = time.perf_counter()
+        table_dir = self._table_dir(dataset, table_name)
+        with self._lock:
+            try:
+                has_data = table_dir.exists() and any(table_dir.rglob('*.parquet'))
+                if write_disposition == 'WRITE_EMPTY' and has_data:
+                    raise ValueError(f'Table {table_id} already contains data.')
+                if (
+                    write_disposition == 'WRITE_TRUNCATE'
+                    and not merge_keys
+                    and table_dir.exists()
+                ):
+                    shutil.rmtree(table_dir)
+
+                now = datetime.now(timezone.utc)
+                partition_dir = table_dir / f'load_date={now.date().isoformat()}'
+                partition_dir.mkdir(parents=True, exist_ok=True)
+                path = partition_dir / (
+                    f'part-{now.strftime("%H%M%S")}-{uuid.uuid4().hex[:8]}.parquet'
+                )
+                table = self._to_arrow(data, schema)
+                rewrites: dict[Path, pa.Table] = {}
+                if merge_keys:
+                    table, rewrites = self._merge(
+                        table_dir, table, merge_keys, has_data
+                    )
+                pq.write_table(table, path, compression=PARQUET_COMPRESSION)
+                # Files that held merged keys keep only their other rows
+                for old_path, rest in rewrites.items():
+                    if not rest.num_rows:
+                        old_path.unlink()
+                        continue
+                    temp_path = old_path.with_suffix('.tmp')
+                    pq.write_table(rest, temp_path, compression=PARQUET_COMPRESSION)
+                    os.replace(temp_path, old_path)
+                self._register_view(dataset, table_name)
+            except Exception as e:
+                self.metrics.add(
+                    f'load.{table_name}', seconds=time.perf_counter() - start, errors=1
+                )
+                print(f'Failed to load data into {table_id}: {e}')
+                raise
+
+        stats = LoadStats(
+            table_id=table_id,
+            source_format='PARQUET',
+            rows=record_count,
+            bytes=path.stat().st_size,
+            seconds=time.perf_counter() - start,
+        )
+        self.load_stats.append(stats)
+        self.metrics.add(
+            f'load.{table_name}',
+            seconds=stats.seconds,
+            calls=1,
+            rows=stats.rows,
+            bytes=stats.bytes,
+        )
+        print(
+            f'Loaded {stats.rows} rows ({stats.bytes / 1_000_000:.2f} MB '
+            f'{stats.source_format}) into {table_id} in {stats.seconds:.1f}s: '
+            f'{stats.rows_per_s:,.0f} rows/s, {stats.mb_per_s:.2f} MB/s.'
+        )
+
+    def query(self, sql: str) -> pa.Table:
+        """Runs a SQL query against the local tables, e.g. `dataset_raw.raw_activities`."""
+        with self._lock:
+            return self.connection.sql(sql).fetch_arrow_table()
+
+    def close(self) -> None:
+        """Closes the DuckDB database."""
+        self.connection.close()
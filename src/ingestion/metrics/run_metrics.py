@@ -0,0 +1,101 @@
+"""This module collects stage-level timing and throughput metrics of a run."""
+
+from collections.abc import Iterator
+from contextlib import contextmanager
+from dataclasses import asdict, dataclass
+from datetime import datetime, timezone
+import json
+import threading
+import time
+from typing import Any, Optional
+import uuid
+
+
+@dataclass
+class StageMetrics:
+    """Accumulated counters of a single pipeline stage.
+
+    `seconds` is the time spent inside the stage summed over all threads, so it can
+    exceed the wall time of the run for concurrent stages.
+    """
+
+    seconds: float = 0.0
+    calls: int = 0
+    rows: int = 0
+    bytes: int = 0
+    retries: int = 0
+    errors: int = 0
+
+
+class RunMetrics:
+    """Thread-safe collector of per-stage metrics, emitted as one JSON document."""
+
+    def __init__(self, pipeline: str = 'strava', run_id: Optional[str] = None) -> None:
+        """Initializes the collector and starts the run clock."""
+        self.pipeline = pipeline
+        self.run_id = run_id or uuid.uuid4().hex
+        self.started_at = datetime.now(timezone.utc)
+        self.status = 'running'
+        self.stages: dict[str, StageMetrics] = {}
+        self._start = time.perf_counter()
+        self._lock = threading.Lock()
+
+    def add(
+        self,
+        stage: str,
+        seconds: float = 0.0,
+        calls: int = 0,
+        rows: int = 0,
+        bytes: int = 0,
+        retries: int = 0,
+        errors: int = 0,
+    ) -> None:
+        """Adds counters to a stage."""
+        with self._lock:
+            stats = self.stages.setdefault(stage, StageMetrics())
+            stats.seconds += seconds
+            stats.calls += calls
+            stats.rows += rows
+            stats.bytes += bytes
+            stats.retries += retries
+            stats.errors += errors
+
+    @contextmanager
+    def stage(self, name: str) -> Iterator[None]:
+        """Times the enclosed block as one call of stage `name`."""
+        start = time.perf_counter()
+        try:
+            yield
+        except Exception:
+            self.add(name, seconds=time.perf_counter() - start, calls=1, errors=1)
+            raise
+        self.add(name, seconds=time.perf_counter() - start, calls=1)
+
+    # ---------------
+    # Emission
+    # ---------------
+    def to_dict(self) -> dict[str, Any]:
+        """Returns the run and all stages as a JSON-serializable dict."""
+        with self._lock:
+            stages = {name: asdict(stats) for name, stats in self.stages.items()}
+        return {
+            'run_id': self.run_id,
+            'pipeline': self.pipeline,
+            'status': self.status,
+            'started_at': self.started_at.isoformat(),
+            'wall_s': time.perf_counter() - self._start,
+            'stages': stages,
+        }
+
+    def to_json(self) -> str:
+        """Returns the metrics as a single JSON line (a structured log entry)."""
+        return json.dumps({'message': 'run_metrics', **self.to_dict()}, sort_keys=True)
+
+    def to_run_log_row(self) -> dict[str, Any]:
+        """Returns the metrics as a row of the run-log table."""
+        document = self.to_dict()
+        return {
+            **document,
+            'finished_at': datetime.now(timezone.utc).isoformat(),
+            'stages': json.dumps(document['stages'], sort_keys=True),
+        }
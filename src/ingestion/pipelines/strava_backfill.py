@@ -0,0 +1,277 @@
+"""This module runs a resumable, checkpointed backfill of the Strava history."""
+
+from datetime import date, datetime, time, timedelta, timezone
+import os
+from typing import Any
+
+import pandas as pd
+
+from ingestion.auth import strava_roster
+from ingestion.auth.strava_roster import RosterEntry
+from ingestion.extractors.strava_extractor import StravaExtractor
+from ingestion.extractors.strava_rate_limiter import RateLimitExhausted
+from ingestion.loaders.base import BaseLoader
+from ingestion.loaders.change_tracking_loader import ChangeTrackingLoader
+from ingestion.metrics.run_metrics import RunMetrics
+from ingestion.pipelines.strava_pipeline import (
+    DATASET_RAW,
+    DEAD_LETTER_KEY,
+    GEAR_CACHE_KEY,
+    GEAR_CACHE_TTL,
+    RAW_ACTIVITIES_MERGE_KEYS,
+    RAW_GEAR_DETAILS_MERGE_KEYS,
+    TABLE_NAME_RAW_ACTIVITIES,
+    TABLE_NAME_RAW_GEAR_DETAILS,
+    TRAINING_LOAD_KEY,
+    WATERMARK_KEY,
+    WATERMARK_OVERLAP,
+    StreamBuffer,
+    build_loader,
+    build_state_store,
+    build_stream_buffer,
+    build_token_store,
+    dbt_selectors,
+    dead_letter,
+    emit_run_metrics,
+    fetch_changed_gear,
+    iter_stream_batches,
+    load_training_load,
+    track_training_load,
+    trigger_dbt_job,
+)
+from ingestion.state.base import BaseStateStore
+from ingestion.state.checkpoint import BackfillCheckpoint, BackfillWindow, split_windows
+from ingestion.state.dead_letters import KIND_ACTIVITY, DeadLetterQueue
+from ingestion.state.gear_cache import GearCache
+from ingestion.state.training_load import TrainingLoad
+from ingestion.state.watermark import Watermark
+from models.strava_activity_model import StravaActivity
+
+
+# -------------------
+# Constants
+# -------------------
+# TODO: Move to config
+BACKFILL_START = os.environ.get('BACKFILL_START', '2009-01-01')  # Strava launch
+BACKFILL_END = os.environ.get('BACKFILL_END')  # defaults to tomorrow
+BACKFILL_WINDOW_DAYS = int(os.environ.get('BACKFILL_WINDOW_DAYS', '30'))
+CHECKPOINT_KEY = 'strava_backfill_checkpoint'
+BACKFILL_ATHLETE = os.environ.get('BACKFILL_ATHLETE')  # roster key, default: first
+
+
+def _epoch(day: date) -> int:
+    return int(datetime.combine(day, time.min, tzinfo=timezone.utc).timestamp())
+
+
+def _print_eta(
+    client: StravaExtractor,
+    checkpoint: BackfillCheckpoint,
+    remaining_windows: list[BackfillWindow],
+) -> None:
+    """Prints the estimated remaining time derived from the rate-limit budget."""
+    est_activities = max(
+        0,
+        int(checkpoint.avg_activities_per_window() * len(remaining_windows))
+        - len(checkpoint.activities_done),
+    )
+    # One stream request per activity plus two activity pages per window
+    est_requests = est_activities + 2 * len(remaining_windows)
+    eta_s = client.rate_limiter.estimate_seconds(est_requests)
+    print(
+        f'Backfill progress: {len(checkpoint.windows_done)} windows done, '
+        f'{len(remaining_windows)} remaining (~{est_activities} activities, '
+        f'~{est_requests} requests). ETA from rate budget: '
+        f'{timedelta(seconds=int(eta_s))}.'
+    )
+
+
+def _select_athlete(roster: list[RosterEntry]) -> RosterEntry:
+    """The roster entry of BACKFILL_ATHLETE, or the first one."""
+    if not BACKFILL_ATHLETE:
+        return roster[0]
+    for entry in roster:
+        if entry.key == BACKFILL_ATHLETE:
+            return entry
+    raise ValueError(f'Athlete {BACKFILL_ATHLETE} is not in the roster.')
+
+
+def _backfill_window(
+    window: BackfillWindow,
+    entry: RosterEntry,
+    client: StravaExtractor,
+    loader: BaseLoader,
+    stream_buffer: StreamBuffer,
+    checkpoint: BackfillCheckpoint,
+    state_store: BaseStateStore,
+    gear_cache: GearCache,
+    dead_letters: DeadLetterQueue,
+    training_load: TrainingLoad,
+    ingested_at_dt: datetime,
+) -> list[StravaActivity]:
+    """Loads activities, streams and gear of a single window.
+
+    Items that fail are dead-lettered, so the window is still finished.
+    """
+    ingested_at_str = ingested_at_dt.isoformat()
+    checkpoint_key = entry.state_key(CHECKPOINT_KEY)
+    training_load_key = entry.state_key(TRAINING_LOAD_KEY)
+    checkpoint.start_window(window)
+
+    def invalid_activity(item: dict[str, Any], error: Exception) -> None:
+        dead_letter(
+            dead_letters,
+            KIND_ACTIVITY,
+            str(item.get('id')),
+            error,
+            ingested_at_dt,
+            client.metrics,
+            payload=item,
+        )
+
+    activities: list[StravaActivity] = client.fetch_all_activities(
+        after=_epoch(window.start),
+        before=_epoch(window.end),
+        on_invalid=invalid_activity,
+    )
+    pending = [a for a in activities if a.id not in checkpoint.activities_done]
+    print(
+        f'Window {window.window_id}: {len(activities)} activities, '
+        f'{len(pending)} without loaded streams.'
+    )
+
+    # Streams, checkpointed whenever a batch has been loaded
+    for activity, batches in iter_stream_batches(
+        client, pending, ingested_at_dt, dead_letters, entry
+    ):
+        loaded_ids = stream_buffer.add(activity.id, batches)
+        track_training_load(training_load, activity, batches)
+        if loaded_ids:
+            # Activities of the checkpoint are skipped on resume; keep their load
+            training_load.save(state_store, training_load_key)
+            checkpoint.activities_done.update(loaded_ids)
+            checkpoint.save(state_store, checkpoint_key)
+    checkpoint.activities_done.update(stream_buffer.flush())
+
+    # Activities and not yet loaded gear once all streams of the window are in
+    loader.load_data(
+        data=pd.DataFrame([
+            {**a.model_dump(), 'ingested_at': ingested_at_str} for a in activities
+        ]),
+        dataset=DATASET_RAW,
+        table_name=TABLE_NAME_RAW_ACTIVITIES,
+        merge_keys=RAW_ACTIVITIES_MERGE_KEYS,
+    )
+    loader.load_data(
+        data=fetch_changed_gear(
+            client,
+            {a.gear_id for a in activities if a.gear_id},
+            gear_cache,
+            ingested_at_dt,
+            dead_letters,
+        ),
+        dataset=DATASET_RAW,
+        table_name=TABLE_NAME_RAW_GEAR_DETAILS,
+        merge_keys=RAW_GEAR_DETAILS_MERGE_KEYS,
+    )
+    gear_cache.save(state_store, entry.state_key(GEAR_CACHE_KEY))
+    dead_letters.save(state_store, entry.state_key(DEAD_LETTER_KEY))
+    training_load.save(state_store, training_load_key)
+
+    checkpoint.finish_window(window, len(activities))
+    checkpoint.save(state_store, checkpoint_key)
+    return activities
+
+
+def run_backfill() -> None:
+    """Backfills the Strava history window by window.
+
+    Progress is checkpointed per window and per loaded stream batch, so a run that
+    crashes or runs out of daily rate budget resumes where it stopped.
+    """
+    print('Starting Strava backfill...')
+    metrics = RunMetrics(pipeline='strava_backfill')
+    ingested_at_dt = datetime.now(timezone.utc)
+
+    start = date.fromisoformat(BACKFILL_START)
+    end = (
+        date.fromisoformat(BACKFILL_END)
+        if BACKFILL_END
+        else datetime.now(timezone.utc).date() + timedelta(days=1)
+    )
+    windows = split_windows(start, end, BACKFILL_WINDOW_DAYS)
+
+    state_store = build_state_store()
+    entry = _select_athlete(strava_roster.load_roster())
+    print(f'Backfilling athlete {entry.key}.')
+    checkpoint_key = entry.state_key(CHECKPOINT_KEY)
+    gear_cache_key = entry.state_key(GEAR_CACHE_KEY)
+    watermark_key = entry.state_key(WATERMARK_KEY)
+    dead_letter_key = entry.state_key(DEAD_LETTER_KEY)
+    training_load_key = entry.state_key(TRAINING_LOAD_KEY)
+    token_manager = entry.token_manager(build_token_store(), legacy_store=state_store)
+    # Backfills can outlast the token lifetime
+    token_manager.start_background_refresh()
+    client = StravaExtractor(
+        access_token=token_manager.get_access_token, metrics=metrics
+    )
+    loader = ChangeTrackingLoader(build_loader(metrics))
+    checkpoint = BackfillCheckpoint.load(state_store, checkpoint_key)
+    watermark = Watermark.load(state_store, watermark_key)
+    dead_letters = DeadLetterQueue.load(state_store, dead_letter_key)
+    training_load = TrainingLoad.load(state_store, training_load_key)
+
+    remaining = [w for w in windows if w.window_id not in checkpoint.windows_done]
+    print(
+        f'{len(windows)} windows of {BACKFILL_WINDOW_DAYS} days between {start} '
+        f'and {end}, {len(remaining)} remaining.'
+    )
+
+    stream_buffer = build_stream_buffer(loader)
+    gear_cache = GearCache.load(state_store, gear_cache_key, GEAR_CACHE_TTL)
+    try:
+        while remaining:
+            activities = _backfill_window(
+                remaining[0],
+                entry,
+                client,
+                loader,
+                stream_buffer,
+                checkpoint,
+                state_store,
+                gear_cache,
+                dead_letters,
+                training_load,
+                ingested_at_dt,
+            )
+            remaining.pop(0)
+
+            # Later incremental runs continue after the backfilled history
+            watermark.advance(activities, WATERMARK_OVERLAP)
+            watermark.save(state_store, watermark_key)
+            _print_eta(client, checkpoint, remaining)
+
+        # The daily series once, from the earliest backfilled day on
+        load_training_load(training_load, loader, ingested_at_dt)
+        training_load.save(state_store, training_load_key)
+        metrics.status = 'succeeded'
+    except RateLimitExhausted as e:
+        print(f'Stopping backfill: {e}')
+        checkpoint.activities_done.update(stream_buffer.flush())
+        training_load.save(state_store, training_load_key)
+        checkpoint.save(state_store, checkpoint_key)
+        dead_letters.save(state_store, dead_letter_key)
+        _print_eta(client, checkpoint, remaining)
+        print('Run the backfill again to resume from the checkpoint.')
+        metrics.status = 'paused'
+        return
+    except Exception:
+        metrics.status = 'failed'
+        raise
+    finally:
+        print(f'Strava API stats: {client.stats_summary()}')
+        client.close()
+        token_manager.stop_background_refresh()
+        emit_run_metrics(metrics, loader)
+
+    print('Backfill complete. Triggering dbt-job...')
+    trigger_dbt_job(dbt_selectors(loader.changed_tables))
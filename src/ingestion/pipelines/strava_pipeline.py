@@ -1,18 +1,61 @@
 """This module orchestrates the entire EL process for Strava."""
 
-from datetime import datetime, timezone
+from collections import deque
+from collections.abc import Callable, Iterable, Iterator
+from concurrent.futures import Future, ThreadPoolExecutor
+from dataclasses import dataclass, field
+from datetime import date, datetime, timedelta, timezone
+import hashlib
+import json
 import os
-from typing import Any
+from typing import Any, Optional
 
 from google.auth import default
 from google.auth.transport.requests import AuthorizedSession
+from google.cloud import bigquery
 import pandas as pd
+import pyarrow as pa
+import requests
 
-from ingestion.auth import strava_auth
+from ingestion.auth import strava_roster
+from ingestion.auth.strava_roster import RosterEntry
 from ingestion.extractors.strava_extractor import StravaExtractor
+from ingestion.extractors.strava_rate_limiter import StravaRateLimiter
+from ingestion.loaders.async_loader import AsyncLoader
+from ingestion.loaders.base import BaseLoader
 from ingestion.loaders.bigquery_loader import BigQueryLoader
-from ingestion.schemas.strava_activity_streams_schema import ACTIVITY_STREAMS_SCHEMA
-from ingestion.transformers.strava_streams import explode_streams
+from ingestion.loaders.change_tracking_loader import ChangeTrackingLoader
+from ingestion.loaders.duckdb_loader import LOCAL_WAREHOUSE_DIR, DuckDBLoader
+from ingestion.metrics.run_metrics import RunMetrics
+from ingestion.schemas.run_log_schema import RUN_LOG_SCHEMA
+from ingestion.schemas.strava_activity_streams_schema import (
+    ACTIVITY_BEST_EFFORTS_SCHEMA,
+    ACTIVITY_STREAM_CURVES_SCHEMA,
+    ACTIVITY_STREAM_PYRAMID_SCHEMA,
+    ACTIVITY_STREAM_SUMMARY_SCHEMA,
+    ACTIVITY_STREAMS_COMPACT_SCHEMA,
+    ACTIVITY_STREAMS_SCHEMA,
+)
+from ingestion.schemas.training_load_schema import TRAINING_LOAD_DAILY_SCHEMA
+from ingestion.state.base import BaseStateStore
+from ingestion.state.bigquery_store import BigQueryStateStore
+from ingestion.state.dead_letters import (
+    KIND_ACTIVITY,
+    KIND_GEAR,
+    KIND_STREAMS,
+    DeadLetterQueue,
+)
+from ingestion.state.gear_cache import GearCache
+from ingestion.state.json_store import JsonFileStateStore
+from ingestion.state.training_load import TrainingLoad
+from ingestion.state.watermark import Watermark
+from ingestion.transformers.strava_stream_best_efforts import build_best_efforts
+from ingestion.transformers.strava_stream_curves import build_stream_curves
+from ingestion.transformers.strava_stream_pyramid import build_stream_pyramid
+from ingestion.transformers.strava_stream_summary import summarize_streams
+from ingestion.transformers.strava_streams import explode_streams_columnar
+from ingestion.transformers.strava_streams_compact import encode_streams_compact
+from models.strava_activity_model import StravaActivity
 
 
 # -------------------
@@ -24,12 +67,473 @@ TABLE_NAME_RAW_ACTIVITIES = 'raw_activities'
 TABLE_NAME_RAW_ATHLETE_INFO = 'raw_athlete_info'
 TABLE_NAME_RAW_GEAR_DETAILS = 'raw_gear_details'
 TABLE_NAME_RAW_ACTIVITY_STREAMS = 'raw_activity_streams'
+TABLE_NAME_RAW_ACTIVITY_STREAMS_COMPACT = 'raw_activity_streams_compact'
+TABLE_NAME_RAW_ACTIVITY_STREAM_PYRAMID = 'raw_activity_stream_pyramid'
+TABLE_NAME_RAW_ACTIVITY_STREAM_SUMMARY = 'raw_activity_stream_summary'
+TABLE_NAME_RAW_ACTIVITY_STREAM_CURVES = 'raw_activity_stream_curves'
+TABLE_NAME_RAW_ACTIVITY_BEST_EFFORTS = 'raw_activity_best_efforts'
+TABLE_NAME_RAW_TRAINING_LOAD_DAILY = 'raw_training_load_daily'
+# Natural keys on which the raw tables are upserted (MERGE) instead of appended
+RAW_ACTIVITIES_MERGE_KEYS = ['id']
+RAW_GEAR_DETAILS_MERGE_KEYS = ['id']
+RAW_TRAINING_LOAD_DAILY_MERGE_KEYS = ['athlete_id', 'day']
+
+BATCH_ROWS = 25_000
+COMPACT_BATCH_ROWS = 500  # one row per stream, i.e. ~45 activities
+PYRAMID_BATCH_ROWS = 100_000  # up to ~13,000 rows per stream and activity
+SUMMARY_BATCH_ROWS = 1_000  # one row per activity
+CURVES_BATCH_ROWS = 10_000  # up to 32 rows per activity
+BEST_EFFORTS_BATCH_ROWS = 5_000  # up to 6 rows per activity
+# 'rows' (one row per data point) or 'compact' (one encoded row per stream)
+STREAM_STORAGE_FORMAT = os.environ.get('STREAM_STORAGE_FORMAT', 'rows')
+# Point budgets of the downsampled stream tiers for the dashboard, '' to disable
+STREAM_PYRAMID_TIERS = tuple(
+    int(tier)
+    for tier in os.environ.get('STREAM_PYRAMID_TIERS', '500,2500,10000').split(',')
+    if tier.strip()
+)
+STREAM_FETCH_WORKERS = int(os.environ.get('STREAM_FETCH_WORKERS', '4'))
+LOAD_QUEUE_SIZE = 2  # load jobs waiting for the background loader
+ATHLETE_WORKERS = int(os.environ.get('ATHLETE_WORKERS', '4'))
+
+# Incremental extraction
+STATE_STORE = os.environ.get('STATE_STORE', 'bigquery')  # 'bigquery' or 'json'
+STATE_DIR = os.environ.get('STATE_DIR', '.pipeline_state')
+# Strava tokens are kept apart from the pipeline state, in an access-restricted place
+TOKEN_DATASET = os.environ.get('TOKEN_DATASET', 'dataset_auth')
+TOKEN_TABLE = 'strava_tokens'
+TOKEN_STATE_DIR = os.environ.get('TOKEN_STATE_DIR', '.pipeline_tokens')
+LOADER_BACKEND = os.environ.get('LOADER_BACKEND', 'bigquery')  # or 'duckdb'
+WATERMARK_KEY = 'strava_watermark'
+WATERMARK_OVERLAP = timedelta(
+    hours=int(os.environ.get('WATERMARK_OVERLAP_HOURS', '24'))
+)
+INITIAL_LOOKBACK_DAYS = 3  # used while no watermark has been stored yet
+GEAR_CACHE_KEY = 'strava_gear_cache'
+GEAR_CACHE_TTL = timedelta(hours=int(os.environ.get('GEAR_CACHE_TTL_HOURS', '24')))
+TRAINING_LOAD_KEY = 'strava_training_load'
+
+# Failed items are dead-lettered instead of failing the run (PIPELINE_MODE=retry)
+DEAD_LETTER_KEY = 'strava_dead_letters'
+# Beyond this many failures per athlete and run the cause is likely systemic
+MAX_DEAD_LETTERS_PER_RUN = int(os.environ.get('MAX_DEAD_LETTERS_PER_RUN', '50'))
+# HTTP errors left after the retries, and invalid payloads (incl. ValidationError)
+DEAD_LETTER_ERRORS = (requests.RequestException, ValueError)
+
+# dbt job: the CMD of Dockerfile.dbt and the source of the raw tables
+DBT_BUILD_ARGS = ['dbt', 'build', '--project-dir', '/app/dbt', '--profiles-dir', '/app']
+DBT_SOURCE = 'strava_data'
+DBT_SOURCE_TABLES = {
+    TABLE_NAME_RAW_ACTIVITIES,
+    TABLE_NAME_RAW_ATHLETE_INFO,
+    TABLE_NAME_RAW_GEAR_DETAILS,
+    TABLE_NAME_RAW_ACTIVITY_STREAMS,
+    TABLE_NAME_RAW_ACTIVITY_STREAMS_COMPACT,
+    TABLE_NAME_RAW_ACTIVITY_STREAM_PYRAMID,
+    TABLE_NAME_RAW_ACTIVITY_STREAM_SUMMARY,
+    TABLE_NAME_RAW_ACTIVITY_STREAM_CURVES,
+    TABLE_NAME_RAW_ACTIVITY_BEST_EFFORTS,
+    TABLE_NAME_RAW_TRAINING_LOAD_DAILY,
+}
+ATHLETE_INFO_KEY = 'strava_athlete_info'  # content hash of the last loaded roster
+
+# Observability
+RUN_LOG_TABLE = os.environ.get('RUN_LOG_TABLE')  # e.g. 'pipeline_runs', off if unset
+
+
+def build_state_store() -> BaseStateStore:
+    """Returns the configured store for watermarks and other pipeline state."""
+    if STATE_STORE == 'json':
+        return JsonFileStateStore(STATE_DIR)
+    return BigQueryStateStore(dataset=DATASET_RAW)
+
+
+def build_token_store() -> BaseStateStore:
+    """Returns the store of the athletes' cached Strava tokens."""
+    if STATE_STORE == 'json':
+        return JsonFileStateStore(TOKEN_STATE_DIR)
+    return BigQueryStateStore(dataset=TOKEN_DATASET, table_name=TOKEN_TABLE)
+
+
+def build_loader(metrics: Optional[RunMetrics] = None) -> BaseLoader:
+    """Returns the configured loader: BigQuery, or local Parquet/DuckDB files."""
+    if LOADER_BACKEND == 'duckdb':
+        return DuckDBLoader(LOCAL_WAREHOUSE_DIR, metrics=metrics)
+    return BigQueryLoader(metrics=metrics)
+
+
+def dead_letter(
+    dead_letters: DeadLetterQueue,
+    kind: str,
+    item_id: str,
+    error: Exception,
+    now: datetime,
+    metrics: RunMetrics,
+    payload: Optional[dict[str, Any]] = None,
+) -> None:
+    """Records a failed item, or raises once too many items failed in this run."""
+    reason = f'{type(error).__name__}: {error}'
+    dead_letters.add(kind, item_id, reason, now, payload=payload)
+    dead_letters.failures += 1
+    metrics.add('dead_letters', rows=1)
+    print(f'Dead-lettered {kind} {item_id}: {reason}')
+    if dead_letters.failures > MAX_DEAD_LETTERS_PER_RUN:
+        raise RuntimeError(
+            f'More than {MAX_DEAD_LETTERS_PER_RUN} items failed in this run.'
+        ) from error
+
+
+# --------------------------
+# Stream Fetching
+# --------------------------
+def fetch_streams_in_order(
+    client: StravaExtractor,
+    activities: Iterable[StravaActivity],
+    max_workers: int = STREAM_FETCH_WORKERS,
+    on_error: Optional[Callable[[StravaActivity, Exception], None]] = None,
+) -> Iterator[tuple[StravaActivity, dict[str, Any]]]:
+    """Fetches activity streams concurrently and yields them in input order.
+
+    At most `max_workers * 2` requests are in flight, so memory stays bounded and
+    the downstream batches are identical to a sequential run. With `on_error`,
+    activities failing with one of DEAD_LETTER_ERRORS are passed to it and skipped.
+    """
+
+    def result(
+        activity: StravaActivity, future: Future[dict[str, Any]]
+    ) -> Iterator[tuple[StravaActivity, dict[str, Any]]]:
+        try:
+            yield activity, future.result()
+        except DEAD_LETTER_ERRORS as e:
+            if on_error is None:
+                raise
+            on_error(activity, e)
+
+    with ThreadPoolExecutor(max_workers=max_workers) as pool:
+        pending: deque[tuple[StravaActivity, Future[dict[str, Any]]]] = deque()
+        for activity in activities:
+            pending.append((
+                activity,
+                pool.submit(client.fetch_activity_streams, str(activity.id)),
+            ))
+            if len(pending) >= max_workers * 2:
+                yield from result(*pending.popleft())
+        while pending:
+            yield from result(*pending.popleft())
+
+
+def iter_stream_batches(
+    client: StravaExtractor,
+    activities: Iterable[StravaActivity],
+    ingested_at_dt: datetime,
+    dead_letters: DeadLetterQueue,
+    entry: RosterEntry,
+) -> Iterator[tuple[StravaActivity, dict[str, pa.RecordBatch]]]:
+    """Fetches and transforms the streams of `activities`, in input order.
+
+    Yields the record batches of each activity per raw stream table, summarized
+    with the thresholds of the athlete's roster `entry`. Activities
+    whose streams cannot be fetched or transformed are dead-lettered with their
+    summary as payload and skipped.
+    """
+
+    def failed(activity: StravaActivity, error: Exception) -> None:
+        dead_letter(
+            dead_letters,
+            KIND_STREAMS,
+            str(activity.id),
+            error,
+            ingested_at_dt,
+            client.metrics,
+            payload=activity.model_dump(mode='json'),
+        )
+
+    for activity, raw_streams in fetch_streams_in_order(
+        client, activities, on_error=failed
+    ):
+        try:
+            batches = transform_streams(
+                activity.id, raw_streams, ingested_at_dt, client.metrics, entry
+            )
+        except ValueError as e:
+            failed(activity, e)
+            continue
+        yield activity, batches
+
+
+def fetch_changed_gear(
+    client: StravaExtractor,
+    gear_ids: Iterable[str],
+    gear_cache: GearCache,
+    ingested_at_dt: datetime,
+    dead_letters: Optional[DeadLetterQueue] = None,
+) -> pd.DataFrame:
+    """Fetches gear outside the cache TTL and returns the rows of changed gear.
+
+    With `dead_letters`, gear that cannot be fetched is dead-lettered and skipped.
+    """
+    gear_details = []
+    skipped = 0
+    for gear_id in sorted(gear_ids):
+        if gear_cache.is_fresh(gear_id, ingested_at_dt):
+            skipped += 1
+            continue
+        try:
+            gear = client.fetch_gear_details(gear_id=gear_id)
+        except DEAD_LETTER_ERRORS as e:
+            if dead_letters is None:
+                raise
+            dead_letter(
+                dead_letters, KIND_GEAR, gear_id, e, ingested_at_dt, client.metrics
+            )
+            continue
+        if dead_letters is not None:
+            dead_letters.resolve(KIND_GEAR, gear_id)
+        if gear_cache.update(gear, ingested_at_dt):
+            gear_details.append({
+                **gear.model_dump(),
+                'ingested_at': ingested_at_dt.isoformat(),
+            })
+    print(f'Gear: {len(gear_details)} changed, {skipped} skipped within the cache TTL.')
+    return pd.DataFrame(gear_details)
+
+
+def transform_streams(
+    activity_id: int,
+    raw_streams: dict[str, Any],
+    ingested_at_dt: datetime,
+    metrics: RunMetrics,
+    entry: RosterEntry,
+) -> dict[str, pa.RecordBatch]:
+    """Converts the streams of one activity into the configured raw tables.
+
+    Returns the record batches of the raw format (STREAM_STORAGE_FORMAT), of the
+    stream summary (with the zones and training load of the athlete's `entry`),
+    curves and best efforts and, unless disabled, of the stream pyramid, keyed by
+    table name.
+    """
+    if STREAM_STORAGE_FORMAT == 'compact':
+        stage, transform = 'encode_streams', encode_streams_compact
+        table_name = TABLE_NAME_RAW_ACTIVITY_STREAMS_COMPACT
+    else:
+        stage, transform = 'explode_streams', explode_streams_columnar
+        table_name = TABLE_NAME_RAW_ACTIVITY_STREAMS
+    with metrics.stage(stage):
+        batch = transform(activity_id, raw_streams, ingested_at_dt)
+    metrics.add(stage, rows=batch.num_rows)
+    batches = {table_name: batch}
+
+    if STREAM_PYRAMID_TIERS:
+        with metrics.stage('build_stream_pyramid'):
+            pyramid = build_stream_pyramid(
+                activity_id, raw_streams, ingested_at_dt, STREAM_PYRAMID_TIERS
+            )
+        metrics.add('build_stream_pyramid', rows=pyramid.num_rows)
+        batches[TABLE_NAME_RAW_ACTIVITY_STREAM_PYRAMID] = pyramid
+
+    with metrics.stage('summarize_streams'):
+        batches[TABLE_NAME_RAW_ACTIVITY_STREAM_SUMMARY] = summarize_streams(
+            activity_id,
+            raw_streams,
+            ingested_at_dt,
+            entry.max_hr,
+            entry.ftp_w,
+            entry.resting_hr,
+        )
+    metrics.add('summarize_streams', rows=1)
+
+    with metrics.stage('build_stream_curves'):
+        curves = build_stream_curves(activity_id, raw_streams, ingested_at_dt)
+    metrics.add('build_stream_curves', rows=curves.num_rows)
+    batches[TABLE_NAME_RAW_ACTIVITY_STREAM_CURVES] = curves
+
+    with metrics.stage('build_best_efforts'):
+        efforts = build_best_efforts(activity_id, raw_streams, ingested_at_dt)
+    metrics.add('build_best_efforts', rows=efforts.num_rows)
+    batches[TABLE_NAME_RAW_ACTIVITY_BEST_EFFORTS] = efforts
+    return batches
+
+
+@dataclass(frozen=True)
+class StreamTable:
+    """A raw table of stream records, loaded in chunks of about `batch_rows`."""
+
+    name: str
+    schema: list[bigquery.SchemaField]
+    batch_rows: int
+
+
+class StreamBuffer:
+    """Buffers stream record batches per raw table and loads them in chunks.
+
+    All tables are flushed together once one of them reaches its `batch_rows`, so
+    an activity counts as loaded once all of its batches have been loaded.
+    """
+
+    def __init__(self, loader: BaseLoader, tables: list[StreamTable]) -> None:
+        self.loader = loader
+        self.tables = tables
+        self._batches: dict[str, list[pa.RecordBatch]] = {t.name: [] for t in tables}
+        self._num_rows = dict.fromkeys(self._batches, 0)
+        self._activity_ids: list[int] = []
+
+    def add(self, activity_id: int, batches: dict[str, pa.RecordBatch]) -> list[int]:
+        """Adds the streams of one activity and returns the ids of loaded activities."""
+        for table_name, batch in batches.items():
+            self._batches[table_name].append(batch)
+            self._num_rows[table_name] += batch.num_rows
+        self._activity_ids.append(activity_id)
+        if any(self._num_rows[t.name] >= t.batch_rows for t in self.tables):
+            return self.flush()
+        return []
+
+    def flush(self) -> list[int]:
+        """Loads all buffered rows and returns the ids of the loaded activities."""
+        for table in self.tables:
+            if self._num_rows[table.name]:
+                self.loader.load_data(
+                    data=pa.Table.from_batches(self._batches[table.name]),
+                    dataset=DATASET_RAW,
+                    table_name=table.name,
+                    write_disposition='WRITE_APPEND',
+                    schema=table.schema,
+                )
+            self._batches[table.name] = []
+            self._num_rows[table.name] = 0
+        loaded_ids = self._activity_ids
+        self._activity_ids = []
+        return loaded_ids
+
+
+def build_stream_buffer(loader: BaseLoader) -> StreamBuffer:
+    """Returns a buffer for the raw stream tables of the configured formats."""
+    if STREAM_STORAGE_FORMAT == 'compact':
+        tables = [
+            StreamTable(
+                TABLE_NAME_RAW_ACTIVITY_STREAMS_COMPACT,
+                ACTIVITY_STREAMS_COMPACT_SCHEMA,
+                COMPACT_BATCH_ROWS,
+            )
+        ]
+    else:
+        tables = [
+            StreamTable(
+                TABLE_NAME_RAW_ACTIVITY_STREAMS, ACTIVITY_STREAMS_SCHEMA, BATCH_ROWS
+            )
+        ]
+    tables += [
+        StreamTable(
+            TABLE_NAME_RAW_ACTIVITY_STREAM_SUMMARY,
+            ACTIVITY_STREAM_SUMMARY_SCHEMA,
+            SUMMARY_BATCH_ROWS,
+        ),
+        StreamTable(
+            TABLE_NAME_RAW_ACTIVITY_STREAM_CURVES,
+            ACTIVITY_STREAM_CURVES_SCHEMA,
+            CURVES_BATCH_ROWS,
+        ),
+        StreamTable(
+            TABLE_NAME_RAW_ACTIVITY_BEST_EFFORTS,
+            ACTIVITY_BEST_EFFORTS_SCHEMA,
+            BEST_EFFORTS_BATCH_ROWS,
+        ),
+    ]
+    if STREAM_PYRAMID_TIERS:
+        tables.append(
+            StreamTable(
+                TABLE_NAME_RAW_ACTIVITY_STREAM_PYRAMID,
+                ACTIVITY_STREAM_PYRAMID_SCHEMA,
+                PYRAMID_BATCH_ROWS,
+            )
+        )
+    return StreamBuffer(loader, tables)
+
+
+def track_training_load(
+    training_load: TrainingLoad,
+    activity: StravaActivity,
+    batches: dict[str, pa.RecordBatch],
+) -> None:
+    """Records the training load of the activity's stream summary, if it has one."""
+    load = batches[TABLE_NAME_RAW_ACTIVITY_STREAM_SUMMARY]['training_load'][0].as_py()
+    if load is None or not activity.start_date_local:
+        return
+    if training_load.athlete_id is None and activity.athlete is not None:
+        training_load.athlete_id = activity.athlete.id
+    day = date.fromisoformat(activity.start_date_local[:10])
+    training_load.add(activity.id, day, load)
+
+
+def load_training_load(
+    training_load: TrainingLoad, loader: BaseLoader, ingested_at_dt: datetime
+) -> None:
+    """Upserts the days of the athlete's ATL/CTL/TSB series that changed.
+
+    Normally only the days since the last run are computed; the series itself is
+    persisted by the caller once the load has succeeded.
+    """
+    if training_load.athlete_id is None:
+        return  # no activity with a training load yet
+    rows = training_load.advance(ingested_at_dt.date())
+    if rows:
+        loader.load_data(
+            data=pd.DataFrame([{**row, 'ingested_at': ingested_at_dt} for row in rows]),
+            dataset=DATASET_RAW,
+            table_name=TABLE_NAME_RAW_TRAINING_LOAD_DAILY,
+            schema=TRAINING_LOAD_DAILY_SCHEMA,
+            merge_keys=RAW_TRAINING_LOAD_DAILY_MERGE_KEYS,
+        )
+
+
+def athlete_info_hash(athlete_rows: list[dict[str, Any]]) -> str:
+    """Stable hash of the athlete profiles, ignoring the ingestion time."""
+    profiles = [
+        {key: value for key, value in row.items() if key != 'ingested_at'}
+        for row in athlete_rows
+    ]
+    payload = json.dumps(profiles, sort_keys=True, default=str)
+    return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+
+
+def emit_run_metrics(metrics: RunMetrics, loader: BaseLoader) -> None:
+    """Logs the run metrics as JSON and appends them to the optional run-log table."""
+    print(metrics.to_json())
+    if not RUN_LOG_TABLE:
+        return
+    try:
+        loader.load_data(
+            data=[metrics.to_run_log_row()],
+            dataset=DATASET_RAW,
+            table_name=RUN_LOG_TABLE,
+            write_disposition='WRITE_APPEND',
+            schema=RUN_LOG_SCHEMA,
+        )
+    except Exception as e:
+        # The run log must never fail the pipeline itself
+        print(f'Failed to write the run log: {e}')
 
 
 # --------------------------
 # Pipeline Orchestration
 # --------------------------
-def trigger_dbt_job() -> None:
+def dbt_selectors(changed_tables: Iterable[str]) -> list[str]:
+    """dbt selectors of the models downstream of the changed raw tables."""
+    return [
+        f'source:{DBT_SOURCE}.{table}+'
+        for table in sorted(set(changed_tables) & DBT_SOURCE_TABLES)
+    ]
+
+
+def trigger_dbt_job(select: Optional[list[str]] = None) -> None:
+    """Starts the dbt Cloud Run job, limited to `select` if given.
+
+    Without `select` the job runs its default full `dbt build`; an empty selection
+    skips the job, as there is nothing to transform.
+    """
+    if select is not None and not select:
+        print('No raw table changed. dbt-job not triggered.')
+        return
+
     PROJECT_ID = os.environ.get('GCP_PROJECT_ID')
     REGION = os.environ.get('GCP_REGION')
     CLOUD_RUN_DBT_JOB_NAME = os.environ.get('CLOUD_RUN_DBT_JOB_NAME')
@@ -38,7 +542,21 @@ def trigger_dbt_job() -> None:
 
     creds, _ = default(scopes=['https://www.googleapis.com/auth/cloud-platform'])
     authed_session = AuthorizedSession(creds)
-    response = authed_session.post(url)
+    if select is None:
+        response = authed_session.post(url)
+    else:
+        # The args replace the image CMD, hence the full dbt command line
+        print(f'Selecting dbt models: {" ".join(select)}')
+        response = authed_session.post(
+            url,
+            json={
+                'overrides': {
+                    'containerOverrides': [
+                        {'args': [*DBT_BUILD_ARGS, '--select', *select]}
+                    ]
+                }
+            },
+        )
 
     if response.status_code == 200:
         print('Successfully triggered dbt-job')
@@ -46,97 +564,272 @@ def trigger_dbt_job() -> None:
         print(f'Failed to trigger dbt-job: {response.status_code} - {response.text}')
 
 
-def run() -> None:
-    """Executes the full Strava Extract and Load pipeline."""
-    print('Starting Strava EL pipeline...')
+@dataclass
+class AthleteExtract:
+    """What one athlete's extraction leaves to be loaded and persisted."""
 
-    ingested_at_dt = datetime.now(timezone.utc)  # for DataFrames / TIMESTAMP dtype
-    ingested_at_str = ingested_at_dt.isoformat()  # for JSON loading
+    entry: RosterEntry
+    athlete_info: dict[str, Any]
+    gear_details: pd.DataFrame
+    watermark: Watermark
+    gear_cache: GearCache
+    dead_letters: DeadLetterQueue
+    training_load: TrainingLoad
+    # New activities whose streams are left to the shards (fetch_streams=False)
+    pending_activities: list[StravaActivity] = field(default_factory=list)
 
-    # Authenticate
-    access_token = strava_auth.get_access_token()
-    client = StravaExtractor(access_token=access_token)
 
-    # Initialize BigQuery loader and load data
-    loader = BigQueryLoader()
+def extract_athlete(
+    entry: RosterEntry,
+    state_store: BaseStateStore,
+    token_store: BaseStateStore,
+    rate_limiter: StravaRateLimiter,
+    loader: BaseLoader,
+    metrics: RunMetrics,
+    ingested_at_dt: datetime,
+    fetch_streams: bool = True,
+) -> AthleteExtract:
+    """Extracts one athlete and hands activities and streams to `loader`.
 
-    # Extract athlete info
-    athlete_info = client.fetch_athlete_info()
-    df_athlete_info = pd.DataFrame([athlete_info.model_dump()])
-    df_athlete_info['ingested_at'] = ingested_at_dt
+    Athlete info, changed gear and the advanced state are returned, so they are
+    only loaded and persisted once the loads of all athletes have succeeded.
+    Without `fetch_streams`, the new activities are returned instead of their
+    streams being fetched.
+    """
+    ingested_at_str = ingested_at_dt.isoformat()  # for JSON loading
 
-    # Extract activities
-    activities_data = client.fetch_all_activities(days=3)
-    df_activities = pd.DataFrame([
-        {**a.model_dump(), 'ingested_at': ingested_at_str} for a in activities_data
-    ])
+    # Authenticate with the athlete's cached token, refreshed shortly before expiry
+    token_manager = entry.token_manager(token_store, legacy_store=state_store)
+    client = StravaExtractor(
+        access_token=token_manager.get_access_token,
+        rate_limiter=rate_limiter,
+        metrics=metrics,
+    )
 
-    # Extract streams
-    BATCH_ROWS = 25_000
-    buffer: list[dict[str, Any]] = []
+    # Load the high-water mark of the previous runs
+    watermark = Watermark.load(state_store, entry.state_key(WATERMARK_KEY))
+    dead_letters = DeadLetterQueue.load(state_store, entry.state_key(DEAD_LETTER_KEY))
+    training_load = TrainingLoad.load(state_store, entry.state_key(TRAINING_LOAD_KEY))
 
-    for activity in activities_data:
-        streams = explode_streams(
-            activity.id, client.fetch_activity_streams(activity_id=str(activity.id))
-        )
-        buffer.extend(
-            {**r.model_dump(), 'ingested_at': ingested_at_str} for r in streams
+    def invalid_activity(item: dict[str, Any], error: Exception) -> None:
+        dead_letter(
+            dead_letters,
+            KIND_ACTIVITY,
+            str(item.get('id')),
+            error,
+            ingested_at_dt,
+            metrics,
+            payload=item,
         )
 
-        if len(buffer) >= BATCH_ROWS:
+    gear_ids: set[str] = set()
+    counts = {'activities': 0, 'new': 0}
+
+    def new_activities() -> Iterator[StravaActivity]:
+        """Loads each activity page and yields the activities without streams."""
+        # Activities since the watermark (minus the overlap for late edits)
+        for page in client.iter_activity_pages(
+            days=INITIAL_LOOKBACK_DAYS,
+            after=watermark.after(WATERMARK_OVERLAP),
+            on_invalid=invalid_activity,
+        ):
             loader.load_data(
-                data=buffer,
+                data=pd.DataFrame([
+                    {**a.model_dump(), 'ingested_at': ingested_at_str} for a in page
+                ]),
                 dataset=DATASET_RAW,
-                table_name=TABLE_NAME_RAW_ACTIVITY_STREAMS,
-                write_disposition='WRITE_APPEND',
-                schema=ACTIVITY_STREAMS_SCHEMA,
+                table_name=TABLE_NAME_RAW_ACTIVITIES,
+                merge_keys=RAW_ACTIVITIES_MERGE_KEYS,
+            )
+            gear_ids.update(a.gear_id for a in page if a.gear_id)
+            new = [a for a in page if watermark.is_new(a)]
+            counts['activities'] += len(page)
+            counts['new'] += len(new)
+            # Only persisted by the caller, once all loads have succeeded
+            watermark.advance(page, WATERMARK_OVERLAP)
+            yield from new
+
+    try:
+        # Extract athlete info
+        athlete_info = client.fetch_athlete_info()
+
+        # Extract streams; failing activities are dead-lettered
+        pending_activities = []
+        if fetch_streams:
+            stream_buffer = build_stream_buffer(loader)
+            for activity, batches in iter_stream_batches(
+                client, new_activities(), ingested_at_dt, dead_letters, entry
+            ):
+                stream_buffer.add(activity.id, batches)
+                track_training_load(training_load, activity, batches)
+            stream_buffer.flush()
+        else:
+            pending_activities = list(new_activities())
+        print(
+            f'Athlete {entry.key}: {counts["new"]} new activities, '
+            f'{counts["activities"] - counts["new"]} already loaded.'
+        )
+
+        # Extract gear details that are not cached or have changed
+        gear_cache = GearCache.load(
+            state_store, entry.state_key(GEAR_CACHE_KEY), GEAR_CACHE_TTL
+        )
+        with metrics.stage('fetch_gear'):
+            df_gear_details = fetch_changed_gear(
+                client, gear_ids, gear_cache, ingested_at_dt, dead_letters
             )
-            buffer.clear()
-    if buffer:
+    finally:
+        print(f'Strava API stats ({entry.key}): {client.stats_summary()}')
+        client.close()
+
+    return AthleteExtract(
+        entry=entry,
+        athlete_info={**athlete_info.model_dump(), 'ingested_at': ingested_at_dt},
+        gear_details=df_gear_details,
+        watermark=watermark,
+        gear_cache=gear_cache,
+        dead_letters=dead_letters,
+        training_load=training_load,
+        pending_activities=pending_activities,
+    )
+
+
+def extract_roster(
+    roster: list[RosterEntry],
+    state_store: BaseStateStore,
+    loader: BaseLoader,
+    metrics: RunMetrics,
+    ingested_at_dt: datetime,
+    fetch_streams: bool = True,
+) -> list[AthleteExtract]:
+    """Extracts the athletes of the roster concurrently.
+
+    They share the app's rate-limit budget, which Strava enforces per app.
+    """
+    rate_limiter = StravaRateLimiter()
+    token_store = build_token_store()
+    with ThreadPoolExecutor(max_workers=min(ATHLETE_WORKERS, len(roster))) as pool:
+        futures = [
+            pool.submit(
+                extract_athlete,
+                entry,
+                state_store,
+                token_store,
+                rate_limiter,
+                loader,
+                metrics,
+                ingested_at_dt,
+                fetch_streams,
+            )
+            for entry in roster
+        ]
+        return [future.result() for future in futures]
+
+
+def load_profiles_and_gear(
+    extracts: list[AthleteExtract], state_store: BaseStateStore, loader: BaseLoader
+) -> str:
+    """Loads the athlete profiles if they changed, and the changed gear.
+
+    Returns the content hash of the profiles, to be stored once loaded.
+    """
+    # One row per athlete of the roster, only rewritten when it has changed
+    athlete_rows = [extract.athlete_info for extract in extracts]
+    athlete_hash = athlete_info_hash(athlete_rows)
+    stored_hash = (state_store.get(ATHLETE_INFO_KEY) or {}).get('content_hash')
+    if athlete_hash != stored_hash:
         loader.load_data(
-            data=buffer,
+            data=pd.DataFrame(athlete_rows),
             dataset=DATASET_RAW,
-            table_name=TABLE_NAME_RAW_ACTIVITY_STREAMS,
-            write_disposition='WRITE_APPEND',
-            schema=ACTIVITY_STREAMS_SCHEMA,
+            table_name=TABLE_NAME_RAW_ATHLETE_INFO,
+            write_disposition='WRITE_TRUNCATE',
+        )
+
+    df_gear_details = pd.concat(
+        [extract.gear_details for extract in extracts], ignore_index=True
+    )
+    if not df_gear_details.empty:
+        loader.load_data(
+            data=df_gear_details,
+            dataset=DATASET_RAW,
+            table_name=TABLE_NAME_RAW_GEAR_DETAILS,
+            merge_keys=RAW_GEAR_DETAILS_MERGE_KEYS,
+        )
+    return athlete_hash
+
+
+def save_athlete_state(
+    extract: AthleteExtract,
+    state_store: BaseStateStore,
+    watermark_key: Optional[str] = None,
+) -> None:
+    """Persists watermark, caches, dead letters and training load of an athlete."""
+    entry = extract.entry
+    extract.watermark.save(state_store, watermark_key or entry.state_key(WATERMARK_KEY))
+    extract.gear_cache.save(state_store, entry.state_key(GEAR_CACHE_KEY))
+    extract.dead_letters.save(state_store, entry.state_key(DEAD_LETTER_KEY))
+    extract.training_load.save(state_store, entry.state_key(TRAINING_LOAD_KEY))
+    if extract.dead_letters:
+        print(
+            f'Athlete {entry.key}: {len(extract.dead_letters)} '
+            'dead-lettered items, reprocess them with PIPELINE_MODE=retry.'
         )
-        buffer.clear()
 
-    # Extract gear details
-    gear_details = []
-    for gear_id in df_activities['gear_id'].unique():
-        if gear_id and gear_id is not None:
-            gear = client.fetch_gear_details(gear_id=gear_id)
-            gear_details.append({**gear.model_dump(), 'ingested_at': ingested_at_str})
-    df_gear_details = pd.DataFrame(gear_details)
+
+def run(loader: Optional[BaseLoader] = None) -> RunMetrics:
+    """Executes the full Strava Extract and Load pipeline.
+
+    Activity pages and streams are consumed lazily and handed to a background
+    loader through a bounded queue, so memory does not grow with the number of
+    activities and BigQuery load jobs overlap with further API fetches.
+    The athletes of the roster are extracted concurrently; they share the app's
+    rate-limit budget and the loader, and each has its own token and watermark.
+    `loader` replaces the BigQuery loader, e.g. for local runs and benchmarks.
+    Returns the metrics of the run.
+    """
+    print('Starting Strava EL pipeline...')
+    metrics = RunMetrics(pipeline='strava_incremental')
+    ingested_at_dt = datetime.now(timezone.utc)  # for DataFrames / TIMESTAMP dtype
+
+    state_store = build_state_store()
+    roster = strava_roster.load_roster()
+
+    # Initialize the loader; load jobs run on a background thread
+    target_loader = loader or build_loader(metrics)
+    tracking_loader = ChangeTrackingLoader(target_loader)
+    async_loader = AsyncLoader(tracking_loader, max_pending=LOAD_QUEUE_SIZE)
 
     try:
-        if not df_athlete_info.empty:
-            loader.load_data(
-                data=df_athlete_info,
-                dataset=DATASET_RAW,
-                table_name=TABLE_NAME_RAW_ATHLETE_INFO,
-                write_disposition='WRITE_TRUNCATE',
+        try:
+            extracts = extract_roster(
+                roster, state_store, async_loader, metrics, ingested_at_dt
             )
+        except Exception:
+            metrics.status = 'failed'
+            raise
 
-        if not df_activities.empty:
-            loader.load_data(
-                data=df_activities,
-                dataset=DATASET_RAW,
-                table_name=TABLE_NAME_RAW_ACTIVITIES,
-                write_disposition='WRITE_APPEND',
-            )
+        try:
+            athlete_hash = load_profiles_and_gear(extracts, state_store, async_loader)
+            for extract in extracts:
+                load_training_load(extract.training_load, async_loader, ingested_at_dt)
+            with metrics.stage('wait_for_loads'):
+                async_loader.join()
 
-        if not df_gear_details.empty:
-            loader.load_data(
-                data=df_gear_details,
-                dataset=DATASET_RAW,
-                table_name=TABLE_NAME_RAW_GEAR_DETAILS,
-                write_disposition='WRITE_APPEND',
-            )
+            # Only advance the watermarks and caches once everything has been loaded
+            for extract in extracts:
+                save_athlete_state(extract, state_store)
+            state_store.put(ATHLETE_INFO_KEY, {'content_hash': athlete_hash})
 
-        # NOTE: Remove the following two lines of code for pipeline orchestration in Airflow
-        print('Triggering dbt-job...')
-        trigger_dbt_job()
-    except Exception as e:
-        print(f'Load failed. dbt-job not triggered. Error: {e}')
+            # NOTE: Remove the following two lines of code for pipeline orchestration in Airflow
+            print('Triggering dbt-job...')
+            with metrics.stage('trigger_dbt'):
+                trigger_dbt_job(dbt_selectors(tracking_loader.changed_tables))
+            metrics.status = 'succeeded'
+        except Exception as e:
+            metrics.status = 'failed'
+            print(f'Load failed. dbt-job not triggered. Error: {e}')
+    finally:
+        # Also after a failed extraction: the queued loads finish and report errors
+        async_loader.close()
+        emit_run_metrics(metrics, target_loader)
+    return metrics
@@ -0,0 +1,206 @@
+"""This module reprocesses the dead-lettered items of earlier runs."""
+
+from datetime import datetime, timezone
+import os
+
+import pandas as pd
+
+from ingestion.auth import strava_roster
+from ingestion.auth.strava_roster import RosterEntry
+from ingestion.extractors.strava_extractor import StravaExtractor
+from ingestion.extractors.strava_rate_limiter import StravaRateLimiter
+from ingestion.loaders.base import BaseLoader
+from ingestion.loaders.change_tracking_loader import ChangeTrackingLoader
+from ingestion.metrics.run_metrics import RunMetrics
+from ingestion.pipelines.strava_pipeline import (
+    DATASET_RAW,
+    DEAD_LETTER_ERRORS,
+    DEAD_LETTER_KEY,
+    GEAR_CACHE_KEY,
+    GEAR_CACHE_TTL,
+    RAW_ACTIVITIES_MERGE_KEYS,
+    RAW_GEAR_DETAILS_MERGE_KEYS,
+    TABLE_NAME_RAW_ACTIVITIES,
+    TABLE_NAME_RAW_GEAR_DETAILS,
+    TRAINING_LOAD_KEY,
+    build_loader,
+    build_state_store,
+    build_stream_buffer,
+    build_token_store,
+    dbt_selectors,
+    dead_letter,
+    emit_run_metrics,
+    fetch_changed_gear,
+    iter_stream_batches,
+    load_training_load,
+    track_training_load,
+    trigger_dbt_job,
+)
+from ingestion.state.base import BaseStateStore
+from ingestion.state.dead_letters import (
+    KIND_ACTIVITY,
+    KIND_GEAR,
+    KIND_STREAMS,
+    DeadLetterQueue,
+)
+from ingestion.state.gear_cache import GearCache
+from ingestion.state.training_load import TrainingLoad
+from models.strava_activity_model import StravaActivity
+
+
+# -------------------
+# Constants
+# -------------------
+# Items that failed this often stay in the queue but are no longer retried
+DEAD_LETTER_MAX_ATTEMPTS = int(os.environ.get('DEAD_LETTER_MAX_ATTEMPTS', '5'))
+
+
+def _retry_athlete(
+    entry: RosterEntry,
+    state_store: BaseStateStore,
+    token_store: BaseStateStore,
+    rate_limiter: StravaRateLimiter,
+    loader: BaseLoader,
+    metrics: RunMetrics,
+    ingested_at_dt: datetime,
+) -> int:
+    """Retries the dead letters of one athlete and returns the number resolved."""
+    dead_letter_key = entry.state_key(DEAD_LETTER_KEY)
+    dead_letters = DeadLetterQueue.load(state_store, dead_letter_key)
+    due = {
+        kind: [
+            letter
+            for letter in dead_letters.of_kind(kind)
+            if letter.attempts < DEAD_LETTER_MAX_ATTEMPTS
+        ]
+        for kind in (KIND_ACTIVITY, KIND_STREAMS, KIND_GEAR)
+    }
+    num_due = sum(len(letters) for letters in due.values())
+    print(
+        f'Athlete {entry.key}: {num_due} dead letters to retry, '
+        f'{len(dead_letters) - num_due} given up after {DEAD_LETTER_MAX_ATTEMPTS} '
+        'attempts.'
+    )
+    if not num_due:
+        return 0
+    queued = len(dead_letters)
+
+    token_manager = entry.token_manager(token_store, legacy_store=state_store)
+    client = StravaExtractor(
+        access_token=token_manager.get_access_token,
+        rate_limiter=rate_limiter,
+        metrics=metrics,
+    )
+    try:
+        # Activities that failed validation, fetched again one by one
+        activities: list[StravaActivity] = []
+        for letter in due[KIND_ACTIVITY]:
+            if not letter.item_id.isdigit():
+                continue  # the payload had no usable id
+            try:
+                activities.append(client.fetch_activity(letter.item_id))
+            except DEAD_LETTER_ERRORS as e:
+                dead_letter(
+                    dead_letters,
+                    KIND_ACTIVITY,
+                    letter.item_id,
+                    e,
+                    ingested_at_dt,
+                    metrics,
+                )
+        loader.load_data(
+            data=pd.DataFrame([
+                {**a.model_dump(), 'ingested_at': ingested_at_dt.isoformat()}
+                for a in activities
+            ]),
+            dataset=DATASET_RAW,
+            table_name=TABLE_NAME_RAW_ACTIVITIES,
+            merge_keys=RAW_ACTIVITIES_MERGE_KEYS,
+        )
+        for activity in activities:
+            dead_letters.resolve(KIND_ACTIVITY, str(activity.id))
+
+        # Failed streams, plus the streams of the recovered activities
+        stream_activities = [
+            StravaActivity.model_validate(letter.payload)
+            for letter in due[KIND_STREAMS]
+        ] + activities
+        training_load_key = entry.state_key(TRAINING_LOAD_KEY)
+        training_load = TrainingLoad.load(state_store, training_load_key)
+        stream_buffer = build_stream_buffer(loader)
+        loaded_ids: list[int] = []
+        for activity, batches in iter_stream_batches(
+            client, stream_activities, ingested_at_dt, dead_letters, entry
+        ):
+            loaded_ids += stream_buffer.add(activity.id, batches)
+            track_training_load(training_load, activity, batches)
+        loaded_ids += stream_buffer.flush()
+        for activity_id in loaded_ids:
+            dead_letters.resolve(KIND_STREAMS, str(activity_id))
+        load_training_load(training_load, loader, ingested_at_dt)
+        training_load.save(state_store, training_load_key)
+
+        # Gear details; unchanged gear is resolved without a new row
+        gear_cache = GearCache.load(
+            state_store, entry.state_key(GEAR_CACHE_KEY), GEAR_CACHE_TTL
+        )
+        loader.load_data(
+            data=fetch_changed_gear(
+                client,
+                {letter.item_id for letter in due[KIND_GEAR]},
+                gear_cache,
+                ingested_at_dt,
+                dead_letters,
+            ),
+            dataset=DATASET_RAW,
+            table_name=TABLE_NAME_RAW_GEAR_DETAILS,
+            merge_keys=RAW_GEAR_DETAILS_MERGE_KEYS,
+        )
+        gear_cache.save(state_store, entry.state_key(GEAR_CACHE_KEY))
+    finally:
+        print(f'Strava API stats ({entry.key}): {client.stats_summary()}')
+        client.close()
+
+    # Only persisted once the recovered items have been loaded
+    dead_letters.save(state_store, dead_letter_key)
+    resolved = queued - len(dead_letters)
+    print(
+        f'Athlete {entry.key}: {resolved} dead letters resolved, '
+        f'{len(dead_letters)} remaining.'
+    )
+    return resolved
+
+
+def run_retry() -> None:
+    """Reprocesses only the dead-lettered activities, streams and gear.
+
+    Items that fail again stay in the queue with another attempt counted.
+    """
+    print('Starting Strava dead-letter retry...')
+    metrics = RunMetrics(pipeline='strava_retry')
+    ingested_at_dt = datetime.now(timezone.utc)
+
+    state_store = build_state_store()
+    token_store = build_token_store()
+    rate_limiter = StravaRateLimiter()
+    loader = ChangeTrackingLoader(build_loader(metrics))
+    try:
+        for entry in strava_roster.load_roster():
+            _retry_athlete(
+                entry,
+                state_store,
+                token_store,
+                rate_limiter,
+                loader,
+                metrics,
+                ingested_at_dt,
+            )
+        print('Triggering dbt-job...')
+        with metrics.stage('trigger_dbt'):
+            trigger_dbt_job(dbt_selectors(loader.changed_tables))
+        metrics.status = 'succeeded'
+    except Exception:
+        metrics.status = 'failed'
+        raise
+    finally:
+        emit_run_metrics(metrics, loader)
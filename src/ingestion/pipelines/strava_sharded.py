@@ -0,0 +1,305 @@
+"""This module splits a Strava EL run into a plan, stream shards and a finalize step.
+
+The plan extracts activities, athletes and gear like the incremental run, but
+leaves the streams of the new activities to `SHARD_COUNT` shards that run as
+separate Cloud Run job executions (mapped Airflow tasks), so stream extraction
+scales horizontally and a failing shard is retried on its own. The finalize step
+joins the shards and only then advances the watermarks. Every plan gets a new
+id that its shards record in their results, so the finalize step never merges
+results left by an earlier plan of the same run.
+"""
+
+from datetime import datetime, timezone
+import os
+import re
+from typing import Any, Optional
+import uuid
+
+from ingestion.auth import strava_roster
+from ingestion.auth.strava_roster import RosterEntry
+from ingestion.extractors.strava_extractor import StravaExtractor
+from ingestion.extractors.strava_rate_limiter import StravaRateLimiter
+from ingestion.loaders.async_loader import AsyncLoader
+from ingestion.loaders.base import BaseLoader
+from ingestion.metrics.run_metrics import RunMetrics
+from ingestion.pipelines.strava_pipeline import (
+    ATHLETE_INFO_KEY,
+    DEAD_LETTER_KEY,
+    LOAD_QUEUE_SIZE,
+    TRAINING_LOAD_KEY,
+    WATERMARK_KEY,
+    build_loader,
+    build_state_store,
+    build_stream_buffer,
+    build_token_store,
+    emit_run_metrics,
+    extract_roster,
+    iter_stream_batches,
+    load_profiles_and_gear,
+    load_training_load,
+    save_athlete_state,
+    track_training_load,
+)
+from ingestion.state.base import BaseStateStore
+from ingestion.state.dead_letters import DeadLetterQueue
+from ingestion.state.training_load import TrainingLoad
+from ingestion.state.watermark import Watermark
+from models.strava_activity_model import StravaActivity
+
+
+# -------------------
+# Constants
+# -------------------
+# TODO: Move to config
+SHARD_COUNT = int(os.environ.get('SHARD_COUNT', '8'))
+# Shared by the plan, shard and finalize executions of one run, e.g. Airflow's run_id
+PIPELINE_RUN_ID = os.environ.get('PIPELINE_RUN_ID')
+# Set per execution by the DAG, or per task by Cloud Run for `--tasks` executions
+SHARD_INDEX = os.environ.get('SHARD_INDEX', os.environ.get('CLOUD_RUN_TASK_INDEX'))
+PLAN_KEY = 'strava_shard_plan'
+SHARD_RESULT_KEY = 'strava_shard_result'
+
+
+def run_key(base: str, run_id: Optional[str] = None) -> str:
+    """State key of a document that belongs to one sharded run."""
+    run_id = run_id or _run_id()
+    return f'{base}.{re.sub(r"[^A-Za-z0-9_.-]", "_", run_id)}'
+
+
+def _run_id() -> str:
+    if not PIPELINE_RUN_ID:
+        raise OSError('Missing PIPELINE_RUN_ID for the plan, shard and finalize modes.')
+    return PIPELINE_RUN_ID
+
+
+def _pending_watermark_key(entry: RosterEntry) -> str:
+    """The watermark of the plan, only made current by the finalize step."""
+    return run_key(entry.state_key(WATERMARK_KEY) + '.pending')
+
+
+def _shard_result_key(index: int) -> str:
+    return run_key(f'{SHARD_RESULT_KEY}.{index}')
+
+
+def _load_plan(state_store: BaseStateStore) -> dict[str, Any]:
+    plan: Optional[dict[str, Any]] = state_store.get(run_key(PLAN_KEY))
+    if plan is None:
+        raise RuntimeError(f'No shard plan stored for run {_run_id()}.')
+    return plan
+
+
+def run_plan(loader: Optional[BaseLoader] = None) -> list[int]:
+    """Extracts activities, athletes and gear and plans the stream shards.
+
+    The new activities are distributed round-robin over at most `SHARD_COUNT`
+    shards; the plan is stored under the run's key and the shard indexes are
+    returned. Gear cache and dead letters are saved right away, the watermark
+    under a pending key until the finalize step. Planning a run again replaces
+    its plan; results of the earlier plan's shards are then rejected.
+    """
+    print(f'Planning sharded Strava EL run {_run_id()}...')
+    metrics = RunMetrics(pipeline='strava_sharded_plan')
+    ingested_at_dt = datetime.now(timezone.utc)
+
+    state_store = build_state_store()
+    roster = strava_roster.load_roster()
+    target_loader = loader or build_loader(metrics)
+    async_loader = AsyncLoader(target_loader, max_pending=LOAD_QUEUE_SIZE)
+    try:
+        extracts = extract_roster(
+            roster,
+            state_store,
+            async_loader,
+            metrics,
+            ingested_at_dt,
+            fetch_streams=False,
+        )
+        athlete_hash = load_profiles_and_gear(extracts, state_store, async_loader)
+        with metrics.stage('wait_for_loads'):
+            async_loader.join()
+
+        items = [
+            [extract.entry.key, activity.model_dump(mode='json')]
+            for extract in extracts
+            for activity in extract.pending_activities
+        ]
+        num_shards = min(SHARD_COUNT, len(items))
+        state_store.put(
+            run_key(PLAN_KEY),
+            {
+                'plan_id': uuid.uuid4().hex,
+                'ingested_at': ingested_at_dt.isoformat(),
+                'shards': [items[i::num_shards] for i in range(num_shards)],
+            },
+        )
+        for extract in extracts:
+            save_athlete_state(
+                extract, state_store, _pending_watermark_key(extract.entry)
+            )
+        state_store.put(ATHLETE_INFO_KEY, {'content_hash': athlete_hash})
+        print(f'Planned {len(items)} stream extractions in {num_shards} shards.')
+        metrics.status = 'succeeded'
+    except Exception:
+        metrics.status = 'failed'
+        raise
+    finally:
+        async_loader.close()
+        emit_run_metrics(metrics, target_loader)
+    return list(range(num_shards))
+
+
+def run_shard(index: Optional[int] = None, loader: Optional[BaseLoader] = None) -> None:
+    """Fetches and loads the streams of one shard of the run's plan.
+
+    Failing activities are dead-lettered into the shard's result document, which
+    the finalize step merges into the athletes' queues, like the training loads
+    of the activities. A retried shard loads its
+    streams again; the staging model keeps the latest row per point.
+    """
+    if index is None:
+        if SHARD_INDEX is None:
+            raise OSError('Missing SHARD_INDEX for the shard mode.')
+        index = int(SHARD_INDEX)
+    print(f'Starting shard {index} of Strava EL run {_run_id()}...')
+    metrics = RunMetrics(pipeline='strava_sharded_streams')
+
+    state_store = build_state_store()
+    plan = _load_plan(state_store)
+    ingested_at_dt = datetime.fromisoformat(plan['ingested_at'])
+    activities: dict[str, list[StravaActivity]] = {}
+    for athlete_key, payload in plan['shards'][index]:
+        activities.setdefault(athlete_key, []).append(
+            StravaActivity.model_validate(payload)
+        )
+
+    # Each shard reads the app's remaining budget from the API's rate-limit headers
+    rate_limiter = StravaRateLimiter()
+    token_store = build_token_store()
+    target_loader = loader or build_loader(metrics)
+    async_loader = AsyncLoader(target_loader, max_pending=LOAD_QUEUE_SIZE)
+    dead_letters: dict[str, DeadLetterQueue] = {}
+    training_loads: dict[str, TrainingLoad] = {}
+    try:
+        for entry in strava_roster.load_roster():
+            if entry.key not in activities:
+                continue
+            token_manager = entry.token_manager(token_store, legacy_store=state_store)
+            client = StravaExtractor(
+                access_token=token_manager.get_access_token,
+                rate_limiter=rate_limiter,
+                metrics=metrics,
+            )
+            dead_letters[entry.key] = DeadLetterQueue()
+            training_loads[entry.key] = TrainingLoad()
+            stream_buffer = build_stream_buffer(async_loader)
+            try:
+                for activity, batches in iter_stream_batches(
+                    client,
+                    activities[entry.key],
+                    ingested_at_dt,
+                    dead_letters[entry.key],
+                    entry,
+                ):
+                    stream_buffer.add(activity.id, batches)
+                    track_training_load(training_loads[entry.key], activity, batches)
+                stream_buffer.flush()
+            finally:
+                print(f'Strava API stats ({entry.key}): {client.stats_summary()}')
+                client.close()
+        with metrics.stage('wait_for_loads'):
+            async_loader.join()
+
+        # Only recorded once all streams of the shard have been loaded
+        state_store.put(
+            _shard_result_key(index),
+            {
+                'plan_id': plan['plan_id'],
+                'dead_letters': {
+                    athlete_key: queue.to_document()
+                    for athlete_key, queue in dead_letters.items()
+                },
+                'training_loads': {
+                    athlete_key: training_load.to_document()
+                    for athlete_key, training_load in training_loads.items()
+                },
+            },
+        )
+        metrics.status = 'succeeded'
+    except Exception:
+        metrics.status = 'failed'
+        raise
+    finally:
+        async_loader.close()
+        emit_run_metrics(metrics, target_loader)
+
+
+def run_finalize() -> None:
+    """Joins the shards of the run, loads the training loads, advances the watermarks.
+
+    Fails while a shard has not stored its result for the current plan, so the
+    watermarks only move once every stream of the plan has been loaded or
+    dead-lettered. Afterwards the shard results and pending watermarks are
+    deleted and only a marker of the finalized plan is kept.
+    """
+    print(f'Finalizing sharded Strava EL run {_run_id()}...')
+    metrics = RunMetrics(pipeline='strava_sharded_finalize')
+    state_store = build_state_store()
+    plan = _load_plan(state_store)
+    if plan.get('finalized'):
+        print('Run already finalized.')
+        return
+    ingested_at_dt = datetime.now(timezone.utc)
+    target_loader = build_loader(metrics)
+    try:
+        shard_dead_letters: dict[str, DeadLetterQueue] = {}
+        shard_training_loads: dict[str, TrainingLoad] = {}
+        for index in range(len(plan['shards'])):
+            result = state_store.get(_shard_result_key(index))
+            if result is None:
+                raise RuntimeError(f'Shard {index} of run {_run_id()} missing.')
+            if result.get('plan_id') != plan['plan_id']:
+                raise RuntimeError(
+                    f'Shard {index} of run {_run_id()} belongs to an earlier plan.'
+                )
+            for athlete_key, document in result['dead_letters'].items():
+                shard_dead_letters.setdefault(athlete_key, DeadLetterQueue()).merge(
+                    DeadLetterQueue.from_document(document)
+                )
+            for athlete_key, document in result.get('training_loads', {}).items():
+                shard_training_loads.setdefault(athlete_key, TrainingLoad()).merge(
+                    TrainingLoad.from_document(document)
+                )
+
+        for entry in strava_roster.load_roster():
+            queue = shard_dead_letters.get(entry.key)
+            if queue:
+                dead_letter_key = entry.state_key(DEAD_LETTER_KEY)
+                dead_letters = DeadLetterQueue.load(state_store, dead_letter_key)
+                dead_letters.merge(queue)
+                dead_letters.save(state_store, dead_letter_key)
+                print(
+                    f'Athlete {entry.key}: {len(queue)} streams dead-lettered by '
+                    'the shards, reprocess them with PIPELINE_MODE=retry.'
+                )
+            training_load_key = entry.state_key(TRAINING_LOAD_KEY)
+            training_load = TrainingLoad.load(state_store, training_load_key)
+            training_load.merge(shard_training_loads.get(entry.key, TrainingLoad()))
+            load_training_load(training_load, target_loader, ingested_at_dt)
+            training_load.save(state_store, training_load_key)
+            watermark = Watermark.load(state_store, _pending_watermark_key(entry))
+            if watermark.latest_start_date is not None:
+                watermark.save(state_store, entry.state_key(WATERMARK_KEY))
+        # A retried finalize must not merge the dead letters twice
+        state_store.put(
+            run_key(PLAN_KEY), {'plan_id': plan['plan_id'], 'finalized': True}
+        )
+        for index in range(len(plan['shards'])):
+            state_store.delete(_shard_result_key(index))
+        for entry in strava_roster.load_roster():
+            state_store.delete(_pending_watermark_key(entry))
+        metrics.status = 'succeeded'
+    except Exception:
+        metrics.status = 'failed'
+        raise
+    finally:
+        emit_run_metrics(metrics, target_loader)
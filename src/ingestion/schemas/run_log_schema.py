@@ -0,0 +1,13 @@
+from google.cloud import bigquery
+
+
+# One row per pipeline run, see ingestion.metrics.run_metrics
+RUN_LOG_SCHEMA = [
+    bigquery.SchemaField('run_id', 'STRING'),
+    bigquery.SchemaField('pipeline', 'STRING'),
+    bigquery.SchemaField('status', 'STRING'),
+    bigquery.SchemaField('started_at', 'TIMESTAMP'),
+    bigquery.SchemaField('finished_at', 'TIMESTAMP'),
+    bigquery.SchemaField('wall_s', 'FLOAT64'),
+    bigquery.SchemaField('stages', 'STRING'),  # JSON document per stage
+]
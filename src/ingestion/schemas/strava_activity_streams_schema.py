@@ -1,4 +1,5 @@
 from google.cloud import bigquery
+import pyarrow as pa
 
 
 ACTIVITY_STREAMS_SCHEMA = [
@@ -12,3 +13,145 @@ ACTIVITY_STREAMS_SCHEMA = [
     bigquery.SchemaField('value_lng', 'FLOAT64'),
     bigquery.SchemaField('ingested_at', 'TIMESTAMP'),
 ]
+
+# Arrow counterpart of ACTIVITY_STREAMS_SCHEMA for the columnar transformer
+ACTIVITY_STREAMS_ARROW_SCHEMA = pa.schema([
+    pa.field('activity_id', pa.int64()),
+    pa.field('stream_type', pa.string()),
+    pa.field('sequence_index', pa.int64()),
+    pa.field('value_float', pa.float64()),
+    pa.field('value_int', pa.int64()),
+    pa.field('value_bool', pa.bool_()),
+    pa.field('value_lat', pa.float64()),
+    pa.field('value_lng', pa.float64()),
+    pa.field('ingested_at', pa.timestamp('us', tz='UTC')),
+])
+
+# One row per (activity_id, stream_type), see transformers.strava_streams_compact
+ACTIVITY_STREAMS_COMPACT_SCHEMA = [
+    bigquery.SchemaField('activity_id', 'INT64'),
+    bigquery.SchemaField('stream_type', 'STRING'),
+    bigquery.SchemaField('value_type', 'STRING'),  # int, float, bool or latlng
+    bigquery.SchemaField('scale', 'INT64'),  # value = running sum of deltas / scale
+    bigquery.SchemaField('num_points', 'INT64'),
+    bigquery.SchemaField('sequence_index', 'INT64', mode='REPEATED'),  # empty if dense
+    bigquery.SchemaField('values_delta', 'INT64', mode='REPEATED'),
+    bigquery.SchemaField('values_polyline', 'STRING'),
+    bigquery.SchemaField('ingested_at', 'TIMESTAMP'),
+]
+
+ACTIVITY_STREAMS_COMPACT_ARROW_SCHEMA = pa.schema([
+    pa.field('activity_id', pa.int64()),
+    pa.field('stream_type', pa.string()),
+    pa.field('value_type', pa.string()),
+    pa.field('scale', pa.int64()),
+    pa.field('num_points', pa.int64()),
+    pa.field('sequence_index', pa.list_(pa.int64())),
+    pa.field('values_delta', pa.list_(pa.int64())),
+    pa.field('values_polyline', pa.string()),
+    pa.field('ingested_at', pa.timestamp('us', tz='UTC')),
+])
+
+# Downsampled tiers per (activity_id, stream_type), see transformers.strava_stream_pyramid
+ACTIVITY_STREAM_PYRAMID_SCHEMA = [
+    bigquery.SchemaField('activity_id', 'INT64'),
+    bigquery.SchemaField('tier', 'INT64'),  # maximum number of points per stream
+    bigquery.SchemaField('stream_type', 'STRING'),
+    bigquery.SchemaField('sequence_index', 'INT64'),
+    bigquery.SchemaField('time_s', 'INT64'),
+    bigquery.SchemaField('distance_m', 'FLOAT64'),
+    bigquery.SchemaField('value', 'FLOAT64'),
+    bigquery.SchemaField('ingested_at', 'TIMESTAMP'),
+]
+
+ACTIVITY_STREAM_PYRAMID_ARROW_SCHEMA = pa.schema([
+    pa.field('activity_id', pa.int64()),
+    pa.field('tier', pa.int64()),
+    pa.field('stream_type', pa.string()),
+    pa.field('sequence_index', pa.int64()),
+    pa.field('time_s', pa.int64()),
+    pa.field('distance_m', pa.float64()),
+    pa.field('value', pa.float64()),
+    pa.field('ingested_at', pa.timestamp('us', tz='UTC')),
+])
+
+# One row per activity, see transformers.strava_stream_summary
+ACTIVITY_STREAM_SUMMARY_SCHEMA = [
+    bigquery.SchemaField('activity_id', 'INT64'),
+    bigquery.SchemaField('num_points', 'INT64'),
+    bigquery.SchemaField('elapsed_s', 'INT64'),
+    bigquery.SchemaField('moving_s', 'INT64'),
+    bigquery.SchemaField('moving_ratio', 'FLOAT64'),
+    bigquery.SchemaField('zone_max_hr_bpm', 'INT64'),  # athlete's max HR of the zones
+    bigquery.SchemaField('hr_zone_s', 'INT64', mode='REPEATED'),  # Z1..Z5
+    bigquery.SchemaField('zone_ftp_w', 'INT64'),  # athlete's FTP of the zones
+    bigquery.SchemaField('power_zone_s', 'INT64', mode='REPEATED'),  # Z1..Z7
+    bigquery.SchemaField('heartrate_percentiles', 'FLOAT64', mode='REPEATED'),
+    bigquery.SchemaField('cadence_percentiles', 'FLOAT64', mode='REPEATED'),
+    bigquery.SchemaField('watts_percentiles', 'FLOAT64', mode='REPEATED'),
+    bigquery.SchemaField('velocity_percentiles', 'FLOAT64', mode='REPEATED'),
+    bigquery.SchemaField('normalized_power_w', 'FLOAT64'),
+    bigquery.SchemaField('hr_drift_pct', 'FLOAT64'),
+    bigquery.SchemaField('decoupling_pct', 'FLOAT64'),
+    bigquery.SchemaField('training_load', 'FLOAT64'),
+    bigquery.SchemaField('training_load_method', 'STRING'),  # 'tss' or 'trimp'
+    bigquery.SchemaField('ingested_at', 'TIMESTAMP'),
+]
+
+ACTIVITY_STREAM_SUMMARY_ARROW_SCHEMA = pa.schema([
+    pa.field('activity_id', pa.int64()),
+    pa.field('num_points', pa.int64()),
+    pa.field('elapsed_s', pa.int64()),
+    pa.field('moving_s', pa.int64()),
+    pa.field('moving_ratio', pa.float64()),
+    pa.field('zone_max_hr_bpm', pa.int64()),
+    pa.field('hr_zone_s', pa.list_(pa.int64())),
+    pa.field('zone_ftp_w', pa.int64()),
+    pa.field('power_zone_s', pa.list_(pa.int64())),
+    pa.field('heartrate_percentiles', pa.list_(pa.float64())),
+    pa.field('cadence_percentiles', pa.list_(pa.float64())),
+    pa.field('watts_percentiles', pa.list_(pa.float64())),
+    pa.field('velocity_percentiles', pa.list_(pa.float64())),
+    pa.field('normalized_power_w', pa.float64()),
+    pa.field('hr_drift_pct', pa.float64()),
+    pa.field('decoupling_pct', pa.float64()),
+    pa.field('training_load', pa.float64()),
+    pa.field('training_load_method', pa.string()),
+    pa.field('ingested_at', pa.timestamp('us', tz='UTC')),
+])
+
+# One row per activity, curve and duration, see transformers.strava_stream_curves
+ACTIVITY_STREAM_CURVES_SCHEMA = [
+    bigquery.SchemaField('activity_id', 'INT64'),
+    bigquery.SchemaField('curve', 'STRING'),  # 'power' (W) or 'speed' (m/s)
+    bigquery.SchemaField('duration_s', 'INT64'),
+    bigquery.SchemaField('value', 'FLOAT64'),  # best mean over the duration
+    bigquery.SchemaField('ingested_at', 'TIMESTAMP'),
+]
+
+ACTIVITY_STREAM_CURVES_ARROW_SCHEMA = pa.schema([
+    pa.field('activity_id', pa.int64()),
+    pa.field('curve', pa.string()),
+    pa.field('duration_s', pa.int64()),
+    pa.field('value', pa.float64()),
+    pa.field('ingested_at', pa.timestamp('us', tz='UTC')),
+])
+
+# One row per activity and effort, see transformers.strava_stream_best_efforts
+ACTIVITY_BEST_EFFORTS_SCHEMA = [
+    bigquery.SchemaField('activity_id', 'INT64'),
+    bigquery.SchemaField('effort', 'STRING'),  # '400m', '1k', ..., 'marathon'
+    bigquery.SchemaField('distance_m', 'FLOAT64'),
+    bigquery.SchemaField('elapsed_s', 'FLOAT64'),  # fastest time over the distance
+    bigquery.SchemaField('start_offset_s', 'FLOAT64'),  # from the activity start
+    bigquery.SchemaField('ingested_at', 'TIMESTAMP'),
+]
+
+ACTIVITY_BEST_EFFORTS_ARROW_SCHEMA = pa.schema([
+    pa.field('activity_id', pa.int64()),
+    pa.field('effort', pa.string()),
+    pa.field('distance_m', pa.float64()),
+    pa.field('elapsed_s', pa.float64()),
+    pa.field('start_offset_s', pa.float64()),
+    pa.field('ingested_at', pa.timestamp('us', tz='UTC')),
+])
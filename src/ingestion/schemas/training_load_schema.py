@@ -0,0 +1,13 @@
+from google.cloud import bigquery
+
+
+# One row per athlete and day, see ingestion.state.training_load
+TRAINING_LOAD_DAILY_SCHEMA = [
+    bigquery.SchemaField('athlete_id', 'INT64'),
+    bigquery.SchemaField('day', 'DATE'),
+    bigquery.SchemaField('load', 'FLOAT64'),  # sum of the activities' TSS/TRIMP
+    bigquery.SchemaField('atl', 'FLOAT64'),  # acute training load (fatigue)
+    bigquery.SchemaField('ctl', 'FLOAT64'),  # chronic training load (fitness)
+    bigquery.SchemaField('tsb', 'FLOAT64'),  # training stress balance (form)
+    bigquery.SchemaField('ingested_at', 'TIMESTAMP'),
+]
@@ -0,0 +1,23 @@
+"""This module defines the base interface for all pipeline state stores."""
+
+from abc import ABC, abstractmethod
+from typing import Any, Optional
+
+
+class BaseStateStore(ABC):
+    """Persists small JSON documents (watermarks, checkpoints, caches) by key."""
+
+    @abstractmethod
+    def get(self, key: str) -> Optional[dict[str, Any]]:
+        """Returns the document stored under `key`, or None if there is none."""
+        pass
+
+    @abstractmethod
+    def put(self, key: str, value: dict[str, Any]) -> None:
+        """Stores `value` under `key`, replacing any previous document."""
+        pass
+
+    @abstractmethod
+    def delete(self, key: str) -> None:
+        """Removes the document stored under `key`, if there is one."""
+        pass
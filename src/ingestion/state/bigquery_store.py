@@ -0,0 +1,82 @@
+"""This module contains a state store backed by a BigQuery table."""
+
+import json
+import os
+from typing import Any, Optional, cast
+
+from google.cloud import bigquery
+
+from .base import BaseStateStore
+
+
+STATE_TABLE_SCHEMA = [
+    bigquery.SchemaField('state_key', 'STRING', mode='REQUIRED'),
+    bigquery.SchemaField('state_value', 'STRING'),
+    bigquery.SchemaField('updated_at', 'TIMESTAMP'),
+]
+
+
+class BigQueryStateStore(BaseStateStore):
+    """Keeps one row per key in `<dataset>.<table_name>`.
+
+    Used by the Cloud Run job, whose local disk does not survive between runs.
+    """
+
+    def __init__(self, dataset: str, table_name: str = 'pipeline_state') -> None:
+        """Initializes the store and creates the state table if needed."""
+        self.project_id = os.environ.get('GCP_PROJECT_ID')
+        self.client = bigquery.Client(project=self.project_id)
+        self.table_id = f'{self.project_id}.{dataset}.{table_name}'
+        self.client.create_table(
+            bigquery.Table(self.table_id, schema=STATE_TABLE_SCHEMA), exists_ok=True
+        )
+
+    def get(self, key: str) -> Optional[dict[str, Any]]:
+        """Reads the document for `key`."""
+        query = f"""
+            SELECT state_value
+            FROM `{self.table_id}`
+            WHERE state_key = @state_key
+            ORDER BY updated_at DESC
+            LIMIT 1
+        """  # nosec B608: table_id is built from configuration, not user input
+        job_config = bigquery.QueryJobConfig(
+            query_parameters=[bigquery.ScalarQueryParameter('state_key', 'STRING', key)]
+        )
+        rows = list(self.client.query(query, job_config=job_config).result())
+        if not rows or rows[0].state_value is None:
+            return None
+        return cast(dict[str, Any], json.loads(rows[0].state_value))
+
+    def put(self, key: str, value: dict[str, Any]) -> None:
+        """Upserts the document for `key`."""
+        query = f"""
+            MERGE `{self.table_id}` AS t
+            USING (SELECT @state_key AS state_key, @state_value AS state_value) AS s
+            ON t.state_key = s.state_key
+            WHEN MATCHED THEN
+                UPDATE SET state_value = s.state_value, updated_at = CURRENT_TIMESTAMP()
+            WHEN NOT MATCHED THEN
+                INSERT (state_key, state_value, updated_at)
+                VALUES (s.state_key, s.state_value, CURRENT_TIMESTAMP())
+        """  # nosec B608: table_id is built from configuration, not user input
+        job_config = bigquery.QueryJobConfig(
+            query_parameters=[
+                bigquery.ScalarQueryParameter('state_key', 'STRING', key),
+                bigquery.ScalarQueryParameter(
+                    'state_value', 'STRING', json.dumps(value, default=str)
+                ),
+            ]
+        )
+        self.client.query(query, job_config=job_config).result()
+
+    def delete(self, key: str) -> None:
+        """Deletes the row of `key`."""
+        query = f"""
+            DELETE FROM `{self.table_id}`
+            WHERE state_key = @state_key
+        """  # nosec B608: table_id is built from configuration, not user input
+        job_config = bigquery.QueryJobConfig(
+            query_parameters=[bigquery.ScalarQueryParameter('state_key', 'STRING', key)]
+        )
+        self.client.query(query, job_config=job_config).result()
@@ -0,0 +1,88 @@
+"""This module contains the progress checkpoint of a historical backfill."""
+
+from dataclasses import dataclass, field
+from datetime import date, timedelta
+from typing import Optional
+
+from .base import BaseStateStore
+
+
+@dataclass(frozen=True)
+class BackfillWindow:
+    """A half-open date range [start, end) fetched in one go."""
+
+    start: date
+    end: date
+
+    @property
+    def window_id(self) -> str:
+        """Stable identifier used in the checkpoint."""
+        return f'{self.start.isoformat()}/{self.end.isoformat()}'
+
+
+def split_windows(start: date, end: date, window_days: int) -> list[BackfillWindow]:
+    """Splits [start, end) into consecutive windows of `window_days` days."""
+    windows = []
+    current = start
+    while current < end:
+        window_end = min(current + timedelta(days=window_days), end)
+        windows.append(BackfillWindow(current, window_end))
+        current = window_end
+    return windows
+
+
+@dataclass
+class BackfillCheckpoint:
+    """Finished windows plus the finished activities of the current window."""
+
+    windows_done: set[str] = field(default_factory=set)
+    current_window: Optional[str] = None
+    activities_done: set[int] = field(default_factory=set)
+    activities_seen: int = 0
+
+    def start_window(self, window: BackfillWindow) -> None:
+        """Switches to `window`, keeping the progress if it was already started."""
+        if self.current_window != window.window_id:
+            self.current_window = window.window_id
+            self.activities_done = set()
+
+    def finish_window(self, window: BackfillWindow, num_activities: int) -> None:
+        """Marks `window` as completely loaded."""
+        self.windows_done.add(window.window_id)
+        self.activities_seen += num_activities
+        self.current_window = None
+        self.activities_done = set()
+
+    def avg_activities_per_window(self) -> float:
+        """Average number of activities of the finished windows."""
+        if not self.windows_done:
+            return 0.0
+        return self.activities_seen / len(self.windows_done)
+
+    # ---------------
+    # Persistence
+    # ---------------
+    @classmethod
+    def load(cls, store: BaseStateStore, key: str) -> 'BackfillCheckpoint':
+        """Reads the checkpoint from the store, or returns an empty one."""
+        document = store.get(key)
+        if not document:
+            return cls()
+        return cls(
+            windows_done=set(document.get('windows_done', [])),
+            current_window=document.get('current_window'),
+            activities_done={int(i) for i in document.get('activities_done', [])},
+            activities_seen=int(document.get('activities_seen', 0)),
+        )
+
+    def save(self, store: BaseStateStore, key: str) -> None:
+        """Writes the checkpoint to the store."""
+        store.put(
+            key,
+            {
+                'windows_done': sorted(self.windows_done),
+                'current_window': self.current_window,
+                'activities_done': sorted(self.activities_done),
+                'activities_seen': self.activities_seen,
+            },
+        )
@@ -0,0 +1,127 @@
+"""This module contains the dead-letter queue of items that failed to ingest."""
+
+from dataclasses import dataclass, field
+from datetime import datetime
+from typing import Any, Optional
+
+from .base import BaseStateStore
+
+
+# Kinds of dead letters
+KIND_ACTIVITY = 'activity'  # activity summary that failed validation
+KIND_STREAMS = 'streams'  # streams that could not be fetched or transformed
+KIND_GEAR = 'gear'  # gear details that could not be fetched
+
+
+@dataclass
+class DeadLetter:
+    """A failed item with the reason of its last failure and its payload."""
+
+    kind: str
+    item_id: str
+    reason: str
+    payload: Optional[dict[str, Any]]
+    first_failed_at: datetime
+    last_failed_at: datetime
+    attempts: int = 1
+
+
+@dataclass
+class DeadLetterQueue:
+    """Failed activities, streams and gear, reprocessed by the retry mode."""
+
+    letters: dict[str, DeadLetter] = field(default_factory=dict)
+    failures: int = 0  # failures recorded since loading, not persisted
+
+    @staticmethod
+    def _key(kind: str, item_id: str) -> str:
+        return f'{kind}/{item_id}'
+
+    def add(
+        self,
+        kind: str,
+        item_id: str,
+        reason: str,
+        now: datetime,
+        payload: Optional[dict[str, Any]] = None,
+    ) -> DeadLetter:
+        """Records a failure, counting another attempt for a known item."""
+        letter = self.letters.get(self._key(kind, item_id))
+        if letter is None:
+            letter = DeadLetter(kind, item_id, reason, payload, now, now)
+            self.letters[self._key(kind, item_id)] = letter
+        else:
+            letter.reason = reason
+            letter.last_failed_at = now
+            letter.attempts += 1
+            if payload is not None:
+                letter.payload = payload
+        return letter
+
+    def merge(self, other: 'DeadLetterQueue') -> None:
+        """Adds the failures recorded in another queue, e.g. by a shard."""
+        for letter in other.letters.values():
+            self.add(
+                letter.kind,
+                letter.item_id,
+                letter.reason,
+                letter.last_failed_at,
+                payload=letter.payload,
+            )
+
+    def resolve(self, kind: str, item_id: str) -> bool:
+        """Removes an item once it has been loaded; returns whether it was queued."""
+        return self.letters.pop(self._key(kind, item_id), None) is not None
+
+    def of_kind(self, kind: str) -> list[DeadLetter]:
+        """The dead letters of one kind, oldest first."""
+        return sorted(
+            (letter for letter in self.letters.values() if letter.kind == kind),
+            key=lambda letter: letter.first_failed_at,
+        )
+
+    def __len__(self) -> int:
+        return len(self.letters)
+
+    # ---------------
+    # Persistence
+    # ---------------
+    @classmethod
+    def from_document(cls, document: dict[str, Any]) -> 'DeadLetterQueue':
+        """Builds the queue from its JSON document."""
+        letters = {}
+        for letter_key, letter in document.items():
+            letters[letter_key] = DeadLetter(
+                kind=letter['kind'],
+                item_id=letter['item_id'],
+                reason=letter['reason'],
+                payload=letter.get('payload'),
+                first_failed_at=datetime.fromisoformat(letter['first_failed_at']),
+                last_failed_at=datetime.fromisoformat(letter['last_failed_at']),
+                attempts=int(letter.get('attempts', 1)),
+            )
+        return cls(letters=letters)
+
+    def to_document(self) -> dict[str, Any]:
+        """The JSON document of the queue."""
+        return {
+            letter_key: {
+                'kind': letter.kind,
+                'item_id': letter.item_id,
+                'reason': letter.reason,
+                'payload': letter.payload,
+                'first_failed_at': letter.first_failed_at.isoformat(),
+                'last_failed_at': letter.last_failed_at.isoformat(),
+                'attempts': letter.attempts,
+            }
+            for letter_key, letter in self.letters.items()
+        }
+
+    @classmethod
+    def load(cls, store: BaseStateStore, key: str) -> 'DeadLetterQueue':
+        """Reads the queue from the store, or returns an empty one."""
+        return cls.from_document(store.get(key) or {})
+
+    def save(self, store: BaseStateStore, key: str) -> None:
+        """Writes the queue to the store."""
+        store.put(key, self.to_document())
@@ -0,0 +1,75 @@
+"""This module contains the persistent cache of fetched gear details."""
+
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta
+import hashlib
+import json
+
+from models.strava_gear_model import StravaGear
+
+from .base import BaseStateStore
+
+
+@dataclass
+class GearCacheEntry:
+    """Content hash and fetch time of a single gear."""
+
+    content_hash: str
+    fetched_at: datetime
+
+
+def gear_content_hash(gear: StravaGear) -> str:
+    """Stable hash of the gear payload."""
+    payload = json.dumps(gear.model_dump(), sort_keys=True, default=str)
+    return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+
+
+@dataclass
+class GearCache:
+    """Skips gear requests within `ttl` and appends only changed gear details."""
+
+    ttl: timedelta
+    entries: dict[str, GearCacheEntry] = field(default_factory=dict)
+
+    def is_fresh(self, gear_id: str, now: datetime) -> bool:
+        """Whether the gear was fetched less than `ttl` ago."""
+        entry = self.entries.get(gear_id)
+        return entry is not None and now - entry.fetched_at < self.ttl
+
+    def update(self, gear: StravaGear, now: datetime) -> bool:
+        """Records a fetched gear and returns whether its payload has changed."""
+        content_hash = gear_content_hash(gear)
+        entry = self.entries.get(gear.id)
+        self.entries[gear.id] = GearCacheEntry(content_hash, now)
+        return entry is None or entry.content_hash != content_hash
+
+    # ---------------
+    # Persistence
+    # ---------------
+    @classmethod
+    def load(cls, store: BaseStateStore, key: str, ttl: timedelta) -> 'GearCache':
+        """Reads the cache from the store, or returns an empty one."""
+        document = store.get(key) or {}
+        return cls(
+            ttl=ttl,
+            entries={
+                gear_id: GearCacheEntry(
+                    content_hash=entry['content_hash'],
+                    fetched_at=datetime.fromisoformat(entry['fetched_at']),
+                )
+                for gear_id, entry in document.items()
+            },
+        )
+
+    def save(self, store: BaseStateStore, key: str) -> None:
+        """Writes the cache to the store."""
+        store.put(
+            key,
+            {
+                gear_id: {
+                    'content_hash': entry.content_hash,
+                    'fetched_at': entry.fetched_at.isoformat(),
+                }
+                for gear_id, entry in self.entries.items()
+            },
+        )
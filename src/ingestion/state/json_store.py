@@ -0,0 +1,43 @@
+"""This module contains a state store backed by local JSON files."""
+
+import json
+import os
+from pathlib import Path
+import threading
+from typing import Any, Optional, cast
+
+from .base import BaseStateStore
+
+
+class JsonFileStateStore(BaseStateStore):
+    """Stores every key as `<directory>/<key>.json` for local runs."""
+
+    def __init__(self, directory: str) -> None:
+        """Initializes the store and creates the directory if needed."""
+        self.directory = Path(directory)
+        self.directory.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.Lock()
+
+    def _path(self, key: str) -> Path:
+        return self.directory / f'{key}.json'
+
+    def get(self, key: str) -> Optional[dict[str, Any]]:
+        """Reads the document for `key` if the file exists."""
+        path = self._path(key)
+        with self._lock:
+            if not path.exists():
+                return None
+            return cast(dict[str, Any], json.loads(path.read_text(encoding='utf-8')))
+
+    def put(self, key: str, value: dict[str, Any]) -> None:
+        """Writes the document atomically, so a crash never leaves partial state."""
+        path = self._path(key)
+        tmp_path = path.with_suffix('.json.tmp')
+        with self._lock:
+            tmp_path.write_text(json.dumps(value, default=str), encoding='utf-8')
+            os.replace(tmp_path, path)
+
+    def delete(self, key: str) -> None:
+        """Removes the file of `key`, if it exists."""
+        with self._lock:
+            self._path(key).unlink(missing_ok=True)
@@ -0,0 +1,159 @@
+"""This module contains the incremental training-load series (ATL/CTL/TSB)."""
+
+from dataclasses import dataclass, field
+from datetime import date, timedelta
+import math
+from typing import Any, Optional
+
+from .base import BaseStateStore
+
+
+ATL_DAYS = 7  # time constant of the acute load (fatigue)
+CTL_DAYS = 42  # time constant of the chronic load (fitness)
+# Stored days before the latest one; older changes (backfills, late retries) rebuild
+# the series from the first activity
+KEPT_DAYS = 90
+_ATL_DECAY = 1 - math.exp(-1 / ATL_DAYS)
+_CTL_DECAY = 1 - math.exp(-1 / CTL_DAYS)
+
+
+@dataclass
+class TrainingLoadDay:
+    """Load of one day and the exponentially weighted loads at its end."""
+
+    load: float
+    atl: float
+    ctl: float
+
+
+@dataclass
+class TrainingLoad:
+    """Per-activity training loads and the daily ATL, CTL and TSB of an athlete.
+
+    Adding a new or changed activity load marks its day; `advance` then only
+    recomputes the days from the earliest marked day (or the last stored day)
+    on, starting from the stored loads of the day before. Only the last
+    KEPT_DAYS days are stored; a change before them rebuilds the whole series.
+    """
+
+    athlete_id: Optional[int] = None
+    activities: dict[int, tuple[date, float]] = field(default_factory=dict)
+    days: dict[date, TrainingLoadDay] = field(default_factory=dict)
+    # Earliest day whose load changed since the last `advance`
+    changed_since: Optional[date] = None
+
+    def add(self, activity_id: int, day: date, load: float) -> None:
+        """Records the load of an activity, e.g. again after a re-ingestion."""
+        previous = self.activities.get(activity_id)
+        if previous == (day, load):
+            return
+        self.activities[activity_id] = (day, load)
+        for changed in (day, previous[0] if previous else day):
+            if self.changed_since is None or changed < self.changed_since:
+                self.changed_since = changed
+
+    def merge(self, other: 'TrainingLoad') -> None:
+        """Adds the activity loads recorded in another series, e.g. by a shard."""
+        if self.athlete_id is None:
+            self.athlete_id = other.athlete_id
+        for activity_id, (day, load) in other.activities.items():
+            self.add(activity_id, day, load)
+
+    def advance(self, today: date) -> list[dict[str, Any]]:
+        """Computes the days through `today` that changed; returns them as rows."""
+        last_day = max(self.days, default=None)
+        next_day = last_day + timedelta(days=1) if last_day is not None else None
+        if self.changed_since is None or next_day is None:
+            start = self.changed_since or next_day
+            if start is None:
+                return []
+        else:
+            start = min(self.changed_since, next_day)
+        end = max([today, *(day for day, _ in self.activities.values())])
+        first_activity = min(
+            (day for day, _ in self.activities.values()), default=start
+        )
+        if start - timedelta(days=1) not in self.days and first_activity < start:
+            # The loads before `start` are no longer stored
+            start = first_activity
+            self.days.clear()
+
+        daily_loads: dict[date, float] = {}
+        for day, load in self.activities.values():
+            if day >= start:
+                daily_loads[day] = daily_loads.get(day, 0.0) + load
+
+        previous = self.days.get(
+            start - timedelta(days=1), TrainingLoadDay(0.0, 0.0, 0.0)
+        )
+        rows = []
+        day = start
+        while day <= end:
+            load = daily_loads.get(day, 0.0)
+            current = TrainingLoadDay(
+                load=load,
+                atl=previous.atl + (load - previous.atl) * _ATL_DECAY,
+                ctl=previous.ctl + (load - previous.ctl) * _CTL_DECAY,
+            )
+            self.days[day] = current
+            rows.append({
+                'athlete_id': self.athlete_id,
+                'day': day,
+                'load': current.load,
+                'atl': current.atl,
+                'ctl': current.ctl,
+                # Form at the start of the day, from the loads up to the day before
+                'tsb': previous.ctl - previous.atl,
+            })
+            previous = current
+            day += timedelta(days=1)
+        self.changed_since = None
+        cutoff = end - timedelta(days=KEPT_DAYS)
+        self.days = {day: loads for day, loads in self.days.items() if day >= cutoff}
+        return rows
+
+    # ---------------
+    # Persistence
+    # ---------------
+    @classmethod
+    def from_document(cls, document: dict[str, Any]) -> 'TrainingLoad':
+        """Builds the series from its JSON document."""
+        changed_since = document.get('changed_since')
+        return cls(
+            athlete_id=document.get('athlete_id'),
+            activities={
+                int(activity_id): (date.fromisoformat(day), float(load))
+                for activity_id, (day, load) in document.get('activities', {}).items()
+            },
+            days={
+                date.fromisoformat(day): TrainingLoadDay(*values)
+                for day, values in document.get('days', {}).items()
+            },
+            changed_since=date.fromisoformat(changed_since) if changed_since else None,
+        )
+
+    def to_document(self) -> dict[str, Any]:
+        """The JSON document of the series."""
+        return {
+            'athlete_id': self.athlete_id,
+            'activities': {
+                str(activity_id): [day.isoformat(), load]
+                for activity_id, (day, load) in self.activities.items()
+            },
+            'days': {
+                day.isoformat(): [values.load, values.atl, values.ctl]
+                for day, values in self.days.items()
+            },
+            'changed_since': (
+                self.changed_since.isoformat() if self.changed_since else None
+            ),
+        }
+
+    @classmethod
+    def load(cls, store: BaseStateStore, key: str) -> 'TrainingLoad':
+        """Reads the series from the store, or returns an empty one."""
+        return cls.from_document(store.get(key) or {})
+
+    def save(self, store: BaseStateStore, key: str) -> None:
+        """Writes the series to the store."""
+        store.put(key, self.to_document())
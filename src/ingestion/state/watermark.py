@@ -0,0 +1,92 @@
+"""This module contains the high-water mark for incremental Strava extraction."""
+
+from collections.abc import Iterable
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta
+from typing import Optional
+
+from models.strava_activity_model import StravaActivity
+
+from .base import BaseStateStore
+
+
+def _parse_start_date(value: Optional[str]) -> Optional[datetime]:
+    """Parses Strava's ISO 8601 `start_date` (e.g. '2026-01-01T07:00:00Z')."""
+    if not value:
+        return None
+    return datetime.fromisoformat(value.replace('Z', '+00:00'))
+
+
+@dataclass
+class Watermark:
+    """Latest loaded activity start date plus the ids loaded around it.
+
+    Only ids that can still be returned by the next `after` query (i.e. those
+    within the overlap window) are kept, so the document stays small.
+    """
+
+    latest_start_date: Optional[datetime] = None
+    loaded: dict[int, datetime] = field(default_factory=dict)
+
+    @property
+    def activity_ids(self) -> set[int]:
+        """Ids of the activities already loaded within the overlap window."""
+        return set(self.loaded)
+
+    def after(self, overlap: timedelta) -> Optional[int]:
+        """Epoch seconds to pass as Strava `after` parameter, or None on first run."""
+        if self.latest_start_date is None:
+            return None
+        return int((self.latest_start_date - overlap).timestamp())
+
+    def is_new(self, activity: StravaActivity) -> bool:
+        """Whether the activity has not been loaded yet."""
+        return activity.id not in self.loaded
+
+    def advance(self, activities: Iterable[StravaActivity], overlap: timedelta) -> None:
+        """Records loaded activities and drops ids that left the overlap window."""
+        for activity in activities:
+            start_date = _parse_start_date(activity.start_date)
+            if start_date is None:
+                continue
+            self.loaded[activity.id] = start_date
+            if self.latest_start_date is None or start_date > self.latest_start_date:
+                self.latest_start_date = start_date
+
+        if self.latest_start_date is not None:
+            cutoff = self.latest_start_date - overlap
+            self.loaded = {i: d for i, d in self.loaded.items() if d >= cutoff}
+
+    # ---------------
+    # Persistence
+    # ---------------
+    @classmethod
+    def load(cls, store: BaseStateStore, key: str) -> 'Watermark':
+        """Reads the watermark from the store, or returns an empty one."""
+        document = store.get(key)
+        if not document:
+            return cls()
+        return cls(
+            latest_start_date=_parse_start_date(document.get('latest_start_date')),
+            loaded={
+                int(activity_id): datetime.fromisoformat(start_date)
+                for activity_id, start_date in document.get('loaded', {}).items()
+            },
+        )
+
+    def save(self, store: BaseStateStore, key: str) -> None:
+        """Writes the watermark to the store."""
+        store.put(
+            key,
+            {
+                'latest_start_date': (
+                    self.latest_start_date.isoformat()
+                    if self.latest_start_date
+                    else None
+                ),
+                'loaded': {
+                    str(activity_id): start_date.isoformat()
+                    for activity_id, start_date in self.loaded.items()
+                },
+            },
+        )
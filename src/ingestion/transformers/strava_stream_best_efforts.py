@@ -0,0 +1,101 @@
+"""Best efforts of Strava activity streams over standard distances.
+
+For every distance of BEST_EFFORT_DISTANCES_M, the fastest elapsed time the
+activity covered it in. A window starts at every point: the point where it covers
+the distance is found with one `searchsorted` over the cumulative distance (the
+two-pointer scan, vectorized), and its end time is interpolated between the two
+points around it, so each distance costs one vectorized pass over the activity.
+The dbt mart folds these per-activity rows into the personal records.
+"""
+
+from datetime import datetime
+from typing import Any, Optional
+
+import numpy as np
+import numpy.typing as npt
+import pyarrow as pa
+
+from ingestion.schemas.strava_activity_streams_schema import (
+    ACTIVITY_BEST_EFFORTS_ARROW_SCHEMA,
+)
+from ingestion.transformers.strava_streams import _numeric_stream
+from models.strava_stream_model import StravaStreamsResponse
+
+
+BEST_EFFORT_DISTANCES_M = {
+    '400m': 400.0,
+    '1k': 1_000.0,
+    '5k': 5_000.0,
+    '10k': 10_000.0,
+    'half_marathon': 21_097.5,
+    'marathon': 42_195.0,
+}
+
+FloatArray = npt.NDArray[np.float64]
+
+
+def fastest_effort(
+    time_s: FloatArray, distance_m: FloatArray, target_m: float
+) -> Optional[tuple[float, float]]:
+    """Fastest elapsed time over `target_m`, and the time it started at.
+
+    `distance_m` must be non-decreasing. None if the activity is shorter.
+    """
+    # Windows starting at these points cover the distance within the activity
+    num_starts = int(
+        np.searchsorted(distance_m, distance_m[-1] - target_m, side='right')
+    )
+    if num_starts == 0:
+        return None
+    goals = distance_m[:num_starts] + target_m
+    # First point at or past each goal; the point before it is short of the goal
+    ends = np.searchsorted(distance_m, goals, side='left')
+    before = ends - 1
+    covered = (goals - distance_m[before]) / (distance_m[ends] - distance_m[before])
+    end_times = time_s[before] + (time_s[ends] - time_s[before]) * covered
+    elapsed = end_times - time_s[:num_starts]
+    best = int(np.argmin(elapsed))
+    return float(elapsed[best]), float(time_s[best])
+
+
+def build_best_efforts(
+    activity_id: int,
+    raw_streams: dict[str, Any],
+    ingested_at: datetime,
+    distances: Optional[dict[str, float]] = None,
+) -> pa.RecordBatch:
+    """
+    Computes the best efforts of Strava activity streams JSON.
+
+    Returns one row per effort the activity is long enough for, with the columns
+    of `ACTIVITY_BEST_EFFORTS_SCHEMA`. Needs the time and distance streams.
+    """
+
+    parsed = StravaStreamsResponse.model_validate(raw_streams)
+
+    time_s = _numeric_stream(parsed, 'time')
+    distance = _numeric_stream(parsed, 'distance')
+    if time_s is None or distance is None or len(time_s) != len(distance):
+        return pa.RecordBatch.from_pylist([], schema=ACTIVITY_BEST_EFFORTS_ARROW_SCHEMA)
+    known = ~np.isnan(time_s) & ~np.isnan(distance)
+    if known.sum() < 2:
+        return pa.RecordBatch.from_pylist([], schema=ACTIVITY_BEST_EFFORTS_ARROW_SCHEMA)
+    times = time_s[known]
+    # GPS corrections can step the distance back; keep it non-decreasing
+    distance_m = np.maximum.accumulate(distance[known])
+
+    rows = []
+    for effort, target_m in (distances or BEST_EFFORT_DISTANCES_M).items():
+        best = fastest_effort(times, distance_m, target_m)
+        if best is None:
+            continue
+        elapsed_s, start_s = best
+        rows.append({
+            'activity_id': activity_id,
+            'effort': effort,
+            'distance_m': target_m,
+            'elapsed_s': elapsed_s,
+            'start_offset_s': start_s - float(times[0]),
+            'ingested_at': ingested_at,
+        })
+    return pa.RecordBatch.from_pylist(rows, schema=ACTIVITY_BEST_EFFORTS_ARROW_SCHEMA)
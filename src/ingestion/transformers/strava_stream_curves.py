@@ -0,0 +1,118 @@
+"""Mean-maximal power and best speed curves of Strava activity streams.
+
+For every duration of CURVE_DURATIONS_S, the highest mean power and the highest
+mean speed the activity sustained over that duration. A window starts at every
+point: the work or distance at its end is interpolated on the running integral
+of the stream, so each duration costs one vectorized pass over the activity.
+The dbt mart folds these per-activity rows into all-time and seasonal envelopes.
+"""
+
+from datetime import datetime
+from typing import Any, Optional
+
+import numpy as np
+import numpy.typing as npt
+import pyarrow as pa
+
+from ingestion.schemas.strava_activity_streams_schema import (
+    ACTIVITY_STREAM_CURVES_ARROW_SCHEMA,
+)
+from ingestion.transformers.strava_streams import _numeric_stream
+from models.strava_stream_model import StravaStreamsResponse
+
+
+CURVE_DURATIONS_S = (
+    1, 5, 10, 15, 30, 60, 120, 300, 600, 1200, 1800, 3600, 5400, 7200, 10800, 14400
+)  # fmt: skip
+# A longer gap between two points is a pause, with no power or distance after it
+MAX_GAP_S = 5
+CURVE_POWER = 'power'  # mean-maximal power in W
+CURVE_SPEED = 'speed'  # best mean speed in m/s, i.e. the best pace
+
+FloatArray = npt.NDArray[np.float64]
+
+
+def running_integral(
+    time_s: FloatArray, values: FloatArray, max_gap_s: float = MAX_GAP_S
+) -> FloatArray:
+    """Integral of a stream from the first point to each point, e.g. work from power.
+
+    Each value holds until the next point, for at most `max_gap_s`; NaN counts as 0.
+    """
+    seconds = np.diff(time_s).clip(0, max_gap_s)
+    return np.concatenate(([0.0], np.cumsum(np.nan_to_num(values[:-1]) * seconds)))
+
+
+def best_means(
+    time_s: FloatArray, integral: FloatArray, durations: tuple[int, ...]
+) -> dict[int, float]:
+    """Highest mean of the integrated stream over each duration the activity spans."""
+    best = {}
+    for duration in sorted(durations):
+        # Windows starting at these points end within the activity
+        num_starts = int(np.searchsorted(time_s, time_s[-1] - duration, side='right'))
+        if num_starts == 0:
+            break  # durations are ascending
+        starts = time_s[:num_starts]
+        gains = np.interp(starts + duration, time_s, integral) - integral[:num_starts]
+        best[duration] = float(gains.max() / duration)
+    return best
+
+
+def build_stream_curves(
+    activity_id: int,
+    raw_streams: dict[str, Any],
+    ingested_at: datetime,
+    durations: tuple[int, ...] = CURVE_DURATIONS_S,
+) -> pa.RecordBatch:
+    """
+    Computes the power and speed curves of Strava activity streams JSON.
+
+    Returns one row per (curve, duration_s) with the columns of
+    `ACTIVITY_STREAM_CURVES_SCHEMA`. Needs the time stream; the power curve needs
+    watts, the speed curve distance or velocity_smooth.
+    """
+
+    parsed = StravaStreamsResponse.model_validate(raw_streams)
+
+    time_s = _numeric_stream(parsed, 'time')
+    if time_s is None or np.isnan(time_s).all():
+        return pa.RecordBatch.from_pylist(
+            [], schema=ACTIVITY_STREAM_CURVES_ARROW_SCHEMA
+        )
+    valid = ~np.isnan(time_s)
+    times = time_s[valid]
+
+    def at_times(stream_type: str) -> Optional[FloatArray]:
+        """The stream at the points with a time; None if missing or misaligned."""
+        values = _numeric_stream(parsed, stream_type)
+        if values is None or len(values) != len(time_s):
+            return None
+        at_valid: FloatArray = values[valid]
+        return at_valid
+
+    integrals = {}
+    watts = at_times('watts')
+    if watts is not None:
+        integrals[CURVE_POWER] = running_integral(times, watts)
+    distance = at_times('distance')
+    velocity = at_times('velocity_smooth')
+    if distance is not None and not np.isnan(distance).all():
+        # Distance already accounts for pauses; gaps in the stream are interpolated
+        known = ~np.isnan(distance)
+        integrals[CURVE_SPEED] = np.interp(times, times[known], distance[known])
+    elif velocity is not None:
+        integrals[CURVE_SPEED] = running_integral(times, velocity)
+
+    rows = [
+        {
+            'activity_id': activity_id,
+            'curve': curve,
+            'duration_s': duration,
+            'value': value,
+            'ingested_at': ingested_at,
+        }
+        for curve, integral in integrals.items()
+        for duration, value in best_means(times, integral, durations).items()
+    ]
+    return pa.RecordBatch.from_pylist(rows, schema=ACTIVITY_STREAM_CURVES_ARROW_SCHEMA)
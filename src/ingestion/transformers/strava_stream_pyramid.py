@@ -0,0 +1,135 @@
+"""Multi-resolution tiers of Strava activity streams, precomputed at ingestion.
+
+Every numeric stream is reduced to tiers of at most 500, 2,500 and 10,000 points
+(STREAM_PYRAMID_TIERS) with a min/max envelope: the series is split into equal
+buckets and the lowest and highest point of each bucket are kept. Unlike a row
+stride, this keeps the peaks and troughs, so a chart of a tier has the shape of
+the full stream. Each point carries its time and distance, the chart axes.
+"""
+
+from datetime import datetime
+from typing import Any
+
+import numpy as np
+import numpy.typing as npt
+import pyarrow as pa
+
+from ingestion.schemas.strava_activity_streams_schema import (
+    ACTIVITY_STREAM_PYRAMID_ARROW_SCHEMA,
+)
+from ingestion.transformers.strava_streams import _numeric_values
+from models.strava_stream_model import StravaStreamsResponse
+
+
+PYRAMID_TIERS = (500, 2_500, 10_000)
+# Chart axes, stored with every point instead of as tiers of their own
+_AXIS_STREAMS = ('time', 'distance')
+
+
+def envelope_indices(
+    values: npt.NDArray[np.float64], max_points: int
+) -> npt.NDArray[np.int64]:
+    """Sorted indices of at most `max_points` points that keep the series' shape.
+
+    Keeps the first and last point plus the minimum and maximum of
+    `(max_points - 2) // 2` equal buckets. NaN points are never selected.
+    """
+    valid = np.flatnonzero(~np.isnan(values))
+    n = len(valid)
+    if n <= max_points:
+        return valid.astype(np.int64)
+
+    buckets = max(1, (max_points - 2) // 2)
+    series = values[valid]
+    starts = np.arange(buckets) * n // buckets  # bucket sizes differ by at most one
+    bucket = np.repeat(np.arange(buckets), np.diff(np.append(starts, n)))
+    positions = np.arange(n)
+    # First position of each bucket's minimum and maximum, in O(n)
+    lows = np.minimum.reduceat(series, starts)[bucket] == series
+    highs = np.maximum.reduceat(series, starts)[bucket] == series
+    picks = np.sort(
+        np.concatenate((
+            [0, n - 1],
+            np.minimum.reduceat(np.where(lows, positions, n), starts),
+            np.minimum.reduceat(np.where(highs, positions, n), starts),
+        ))
+    )
+    picks = picks[np.append(True, picks[1:] != picks[:-1])]
+    kept: npt.NDArray[np.int64] = valid[picks].astype(np.int64)
+    return kept
+
+
+def _tiers(num_points: int, tiers: tuple[int, ...]) -> list[int]:
+    """Tiers up to the first one that holds all points; finer ones would repeat it."""
+    used = []
+    for tier in sorted(tiers):
+        used.append(tier)
+        if tier >= num_points:
+            break
+    return used
+
+
+def build_stream_pyramid(
+    activity_id: int,
+    raw_streams: dict[str, Any],
+    ingested_at: datetime,
+    tiers: tuple[int, ...] = PYRAMID_TIERS,
+) -> pa.RecordBatch:
+    """
+    Downsamples Strava activity streams JSON into the tiers of the stream pyramid.
+
+    Returns one row per kept point with the columns of
+    `ACTIVITY_STREAM_PYRAMID_SCHEMA`. An activity with fewer points than a tier
+    is stored completely in that tier, and no finer tiers are produced.
+    """
+
+    parsed = StravaStreamsResponse.model_validate(raw_streams)
+
+    series = {}
+    for stream_type, stream in parsed.root.items():
+        if stream.data:
+            values = _numeric_values(stream_type, stream.data)
+            if values is not None:
+                series[stream_type] = values
+    num_points = max((len(values) for values in series.values()), default=0)
+    time_s = series.get('time', np.full(num_points, np.nan))
+    distance_m = series.get('distance', np.full(num_points, np.nan))
+
+    schema = ACTIVITY_STREAM_PYRAMID_ARROW_SCHEMA
+    batches = []
+    for tier in _tiers(num_points, tiers):
+        for stream_type, values in series.items():
+            if stream_type in _AXIS_STREAMS:
+                continue
+            index = envelope_indices(values, tier)
+            times = np.take(time_s, index, mode='clip')
+            batches.append(
+                pa.RecordBatch.from_arrays(
+                    [
+                        pa.repeat(pa.scalar(activity_id, pa.int64()), len(index)),
+                        pa.repeat(pa.scalar(tier, pa.int64()), len(index)),
+                        pa.repeat(pa.scalar(stream_type, pa.string()), len(index)),
+                        pa.array(index, type=pa.int64()),
+                        pa.array(
+                            np.nan_to_num(times).astype(np.int64),
+                            mask=np.isnan(times),
+                            type=pa.int64(),
+                        ),
+                        pa.array(
+                            np.take(distance_m, index, mode='clip'),
+                            from_pandas=True,
+                            type=pa.float64(),
+                        ),
+                        pa.array(values[index], type=pa.float64()),
+                        pa.repeat(
+                            pa.scalar(ingested_at, schema.field('ingested_at').type),
+                            len(index),
+                        ),
+                    ],
+                    schema=schema,
+                )
+            )
+
+    if not batches:
+        return pa.RecordBatch.from_pylist([], schema=schema)
+    return pa.concat_batches(batches)
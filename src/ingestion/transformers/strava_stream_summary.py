@@ -0,0 +1,238 @@
+"""Per-activity summary of Strava activity streams, computed once at ingestion.
+
+Reduces the streams of an activity to one row: time in heart-rate and power
+zones, percentiles of heart rate, cadence, power and speed, the moving ratio,
+normalized power, heart-rate drift, aerobic decoupling and the training load
+(TSS from power, else TRIMP from heart rate). Time-based metrics
+weight every point by the seconds until the next one, counting moving time only
+where a `moving` stream exists, so pages and the AI coach read one small row
+instead of the stream points.
+"""
+
+from datetime import datetime
+from typing import Any, Optional
+
+import numpy as np
+import numpy.typing as npt
+import pyarrow as pa
+
+from ingestion.schemas.strava_activity_streams_schema import (
+    ACTIVITY_STREAM_SUMMARY_ARROW_SCHEMA,
+)
+from ingestion.transformers.strava_streams import _numeric_values
+from models.strava_stream_model import StravaStreamsResponse
+
+
+# Lower bounds of zones 2..5 as a share of the maximum heart rate
+HR_ZONE_BOUNDS = (0.6, 0.7, 0.8, 0.9)
+# Lower bounds of zones 2..7 as a share of the FTP (Coggan power zones)
+POWER_ZONE_BOUNDS = (0.55, 0.75, 0.9, 1.05, 1.2, 1.5)
+PERCENTILES = (5, 25, 50, 75, 95)
+NP_WINDOW_S = 30  # rolling window of normalized power
+LOAD_TSS = 'tss'  # Training Stress Score: 100 = one hour at FTP
+LOAD_TRIMP = 'trimp'  # Banister's TRIMP from the heart-rate reserve
+
+FloatArray = npt.NDArray[np.float64]
+
+
+def _aligned(values: Optional[FloatArray], num_points: int) -> FloatArray:
+    """The stream cut or NaN-padded to `num_points`; all NaN if it is missing."""
+    aligned = np.full(num_points, np.nan)
+    if values is not None:
+        aligned[: min(len(values), num_points)] = values[:num_points]
+    return aligned
+
+
+def point_seconds(
+    time_s: FloatArray, moving: Optional[npt.NDArray[np.bool_]]
+) -> FloatArray:
+    """Seconds each point stands for: the time until the next point, if moving.
+
+    Without a time stream every point counts as one second.
+    """
+    if np.isnan(time_s).all():
+        seconds = np.ones(len(time_s))
+    else:
+        seconds = np.nan_to_num(np.diff(time_s, append=time_s[-1])).clip(min=0)
+    if moving is not None:
+        seconds = seconds * moving
+    return seconds
+
+
+def zone_seconds(
+    values: FloatArray, seconds: FloatArray, bounds: tuple[float, ...], threshold: float
+) -> list[int]:
+    """Seconds spent in each zone, from the lowest zone to the highest."""
+    valid = ~np.isnan(values)
+    zones = np.searchsorted(np.asarray(bounds) * threshold, values[valid], side='right')
+    totals = np.bincount(zones, weights=seconds[valid], minlength=len(bounds) + 1)
+    return [int(total) for total in np.round(totals)]
+
+
+def percentiles(values: FloatArray, seconds: FloatArray) -> list[float]:
+    """PERCENTILES of the values of moving points; empty without such points."""
+    selected = values[~np.isnan(values) & (seconds > 0)]
+    if not len(selected):
+        return []
+    return [float(p) for p in np.percentile(selected, PERCENTILES)]
+
+
+def normalized_power(time_s: FloatArray, watts: FloatArray) -> Optional[float]:
+    """Fourth-power mean of the 30 s rolling power, resampled to 1 s."""
+    valid = ~np.isnan(time_s) & ~np.isnan(watts)
+    times, power = time_s[valid], watts[valid]
+    if len(times) < 2 or times[-1] - times[0] < NP_WINDOW_S:
+        return None
+    grid = np.arange(times[0], times[-1] + 1)
+    cumulative = np.cumsum(np.insert(np.interp(grid, times, power), 0, 0.0))
+    rolling = (cumulative[NP_WINDOW_S:] - cumulative[:-NP_WINDOW_S]) / NP_WINDOW_S
+    return float(np.mean(rolling**4) ** 0.25)
+
+
+def _half_means(
+    values: FloatArray, seconds: FloatArray
+) -> Optional[tuple[float, float]]:
+    """Time-weighted means of the first and second half of the moving time."""
+    elapsed = np.cumsum(seconds)
+    first = elapsed <= elapsed[-1] / 2
+    means = []
+    for half in (first, ~first):
+        weights = np.where(np.isnan(values) | ~half, 0.0, seconds)
+        if weights.sum() == 0:
+            return None
+        means.append(float(np.average(np.nan_to_num(values), weights=weights)))
+    return means[0], means[1]
+
+
+def hr_drift(heartrate: FloatArray, seconds: FloatArray) -> Optional[float]:
+    """Rise of the mean heart rate from the first to the second half, in percent."""
+    halves = _half_means(heartrate, seconds)
+    if halves is None or halves[0] == 0:
+        return None
+    return (halves[1] / halves[0] - 1) * 100
+
+
+def decoupling(
+    output: FloatArray, heartrate: FloatArray, seconds: FloatArray
+) -> Optional[float]:
+    """Aerobic decoupling: drop of output (power or speed) per heartbeat, in percent."""
+    both = np.where(np.isnan(heartrate), np.nan, output)
+    output_halves = _half_means(both, seconds)
+    hr_halves = _half_means(np.where(np.isnan(output), np.nan, heartrate), seconds)
+    if output_halves is None or hr_halves is None or 0 in hr_halves:
+        return None
+    first, second = (o / hr for o, hr in zip(output_halves, hr_halves))
+    if first == 0:
+        return None
+    return (first - second) / first * 100
+
+
+def tss(moving_s: int, np_w: float, ftp_w: int) -> float:
+    """Training Stress Score of `moving_s` seconds at normalized power `np_w`."""
+    intensity = np_w / ftp_w
+    return moving_s * np_w * intensity / (ftp_w * 3600) * 100
+
+
+def trimp(
+    heartrate: FloatArray, seconds: FloatArray, max_hr: int, resting_hr: int
+) -> float:
+    """Banister's TRIMP: minutes weighted by 0.64 * e^(1.92 * HR reserve)."""
+    valid = ~np.isnan(heartrate)
+    reserve = ((heartrate[valid] - resting_hr) / (max_hr - resting_hr)).clip(0, 1)
+    weights = 0.64 * np.exp(1.92 * reserve)
+    return float(np.sum(seconds[valid] / 60 * reserve * weights))
+
+
+def summarize_streams(
+    activity_id: int,
+    raw_streams: dict[str, Any],
+    ingested_at: datetime,
+    max_hr: Optional[int] = None,
+    ftp_w: Optional[int] = None,
+    resting_hr: Optional[int] = None,
+) -> pa.RecordBatch:
+    """
+    Summarizes Strava activity streams JSON into one row per activity.
+
+    Returns the columns of `ACTIVITY_STREAM_SUMMARY_SCHEMA`. Zones need the
+    athlete's `max_hr`/`ftp_w` and are empty without them, the training load needs
+    `ftp_w` (TSS) or `max_hr` and `resting_hr` (TRIMP); metrics of missing streams
+    are empty or null.
+    """
+
+    parsed = StravaStreamsResponse.model_validate(raw_streams)
+    streams = {
+        stream_type: stream.data
+        for stream_type, stream in parsed.root.items()
+        if stream.data
+    }
+    num_points = max((len(data) for data in streams.values()), default=0)
+
+    def numeric(stream_type: str) -> FloatArray:
+        data = streams.get(stream_type)
+        values = _numeric_values(stream_type, data) if data else None
+        return _aligned(values, num_points)
+
+    time_s = numeric('time')
+    heartrate = numeric('heartrate')
+    watts = numeric('watts')
+    velocity = numeric('velocity_smooth')
+    moving = None
+    if 'moving' in streams:
+        # Points without a moving flag count as moving
+        flags = np.asarray([v is not False for v in streams['moving']], dtype=float)
+        moving = _aligned(flags, num_points) != 0
+
+    seconds = point_seconds(time_s, moving) if num_points else np.zeros(0)
+    elapsed_s = (
+        int(np.nanmax(time_s) - np.nanmin(time_s))
+        if not np.isnan(time_s).all()
+        else num_points
+    )
+    moving_s = int(round(seconds.sum()))
+    has_hr = not np.isnan(heartrate).all()
+    has_power = not np.isnan(watts).all()
+    np_w = normalized_power(time_s, watts) if has_power else None
+
+    load, load_method = None, None
+    if ftp_w and np_w is not None:
+        load, load_method = tss(moving_s, np_w, ftp_w), LOAD_TSS
+    elif max_hr and resting_hr and max_hr > resting_hr and has_hr:
+        load, load_method = trimp(heartrate, seconds, max_hr, resting_hr), LOAD_TRIMP
+
+    row = {
+        'activity_id': activity_id,
+        'num_points': num_points,
+        'elapsed_s': elapsed_s,
+        'moving_s': moving_s,
+        'moving_ratio': moving_s / elapsed_s if elapsed_s else None,
+        'zone_max_hr_bpm': max_hr,
+        'hr_zone_s': (
+            zone_seconds(heartrate, seconds, HR_ZONE_BOUNDS, max_hr)
+            if max_hr and has_hr
+            else []
+        ),
+        'zone_ftp_w': ftp_w,
+        'power_zone_s': (
+            zone_seconds(watts, seconds, POWER_ZONE_BOUNDS, ftp_w)
+            if ftp_w and has_power
+            else []
+        ),
+        'heartrate_percentiles': percentiles(heartrate, seconds),
+        'cadence_percentiles': percentiles(numeric('cadence'), seconds),
+        'watts_percentiles': percentiles(watts, seconds),
+        'velocity_percentiles': percentiles(velocity, seconds),
+        'normalized_power_w': np_w,
+        'hr_drift_pct': hr_drift(heartrate, seconds) if has_hr else None,
+        'decoupling_pct': (
+            decoupling(watts if has_power else velocity, heartrate, seconds)
+            if has_hr
+            else None
+        ),
+        'training_load': load,
+        'training_load_method': load_method,
+        'ingested_at': ingested_at,
+    }
+    return pa.RecordBatch.from_pylist(
+        [row], schema=ACTIVITY_STREAM_SUMMARY_ARROW_SCHEMA
+    )
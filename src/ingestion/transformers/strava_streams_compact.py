@@ -0,0 +1,186 @@
+"""Compact encoding of Strava activity streams: one row per activity and stream.
+
+Numeric and boolean streams are stored as delta-encoded integer arrays (the value
+times a power-of-ten `scale`, chosen per stream so the encoding is lossless), and
+latlng streams as a polyline string with the same number of decimals. This keeps
+`raw_activity_streams_compact` an order of magnitude smaller than the row format.
+"""
+
+from datetime import datetime
+from typing import Any, Optional
+
+import numpy as np
+import numpy.typing as npt
+import polyline
+import pyarrow as pa
+
+from ingestion.schemas.strava_activity_streams_schema import (
+    ACTIVITY_STREAMS_ARROW_SCHEMA,
+    ACTIVITY_STREAMS_COMPACT_ARROW_SCHEMA,
+)
+from ingestion.transformers.strava_streams import (
+    _KIND_FLOAT,
+    _KIND_INT,
+    _KIND_LATLNG,
+    _KIND_SKIP,
+    _value_kinds,
+)
+from models.strava_stream_model import StravaStreamsResponse
+
+
+MAX_DECIMALS = 6  # GPS coordinates come with 6 decimals
+
+
+def _decimals(values: npt.NDArray[np.float64]) -> int:
+    """Fewest decimals that represent all values exactly (at most MAX_DECIMALS)."""
+    for decimals in range(MAX_DECIMALS + 1):
+        scale = 10**decimals
+        if np.array_equal(np.round(values * scale) / scale, values):
+            return decimals
+    return MAX_DECIMALS
+
+
+def _encode_polyline(coords: npt.NDArray[np.float64], decimals: int) -> str:
+    """Vectorized Google polyline encoding, equal to `polyline.encode`."""
+    ints = np.round(coords * 10**decimals).astype(np.int64)
+    deltas = np.diff(ints, axis=0, prepend=0).ravel()  # lat, lng interleaved
+    zigzag = np.where(deltas < 0, ~(deltas << 1), deltas << 1)
+    # Up to 7 chunks of 5 bits each, least significant first
+    shifted = zigzag[:, None] >> np.arange(0, 35, 5)
+    needed = shifted > 0
+    needed[:, 0] = True
+    more = np.zeros_like(needed)
+    more[:, :-1] = needed[:, 1:]
+    chars = (shifted & 0x1F) | (more * 0x20)
+    encoded: bytes = (chars[needed] + 63).astype(np.uint8).tobytes()
+    return encoded.decode('ascii')
+
+
+def _encode_stream(stream_type: str, data: list[Any]) -> Optional[dict[str, Any]]:
+    """Encodes a single stream into the columns of a compact row."""
+    kinds = _value_kinds(stream_type, data)
+    # A latlng stream only keeps its coordinate pairs
+    if (kinds == _KIND_LATLNG).any():
+        kinds[kinds != _KIND_LATLNG] = _KIND_SKIP
+    emitted = kinds != _KIND_SKIP
+    if not emitted.any():
+        return None
+
+    index = np.flatnonzero(emitted)
+    values = data if len(index) == len(data) else [data[i] for i in index]
+    kinds = kinds[emitted]
+    row: dict[str, Any] = {
+        'num_points': len(index),
+        # Dense streams (the norm) need no explicit positions
+        'sequence_index': [] if len(index) == len(data) else index.tolist(),
+        'values_delta': [],
+        'values_polyline': None,
+    }
+
+    if kinds[0] == _KIND_LATLNG:
+        coords = np.asarray(values, dtype=np.float64)
+        decimals = _decimals(coords)
+        row.update(
+            value_type='latlng',
+            scale=10**decimals,
+            values_polyline=_encode_polyline(coords, decimals),
+        )
+        return row
+
+    if (kinds == _KIND_FLOAT).any():
+        floats = np.asarray(values, dtype=np.float64)
+        decimals = _decimals(floats)
+        scale = 10**decimals
+        ints = np.round(floats * scale).astype(np.int64)
+        row.update(value_type='float', scale=scale)
+    else:
+        ints = np.asarray(values, dtype=np.int64)
+        value_type = 'int' if (kinds == _KIND_INT).any() else 'bool'
+        row.update(value_type=value_type, scale=1)
+
+    row['values_delta'] = np.diff(ints, prepend=0).tolist()
+    return row
+
+
+def encode_streams_compact(
+    activity_id: int, raw_streams: dict[str, Any], ingested_at: datetime
+) -> pa.RecordBatch:
+    """
+    Encodes Strava activity streams JSON into compact Bronze records.
+
+    Returns one row per stream with the columns of
+    `ACTIVITY_STREAMS_COMPACT_SCHEMA`. Integer values of a float stream are stored
+    as floats, so a mixed stream decodes into `value_float` only.
+    """
+
+    parsed = StravaStreamsResponse.model_validate(raw_streams)
+
+    rows = []
+    for stream_type, stream in parsed.root.items():
+        if not stream.data:
+            continue
+        row = _encode_stream(stream_type, stream.data)
+        if row is not None:
+            rows.append({
+                'activity_id': activity_id,
+                'stream_type': stream_type,
+                **row,
+                'ingested_at': ingested_at,
+            })
+    return pa.RecordBatch.from_pylist(
+        rows, schema=ACTIVITY_STREAMS_COMPACT_ARROW_SCHEMA
+    )
+
+
+def decode_streams_compact(compact: pa.Table) -> pa.Table:
+    """Decodes compact rows into the row format of `ACTIVITY_STREAMS_SCHEMA`."""
+    batches = []
+    for row in compact.to_pylist():
+        num_points = row['num_points']
+        index = np.asarray(row['sequence_index'] or range(num_points), dtype=np.int64)
+        columns: dict[str, pa.Array] = {
+            name: pa.nulls(
+                num_points, type=ACTIVITY_STREAMS_ARROW_SCHEMA.field(name).type
+            )
+            for name in (
+                'value_float',
+                'value_int',
+                'value_bool',
+                'value_lat',
+                'value_lng',
+            )
+        }
+        if row['value_type'] == 'latlng':
+            decimals = len(str(row['scale'])) - 1
+            coords = np.asarray(
+                polyline.decode(row['values_polyline'], precision=decimals),
+                dtype=np.float64,
+            ).reshape(-1, 2)
+            columns['value_lat'] = pa.array(coords[:, 0])
+            columns['value_lng'] = pa.array(coords[:, 1])
+        else:
+            ints = np.cumsum(np.asarray(row['values_delta'], dtype=np.int64))
+            if row['value_type'] == 'float':
+                columns['value_float'] = pa.array(ints / row['scale'])
+            elif row['value_type'] == 'int':
+                columns['value_int'] = pa.array(ints)
+            else:
+                columns['value_bool'] = pa.array(ints.astype(np.bool_))
+
+        schema = ACTIVITY_STREAMS_ARROW_SCHEMA
+        batches.append(
+            pa.RecordBatch.from_arrays(
+                [
+                    pa.repeat(pa.scalar(row['activity_id'], pa.int64()), num_points),
+                    pa.repeat(pa.scalar(row['stream_type'], pa.string()), num_points),
+                    pa.array(index, type=pa.int64()),
+                    *columns.values(),
+                    pa.repeat(
+                        pa.scalar(row['ingested_at'], schema.field('ingested_at').type),
+                        num_points,
+                    ),
+                ],
+                schema=schema,
+            )
+        )
+    return pa.Table.from_batches(batches, schema=ACTIVITY_STREAMS_ARROW_SCHEMA)
@@ -1,7 +1,26 @@
 """Entry point."""
 
+import os
+
+from ingestion.pipelines.strava_backfill import run_backfill
 from ingestion.pipelines.strava_pipeline import run
+from ingestion.pipelines.strava_retry import run_retry
+from ingestion.pipelines.strava_sharded import run_finalize, run_plan, run_shard
 
 
 if __name__ == '__main__':
-    run()
+    # 'incremental' (default), 'backfill', 'retry' (dead-lettered items only), or
+    # the 'plan', 'shard' and 'finalize' steps of a sharded run
+    mode = os.environ.get('PIPELINE_MODE', 'incremental')
+    if mode == 'backfill':
+        run_backfill()
+    elif mode == 'retry':
+        run_retry()
+    elif mode == 'plan':
+        run_plan()
+    elif mode == 'shard':
+        run_shard()
+    elif mode == 'finalize':
+        run_finalize()
+    else:
+        run()
@@ -13,4 +13,23 @@ resource "google_project_iam_member" "cloud_run_viewer" {
   project = var.project_id
   role    = "roles/run.viewer"
   member  = "serviceAccount:${google_service_account.airflow_local_dev.email}"
-}
\ No newline at end of file
+}
+# The sharded DAG runs the EL job with per-task environment overrides
+resource "google_project_iam_member" "cloud_run_executor_with_overrides" {
+  project = var.project_id
+  role    = "roles/run.jobsExecutorWithOverrides"
+  member  = "serviceAccount:${google_service_account.airflow_local_dev.email}"
+}
+
+# ... and reads the shard plan from the pipeline state in dataset_raw
+resource "google_project_iam_member" "airflow_bigquery_jobuser" {
+  project = var.project_id
+  role    = "roles/bigquery.jobUser"
+  member  = "serviceAccount:${google_service_account.airflow_local_dev.email}"
+}
+
+resource "google_bigquery_dataset_iam_member" "airflow_dataset_raw_viewer" {
+  dataset_id = var.dataset_raw_id
+  role       = "roles/bigquery.dataViewer"
+  member     = "serviceAccount:${google_service_account.airflow_local_dev.email}"
+}
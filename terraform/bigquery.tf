@@ -36,4 +36,25 @@ resource "google_bigquery_dataset" "dataset_mart" {
     environment = "prod"
     data_stage  = "mart"
   }
-}
\ No newline at end of file
+}
+
+# Cached Strava access and refresh tokens; the access list is authoritative, so
+# only the project owners and the EL job can read them
+resource "google_bigquery_dataset" "dataset_auth" {
+  dataset_id = var.dataset_auth_id
+  location   = var.region
+  labels = {
+    service     = "bigquery-datasets"
+    environment = "prod"
+    data_stage  = "auth"
+  }
+
+  access {
+    role          = "OWNER"
+    special_group = "projectOwners"
+  }
+  access {
+    role          = "WRITER"
+    user_by_email = google_service_account.el_job_sa.email
+  }
+}
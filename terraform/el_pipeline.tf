@@ -45,6 +45,10 @@ resource "google_cloud_run_v2_job" "el_job" {
           name  = "RAW_DATASET"
           value = var.dataset_raw_id
         }
+        env {
+          name  = "TOKEN_DATASET"
+          value = google_bigquery_dataset.dataset_auth.dataset_id
+        }
 
         env {
           name  = "CLOUD_RUN_DBT_JOB_NAME"
@@ -73,7 +77,8 @@ resource "google_cloud_run_v2_job" "el_job" {
     google_artifact_registry_repository.el_image_repo,
     google_secret_manager_secret.secrets,
     google_secret_manager_secret_iam_member.job_sa_secret_access,
-    google_bigquery_dataset_iam_member.el_dataset_raw_editor
+    google_bigquery_dataset_iam_member.el_dataset_raw_editor,
+    google_bigquery_dataset.dataset_auth
   ]
 }
 
@@ -49,6 +49,12 @@ variable "dataset_mart_id" {
   default     = "dataset_mart"
 }
 
+variable "dataset_auth_id" {
+  description = "The dataset ID for the access-restricted dataset of the Strava refresh tokens."
+  type        = string
+  default     = "dataset_auth"
+}
+
 variable "github_username" {
   description = "GitHub username for OIDC federation."
   type        = string